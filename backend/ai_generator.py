@@ -1,6 +1,30 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import functools
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+)
 
 import anthropic
+from query_context import QueryContext, ToolCallRecord
+
+# Steps yielded by AIGenerator._tool_rounds to its sync and async drivers
+API_CALL = "api_call"
+TOOL_CALLS = "tool_calls"
+
+# Marks the end of a prompt prefix the API may cache and reuse
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Precedes the conversation history blocks in the system content
+HISTORY_HEADER = {"type": "text", "text": "Previous conversation:"}
 
 
 class AIGenerator:
@@ -45,23 +69,138 @@ All responses must be:
 Provide only the direct answer to what was asked.
 """
 
-    def __init__(self, api_key: str, model: str, base_url: str = None):
-        # Create client with optional base_url
+    # Prompt for folding old conversation turns into a rolling summary
+    SUMMARY_PROMPT = """Summarize this conversation between a student and a course materials assistant so it can stand in for the full transcript.
+
+- Start from the existing summary, if any, and merge in the new messages
+- Keep the courses, lessons and topics discussed and any facts the student relies on
+- Drop pleasantries and wording details
+- Reply with the summary only, in a few short sentences
+"""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str = None,
+        tool_timeout: Optional[float] = None,
+        max_parallel_tools: int = 4,
+        prompt_caching: bool = False,
+    ):
+        # Create clients with optional base_url; the async client serves the
+        # API's async query path, the sync one everything else
+        client_kwargs = {"api_key": api_key}
         if base_url:
-            self.client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
-        else:
-            self.client = anthropic.Anthropic(api_key=api_key)
+            client_kwargs["base_url"] = base_url
+        self.client = anthropic.Anthropic(**client_kwargs)
+        self.async_client = anthropic.AsyncAnthropic(**client_kwargs)
         self.model = model
 
         # Pre-build base API parameters
         self.base_params = {"model": self.model, "temperature": 0, "max_tokens": 800}
 
+        # Tool calls in one round run concurrently; a call that takes longer
+        # than tool_timeout seconds is reported to Claude as failed
+        self.tool_timeout = tool_timeout
+        self.max_parallel_tools = max(1, max_parallel_tools)
+        self._tool_executor: Optional[ThreadPoolExecutor] = None
+
+        # Mark the system prompt and tool definitions as a cacheable prefix
+        self.prompt_caching = prompt_caching
+        self._system_block: Dict[str, Any] = {
+            "type": "text",
+            "text": self.SYSTEM_PROMPT,
+        }
+        if prompt_caching:
+            self._system_block["cache_control"] = CACHE_CONTROL
+
+    def _build_params(
+        self,
+        query: str,
+        conversation_history: Optional[str],
+        tools: Optional[List],
+    ) -> Dict[str, Any]:
+        """
+        Build the parameters for the first API call of a query.
+
+        The system prompt is sent as its own unchanging text block and the
+        history as separate blocks after it, so the history string is never
+        copied into a combined prompt. With prompt caching the static block
+        and the last tool definition carry cache breakpoints; the API
+        caches the prefix tools -> system up to the last breakpoint.
+        """
+        system = [self._system_block]
+        if conversation_history:
+            system += [HISTORY_HEADER, {"type": "text", "text": conversation_history}]
+
+        # Prepare API call parameters efficiently
+        api_params = {
+            **self.base_params,
+            "messages": [{"role": "user", "content": query}],
+            "system": system,
+        }
+
+        # Add tools if available
+        if tools:
+            if self.prompt_caching:
+                # Copy the last definition; ToolManager's dicts are shared
+                tools = [*tools[:-1], {**tools[-1], "cache_control": CACHE_CONTROL}]
+            api_params["tools"] = tools
+            api_params["tool_choice"] = {"type": "auto"}
+
+        return api_params
+
+    @staticmethod
+    def _record_usage(context: Optional[QueryContext], response):
+        """Add a response's token counts (including cache reads/writes)"""
+        if context is not None:
+            context.record_usage(getattr(response, "usage", None))
+
+    @staticmethod
+    def _response_text(response) -> str:
+        """Text of the first text block in a response"""
+        # Try to extract text, handle cases where first block might not have text
+        for block in response.content:
+            if hasattr(block, "text"):
+                return block.text
+
+        # Fallback if no text block found
+        return ""
+
+    def summarize_conversation(
+        self, previous_summary: str, transcript: str, max_tokens: int = 200
+    ) -> str:
+        """
+        Fold older conversation messages into a short rolling summary.
+
+        Args:
+            previous_summary: Summary of still earlier messages ("" if none)
+            transcript: Formatted messages to fold in
+            max_tokens: Upper bound on the summary length
+
+        Returns:
+            The updated summary
+        """
+        content = f"New messages:\n{transcript}"
+        if previous_summary:
+            content = f"Existing summary:\n{previous_summary}\n\n{content}"
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=0,
+            system=self.SUMMARY_PROMPT,
+            messages=[{"role": "user", "content": content}],
+        )
+        return self._response_text(response).strip()
+
     def generate_response(
         self,
         query: str,
         conversation_history: Optional[str] = None,
         tools: Optional[List] = None,
         tool_manager=None,
+        context: Optional[QueryContext] = None,
+        executor: Optional[Executor] = None,
     ) -> str:
         """
         Generate AI response with optional tool usage and conversation context.
@@ -71,48 +210,75 @@ Provide only the direct answer to what was asked.
             conversation_history: Previous messages for context
             tools: Available tools the AI can use
             tool_manager: Manager to execute tools
+            context: Per-query context passed to every tool call
+            executor: Executor for concurrent tool calls (default: a small
+                pool owned by the generator)
 
         Returns:
             Generated response as string
         """
-
-        # Build system content efficiently - avoid string ops when possible
-        system_content = (
-            f"{self.SYSTEM_PROMPT}\n\nPrevious conversation:\n{conversation_history}"
-            if conversation_history
-            else self.SYSTEM_PROMPT
-        )
-
-        # Prepare API call parameters efficiently
-        api_params = {
-            **self.base_params,
-            "messages": [{"role": "user", "content": query}],
-            "system": system_content,
-        }
-
-        # Add tools if available
-        if tools:
-            api_params["tools"] = tools
-            api_params["tool_choice"] = {"type": "auto"}
+        api_params = self._build_params(query, conversation_history, tools)
 
         # Get response from Claude
         response = self.client.messages.create(**api_params)
+        self._record_usage(context, response)
 
         # Handle tool execution if needed
         if response.stop_reason == "tool_use" and tool_manager:
             # Use new multi-round tool execution (supports up to MAX_TOOL_ROUNDS)
             return self._execute_tool_rounds(
-                response, api_params, tool_manager, max_rounds=2
+                response,
+                api_params,
+                tool_manager,
+                max_rounds=2,
+                context=context,
+                executor=executor,
             )
 
         # Return direct response
-        # Try to extract text, handle cases where first block might not have text
-        for block in response.content:
-            if hasattr(block, "text"):
-                return block.text
+        return self._response_text(response)
 
-        # Fallback if no text block found
-        return ""
+    async def agenerate_response(
+        self,
+        query: str,
+        conversation_history: Optional[str] = None,
+        tools: Optional[List] = None,
+        tool_manager=None,
+        executor: Optional[Executor] = None,
+        context: Optional[QueryContext] = None,
+    ) -> str:
+        """
+        Async variant of generate_response.
+
+        API calls are awaited on the async client, so concurrent queries
+        overlap their LLM waits; tools (embedding and ChromaDB work) run on
+        `executor` to keep the event loop free.
+
+        Args:
+            query: The user's question or request
+            conversation_history: Previous messages for context
+            tools: Available tools the AI can use
+            tool_manager: Manager to execute tools
+            executor: Executor for tool calls (default: the loop's executor)
+            context: Per-query context passed to every tool call
+
+        Returns:
+            Generated response as string
+        """
+        api_params = self._build_params(query, conversation_history, tools)
+
+        response = await self.async_client.messages.create(**api_params)
+        self._record_usage(context, response)
+
+        if response.stop_reason == "tool_use" and tool_manager:
+            return await self._run_steps_async(
+                self._tool_rounds(response, api_params, max_rounds=2),
+                tool_manager,
+                executor,
+                context,
+            )
+
+        return self._response_text(response)
 
     def _execute_tool_rounds(
         self,
@@ -120,6 +286,8 @@ Provide only the direct answer to what was asked.
         base_params: Dict[str, Any],
         tool_manager,
         max_rounds: int = 2,
+        context: Optional[QueryContext] = None,
+        executor: Optional[Executor] = None,
     ):
         """
         Execute up to max_rounds of sequential tool calls with Claude.
@@ -129,10 +297,317 @@ Provide only the direct answer to what was asked.
             base_params: Base API parameters (contains messages, system, tools)
             tool_manager: Manager to execute tools
             max_rounds: Maximum number of tool execution rounds (default 2)
+            context: Per-query context passed to every tool call
+            executor: Executor for concurrent tool calls within a round
 
         Returns:
             Final response text after all tool rounds
         """
+        steps = self._tool_rounds(initial_response, base_params, max_rounds)
+        try:
+            step = next(steps)
+            while True:
+                kind, payload = step
+                if kind == API_CALL:
+                    response = self.client.messages.create(**payload)
+                    self._record_usage(context, response)
+                    step = steps.send(response)
+                else:
+                    step = steps.send(
+                        self._run_tools(tool_manager, payload, context, executor)
+                    )
+        except StopIteration as done:
+            return done.value
+
+    def _run_tools(
+        self,
+        tool_manager,
+        blocks: List[Any],
+        context: Optional[QueryContext],
+        executor: Optional[Executor],
+    ) -> List[Any]:
+        """
+        Run one round's tool calls concurrently.
+
+        Returns:
+            One outcome per block, in block order: the tool's result, or the
+            exception it raised (TimeoutError if it exceeded tool_timeout)
+        """
+        if len(blocks) == 1 and self.tool_timeout is None:
+            # Nothing to overlap or time out; run inline
+            try:
+                return [self._tool_call(tool_manager, blocks[0], context)()]
+            except Exception as e:
+                return [e]
+
+        contexts = self._fork_contexts(context, len(blocks))
+        executor = executor or self._default_tool_executor()
+        start = time.monotonic()
+        futures = [
+            executor.submit(self._tool_call(tool_manager, block, call_context))
+            for block, call_context in zip(blocks, contexts)
+        ]
+
+        outcomes = []
+        timed_out = []
+        for block, future in zip(blocks, futures):
+            remaining = None
+            if self.tool_timeout is not None:
+                # All calls start together, so each gets tool_timeout from then
+                remaining = max(0.0, start + self.tool_timeout - time.monotonic())
+            try:
+                outcomes.append(future.result(timeout=remaining))
+                timed_out.append(False)
+            except TimeoutError:
+                future.cancel()
+                outcomes.append(self._timeout_error(block))
+                timed_out.append(True)
+            except Exception as e:
+                outcomes.append(e)
+                timed_out.append(False)
+
+        self._merge_contexts(context, contexts, blocks, timed_out)
+        return outcomes
+
+    async def _arun_tools(
+        self,
+        tool_manager,
+        blocks: List[Any],
+        context: Optional[QueryContext],
+        executor: Optional[Executor],
+    ) -> List[Any]:
+        """Async counterpart of _run_tools, running calls on `executor`"""
+        loop = asyncio.get_running_loop()
+        contexts = self._fork_contexts(context, len(blocks))
+
+        async def run(block, call_context) -> Tuple[Any, bool]:
+            """The call's outcome, and whether it timed out"""
+            call = loop.run_in_executor(
+                executor, self._tool_call(tool_manager, block, call_context)
+            )
+            try:
+                return await asyncio.wait_for(call, self.tool_timeout), False
+            except TimeoutError:
+                return self._timeout_error(block), True
+            except Exception as e:
+                return e, False
+
+        results = await asyncio.gather(
+            *(run(block, call_context) for block, call_context in zip(blocks, contexts))
+        )
+        outcomes = [outcome for outcome, _ in results]
+        timed_out = [expired for _, expired in results]
+        self._merge_contexts(context, contexts, blocks, timed_out)
+        return outcomes
+
+    def _fork_contexts(
+        self, context: Optional[QueryContext], count: int
+    ) -> List[Optional[QueryContext]]:
+        """
+        One context per call, so sources merge in call order.
+
+        A lone call shares the parent context unless it can time out: a
+        timed-out call keeps running and must not add sources afterwards.
+        """
+        if context is None or (count == 1 and self.tool_timeout is None):
+            return [context] * count
+        return [context.fork() for _ in range(count)]
+
+    def _merge_contexts(
+        self,
+        context: Optional[QueryContext],
+        contexts: List[Optional[QueryContext]],
+        blocks: List[Any],
+        timed_out: List[bool],
+    ):
+        """Merge the calls that finished; record the timed-out ones as errors"""
+        if context is None:
+            return
+        for call_context, block, expired in zip(contexts, blocks, timed_out):
+            if expired:
+                context.record(
+                    ToolCallRecord(
+                        block.name,
+                        dict(block.input),
+                        self.tool_timeout,
+                        error=str(self._timeout_error(block)),
+                    )
+                )
+            elif call_context is not context:
+                context.merge(call_context)
+
+    def _timeout_error(self, block) -> TimeoutError:
+        return TimeoutError(
+            f"Tool '{block.name}' timed out after {self.tool_timeout:g}s"
+        )
+
+    def _default_tool_executor(self) -> ThreadPoolExecutor:
+        if self._tool_executor is None:
+            self._tool_executor = ThreadPoolExecutor(
+                max_workers=self.max_parallel_tools, thread_name_prefix="tool-call"
+            )
+        return self._tool_executor
+
+    async def _run_steps_async(
+        self,
+        steps: Generator,
+        tool_manager,
+        executor: Optional[Executor],
+        context: Optional[QueryContext] = None,
+    ) -> str:
+        """Drive _tool_rounds with awaited API calls and off-loop tool calls"""
+        try:
+            step = next(steps)
+            while True:
+                kind, payload = step
+                if kind == API_CALL:
+                    response = await self.async_client.messages.create(**payload)
+                    self._record_usage(context, response)
+                    step = steps.send(response)
+                else:
+                    step = steps.send(
+                        await self._arun_tools(tool_manager, payload, context, executor)
+                    )
+        except StopIteration as done:
+            return done.value
+
+    async def astream_response(
+        self,
+        query: str,
+        conversation_history: Optional[str] = None,
+        tools: Optional[List] = None,
+        tool_manager=None,
+        executor: Optional[Executor] = None,
+        context: Optional[QueryContext] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of agenerate_response.
+
+        Every API call uses the streaming API, so the final answer arrives
+        token by token. Yields event dicts:
+            {"type": "tool", "round": n, "name": ..., "input": {...}}
+                before each tool call
+            {"type": "text", "text": delta} for answer text
+            {"type": "reset"} when the text streamed so far came from a turn
+                that went on to call tools and should be discarded
+            {"type": "done", "answer": text} last, with the full answer
+
+        Args:
+            query: The user's question or request
+            conversation_history: Previous messages for context
+            tools: Available tools the AI can use
+            tool_manager: Manager to execute tools
+            executor: Executor for tool calls (default: the loop's executor)
+            context: Per-query context passed to every tool call
+        """
+        api_params = self._build_params(query, conversation_history, tools)
+
+        response = None
+        async for event in self._stream_call(api_params, context):
+            if event["type"] == "message":
+                response = event["message"]
+            else:
+                yield event
+
+        if not (response.stop_reason == "tool_use" and tool_manager):
+            yield {"type": "done", "answer": self._response_text(response)}
+            return
+
+        steps = self._tool_rounds(response, api_params, max_rounds=2)
+        api_calls = 1
+        try:
+            step = next(steps)
+            while True:
+                kind, payload = step
+                if kind == API_CALL:
+                    api_calls += 1
+                    async for event in self._stream_call(payload, context):
+                        if event["type"] == "message":
+                            response = event["message"]
+                        else:
+                            yield event
+                    step = steps.send(response)
+                    continue
+                for block in payload:
+                    yield {
+                        "type": "tool",
+                        "round": api_calls,
+                        "name": block.name,
+                        "input": block.input,
+                    }
+                step = steps.send(
+                    await self._arun_tools(tool_manager, payload, context, executor)
+                )
+        except StopIteration as done:
+            yield {"type": "done", "answer": done.value}
+
+    async def _stream_call(
+        self, params: Dict[str, Any], context: Optional[QueryContext] = None
+    ) -> AsyncIterator[Dict]:
+        """Stream one API call: text events, then {"type": "message"}"""
+        streamed_text = False
+        async with self.async_client.messages.stream(**params) as stream:
+            async for text in stream.text_stream:
+                streamed_text = True
+                yield {"type": "text", "text": text}
+            message = await stream.get_final_message()
+        self._record_usage(context, message)
+        if streamed_text and message.stop_reason == "tool_use":
+            yield {"type": "reset"}
+        yield {"type": "message", "message": message}
+
+    @staticmethod
+    def _tool_call(
+        tool_manager, block, context: Optional[QueryContext]
+    ) -> Callable[[], str]:
+        """Bind a tool_use block to tool_manager.execute_tool"""
+        if context is None:
+            return functools.partial(
+                tool_manager.execute_tool, block.name, **block.input
+            )
+        return functools.partial(
+            tool_manager.execute_tool, block.name, context=context, **block.input
+        )
+
+    @staticmethod
+    def _tool_results(
+        blocks: List[Any], outcomes: List[Any]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """tool_result blocks in tool_use order, and whether any call failed"""
+        tool_results = []
+        failed = False
+        for block, outcome in zip(blocks, outcomes):
+            if isinstance(outcome, Exception):
+                failed = True
+                tool_results.append(
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": block.id,
+                        "content": f"Tool execution failed: {str(outcome)}",
+                        "is_error": True,
+                    }
+                )
+            else:
+                tool_results.append(
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": block.id,
+                        "content": outcome,
+                    }
+                )
+        return tool_results, failed
+
+    def _tool_rounds(
+        self, initial_response, base_params: Dict[str, Any], max_rounds: int
+    ) -> Generator[Tuple[str, Any], Any, str]:
+        """
+        Multi-round tool protocol, independent of how calls are made.
+
+        Yields (API_CALL, params) and (TOOL_CALLS, tool_use_blocks) steps.
+        The driver sends back the API response, or one outcome per block (the
+        result or the exception raised), so the sync and async paths share
+        one implementation. Returns the final response text.
+        """
         # Initialize tracking
         current_round = 0
         messages = base_params["messages"].copy()  # Start with initial user message
@@ -145,37 +620,14 @@ Provide only the direct answer to what was asked.
             # STEP 1: Add assistant's tool_use response to messages
             messages.append({"role": "assistant", "content": current_response.content})
 
-            # STEP 2: Execute all tool calls in this response
-            tool_results = []
-            tool_execution_failed = False
-
-            for content_block in current_response.content:
-                if content_block.type == "tool_use":
-                    try:
-                        tool_result = tool_manager.execute_tool(
-                            content_block.name, **content_block.input
-                        )
-
-                        tool_results.append(
-                            {
-                                "type": "tool_result",
-                                "tool_use_id": content_block.id,
-                                "content": tool_result,
-                            }
-                        )
-                    except Exception as e:
-                        # Tool execution failed - terminate immediately
-                        tool_execution_failed = True
-                        error_msg = f"Tool execution failed: {str(e)}"
-                        tool_results.append(
-                            {
-                                "type": "tool_result",
-                                "tool_use_id": content_block.id,
-                                "content": error_msg,
-                                "is_error": True,
-                            }
-                        )
-                        break
+            # STEP 2: Execute all tool calls in this response (concurrently)
+            tool_uses = [
+                block for block in current_response.content if block.type == "tool_use"
+            ]
+            outcomes = yield TOOL_CALLS, tool_uses
+            tool_results, tool_execution_failed = self._tool_results(
+                tool_uses, outcomes
+            )
 
             # TERMINATION CHECK 1: Tool execution failed
             if tool_execution_failed:
@@ -190,7 +642,7 @@ Provide only the direct answer to what was asked.
                     "system": base_params["system"],
                     # NO tools parameter
                 }
-                final_response = self.client.messages.create(**final_params)
+                final_response = yield API_CALL, final_params
                 return final_response.content[0].text
 
             # STEP 3: Add tool results to messages
@@ -215,7 +667,7 @@ Provide only the direct answer to what was asked.
             # else: No tools - forces final response
 
             # Make API call
-            current_response = self.client.messages.create(**next_params)
+            current_response = yield API_CALL, next_params
 
             # TERMINATION CHECK 2: No tool_use in response
             if current_response.stop_reason != "tool_use":
@@ -230,31 +682,14 @@ Provide only the direct answer to what was asked.
                     {"role": "assistant", "content": current_response.content}
                 )
 
-                # Execute the final tool calls
-                final_tool_results = []
-                for content_block in current_response.content:
-                    if content_block.type == "tool_use":
-                        try:
-                            tool_result = tool_manager.execute_tool(
-                                content_block.name, **content_block.input
-                            )
-                            final_tool_results.append(
-                                {
-                                    "type": "tool_result",
-                                    "tool_use_id": content_block.id,
-                                    "content": tool_result,
-                                }
-                            )
-                        except Exception as e:
-                            # Tool failed on last round - include error
-                            final_tool_results.append(
-                                {
-                                    "type": "tool_result",
-                                    "tool_use_id": content_block.id,
-                                    "content": f"Tool execution failed: {str(e)}",
-                                    "is_error": True,
-                                }
-                            )
+                # Execute the final tool calls; failures are reported to Claude
+                tool_uses = [
+                    block
+                    for block in current_response.content
+                    if block.type == "tool_use"
+                ]
+                outcomes = yield TOOL_CALLS, tool_uses
+                final_tool_results, _ = self._tool_results(tool_uses, outcomes)
 
                 if final_tool_results:
                     messages.append({"role": "user", "content": final_tool_results})
@@ -265,7 +700,7 @@ Provide only the direct answer to what was asked.
                     "messages": messages,
                     "system": base_params["system"],
                 }
-                final_response = self.client.messages.create(**final_params)
+                final_response = yield API_CALL, final_params
                 return final_response.content[0].text
 
         # Should never reach here, but safety fallback
@@ -0,0 +1,178 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+NUMBER_PATTERN = re.compile(r"\d+")
+
+
+@dataclass
+class CachedAnswer:
+    """An answer stored in the SemanticAnswerCache"""
+
+    query: str
+    answer: str
+    sources: List[Dict[str, Any]]
+    similarity: float = 1.0  # Cosine similarity to the query that found it
+
+
+@dataclass
+class _Entry:
+    query: str
+    vector: np.ndarray  # Unit-length query embedding
+    numbers: Tuple[str, ...]
+    answer: str
+    sources: List[Dict[str, Any]]
+    expires: float
+
+
+class SemanticAnswerCache:
+    """
+    Answers to standalone questions, looked up by query embedding.
+
+    A query is a hit when an unexpired entry's embedding has cosine
+    similarity >= threshold and the same numbers ("lesson 1" and "lesson 2"
+    embed almost identically). Entries are evicted least recently used
+    beyond max_size and dropped wholesale when corpus_version changes.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Any],
+        corpus_version: Callable[[], int],
+        threshold: float = 0.95,
+        max_size: int = 256,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._embed = embed
+        self._corpus_version = corpus_version
+        self.threshold = threshold
+        self.max_size = max(0, max_size)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split()).casefold()
+
+    def _vector(self, query: str) -> np.ndarray:
+        vector = np.asarray(self._embed(query), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _check_version(self, version: int):
+        """Drop every entry if the corpus changed; call with the lock held"""
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def corpus_version(self) -> int:
+        """Version to pass to put() for an answer computed from now on"""
+        return self._corpus_version()
+
+    def get(self, query: str) -> Optional[CachedAnswer]:
+        """
+        Look up a cached answer for a query.
+
+        Args:
+            query: The user's question
+
+        Returns:
+            The best matching CachedAnswer, or None on a miss
+        """
+        key = self.normalize(query)
+        if not self.max_size or not key:
+            return None
+        vector = self._vector(key)
+        numbers = tuple(NUMBER_PATTERN.findall(key))
+        now = self._clock()
+
+        with self._lock:
+            self._check_version(self.corpus_version())
+            best, best_similarity = None, self.threshold
+            for entry_key, entry in list(self._entries.items()):
+                if entry.expires <= now:
+                    del self._entries[entry_key]
+                    continue
+                if entry.numbers != numbers:
+                    continue
+                similarity = float(np.dot(vector, entry.vector))
+                if similarity >= best_similarity:
+                    best, best_similarity = entry, similarity
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(self.normalize(best.query))
+            self.hits += 1
+            return CachedAnswer(
+                best.query, best.answer, list(best.sources), best_similarity
+            )
+
+    def put(
+        self,
+        query: str,
+        answer: str,
+        sources: List[Dict[str, Any]],
+        version: int,
+    ):
+        """
+        Store an answer.
+
+        Args:
+            query: The user's question
+            answer: The generated answer
+            sources: Sources cited by the answer
+            version: corpus_version() read before the answer was generated;
+                the answer is discarded if the corpus has changed since
+        """
+        key = self.normalize(query)
+        if not self.max_size or not key or not answer:
+            return
+        vector = self._vector(key)
+
+        with self._lock:
+            self._check_version(self.corpus_version())
+            if version != self._version:
+                return
+            self._entries[key] = _Entry(
+                query=query,
+                vector=vector,
+                numbers=tuple(NUMBER_PATTERN.findall(key)),
+                answer=answer,
+                sources=list(sources),
+                expires=self._clock() + self.ttl_seconds,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+    def clear(self):
+        """Drop all cached answers (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
@@ -2,13 +2,15 @@ import warnings
 
 warnings.filterwarnings("ignore", message="resource_tracker: There appear to be.*")
 
+import json
 import os
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from config import config
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from rag_system import RAGSystem
@@ -73,10 +75,10 @@ async def query_documents(request: QueryRequest):
         # Create session if not provided
         session_id = request.session_id
         if not session_id:
-            session_id = rag_system.session_manager.create_session()
+            session_id = await rag_system.acreate_session()
 
-        # Process query using RAG system
-        answer, sources = rag_system.query(request.query, session_id)
+        # Process query using RAG system without blocking the event loop
+        answer, sources = await rag_system.aquery(request.query, session_id)
 
         # Convert source dicts to SourceItem objects
         source_items = [SourceItem(**s) for s in sources] if sources else []
@@ -86,6 +88,41 @@ async def query_documents(request: QueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/query/stream")
+async def stream_query(request: QueryRequest):
+    """
+    Process a query and stream the answer as Server-Sent Events.
+
+    Events, in order: session, any number of tool/text/reset, sources, done.
+    An error event replaces the rest of the stream if the query fails.
+    """
+    session_id = request.session_id
+    if not session_id:
+        session_id = await rag_system.acreate_session()
+
+    async def events():
+        yield sse_event("session", {"session_id": session_id})
+        try:
+            async for event in rag_system.astream_query(request.query, session_id):
+                yield sse_event(event.pop("type"), event)
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+            return
+        yield sse_event("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/courses", response_model=CourseStats)
 async def get_course_stats():
     """Get course analytics and statistics"""
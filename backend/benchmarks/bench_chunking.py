@@ -0,0 +1,138 @@
+"""
+Micro-benchmark for DocumentProcessor.chunk_text
+
+Compares the linear-time chunker against the previous implementation, which
+rebuilt each chunk and walked backwards to compute overlap, and checks that
+both produce byte-identical chunks.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_chunking [--repeat N]
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_processor import DocumentProcessor
+
+DOCS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docs",
+)
+
+
+def legacy_chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """Reference copy of the chunker before the prefix-sum rewrite"""
+    text = re.sub(r"\s+", " ", text.strip())
+    sentence_endings = re.compile(
+        r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])"
+    )
+    sentences = sentence_endings.split(text)
+    sentences = [s.strip() for s in sentences if s.strip()]
+
+    chunks = []
+    i = 0
+
+    while i < len(sentences):
+        current_chunk = []
+        current_size = 0
+
+        for j in range(i, len(sentences)):
+            sentence = sentences[j]
+            space_size = 1 if current_chunk else 0
+            total_addition = len(sentence) + space_size
+            if current_size + total_addition > chunk_size and current_chunk:
+                break
+            current_chunk.append(sentence)
+            current_size += total_addition
+
+        if current_chunk:
+            chunks.append(" ".join(current_chunk))
+
+            if chunk_overlap > 0:
+                overlap_size = 0
+                overlap_sentences = 0
+                for k in range(len(current_chunk) - 1, -1, -1):
+                    sentence_len = len(current_chunk[k]) + (
+                        1 if k < len(current_chunk) - 1 else 0
+                    )
+                    if overlap_size + sentence_len <= chunk_overlap:
+                        overlap_size += sentence_len
+                        overlap_sentences += 1
+                    else:
+                        break
+
+                next_start = i + len(current_chunk) - overlap_sentences
+                i = max(next_start, i + 1)
+            else:
+                i += len(current_chunk)
+        else:
+            i += 1
+
+    return chunks
+
+
+def load_corpus() -> List[str]:
+    """Load the course scripts plus a long lesson made of short sentences"""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(DOCS_PATH, "course*_script.txt"))):
+        with open(path, "r", encoding="utf-8") as file:
+            texts.append(file.read())
+    # Worst case for the old chunker: many short sentences per chunk
+    texts.append(" ".join(f"Step {i} is done." for i in range(20000)))
+    return texts
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Return the fastest of `repeat` runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=800)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(args.chunk_size, args.chunk_overlap)
+    texts = load_corpus()
+
+    for text in texts:
+        expected = legacy_chunk_text(text, args.chunk_size, args.chunk_overlap)
+        if processor.chunk_text(text) != expected:
+            raise SystemExit("Chunk output differs from the legacy implementation")
+
+    print(
+        f"{'input':<24}{'chars':>10}{'legacy ms':>12}{'linear ms':>12}{'speedup':>10}"
+    )
+    labels = [
+        os.path.basename(p)
+        for p in sorted(glob.glob(os.path.join(DOCS_PATH, "course*_script.txt")))
+    ]
+    labels.append("short-sentences")
+    for label, text in zip(labels, texts):
+        legacy = best_time(
+            lambda: legacy_chunk_text(text, args.chunk_size, args.chunk_overlap),
+            args.repeat,
+        )
+        linear = best_time(lambda: processor.chunk_text(text), args.repeat)
+        print(
+            f"{label:<24}{len(text):>10}{legacy * 1000:>12.2f}"
+            f"{linear * 1000:>12.2f}{legacy / linear:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Load test for POST /api/query against a stubbed LLM
+
+Fires N concurrent clients at the real FastAPI app (in-process, over ASGI)
+with ChromaDB, the embedding model and the Anthropic API replaced by stubs
+that sleep for a fixed latency. Runs once with the endpoint calling the
+blocking RAGSystem.query, as it used to, and once with RAGSystem.aquery.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_concurrency [--clients N] [--llm-latency S]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from vector_store import SearchResults
+
+
+@dataclass
+class Block:
+    type: str
+    text: str = ""
+    name: str = ""
+    id: str = ""
+    input: dict = field(default_factory=dict)
+
+
+@dataclass
+class Response:
+    content: List[Block]
+    stop_reason: str
+
+
+def stub_response(params: dict) -> Response:
+    """First call asks for a search, the follow-up answers"""
+    if len(params["messages"]) == 1:
+        block = Block("tool_use", name="search_course_content", id="t1")
+        block.input = {"query": "stub"}
+        return Response([block], "tool_use")
+    return Response([Block("text", text="stub answer")], "end_turn")
+
+
+class BlockingMessages:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def create(self, **params):
+        time.sleep(self.latency)
+        return stub_response(params)
+
+
+class AsyncMessages:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def create(self, **params):
+        await asyncio.sleep(self.latency)
+        return stub_response(params)
+
+
+def stub_search(latency: float):
+    def search(query, course_name=None, lesson_number=None, limit=None):
+        time.sleep(latency)  # Embedding + ANN query
+        return SearchResults(["stub chunk"], [{"course_title": "Stub"}], [0.1])
+
+    return search
+
+
+async def run_clients(app, clients: int) -> List[float]:
+    """Send one query per client at once; return each one's time to answer"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        # All clients arrive together; time spent queued behind a blocked
+        # event loop counts towards their latency
+        start = time.perf_counter()
+
+        async def one(i: int) -> float:
+            response = await c.post("/api/query", json={"query": f"question {i}"})
+            response.raise_for_status()
+            return time.perf_counter() - start
+
+        return await asyncio.gather(*(one(i) for i in range(clients)))
+
+
+def report(label: str, latencies: List[float], wall: float):
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(
+        f"{label:<10}{wall:>10.2f}{len(latencies) / wall:>10.1f}"
+        f"{statistics.median(latencies):>10.2f}{p95:>10.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--search-latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with (
+        patch("chromadb.PersistentClient"),
+        patch(
+            "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction"
+        ),
+    ):
+        import app as app_module
+
+    rag = app_module.rag_system
+    rag.vector_store.search = stub_search(args.search_latency)
+    rag.ai_generator.client.messages = BlockingMessages(args.llm_latency)
+    rag.ai_generator.async_client.messages = AsyncMessages(args.llm_latency)
+
+    print(
+        f"{args.clients} clients, LLM latency {args.llm_latency}s per call "
+        f"(2 calls per query)"
+    )
+    print(f"{'mode':<10}{'wall s':>10}{'req/s':>10}{'p50 s':>10}{'p95 s':>10}")
+
+    async def blocking_aquery(query, session_id=None):
+        return rag.query(query, session_id)  # What the endpoint used to do
+
+    async_aquery = rag.aquery
+    for label, aquery in (("blocking", blocking_aquery), ("async", async_aquery)):
+        rag.aquery = aquery
+        start = time.perf_counter()
+        latencies = asyncio.run(run_clients(app_module.app, args.clients))
+        report(label, latencies, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Embedding backends compared: sentence-transformers vs. ONNX Runtime (fp32/int8)
+
+Each backend runs in its own process, so load time and RSS include
+everything it imports (PyTorch for sentence-transformers). Every backend
+embeds the eval queries one at a time, as searches do (RSS is taken here),
+then the chunks in docs/ in batches, as ingestion does (peak RSS). The
+ONNX outputs are checked against the sentence-transformers vectors:
+largest absolute difference, lowest cosine similarity, and the share of
+each query's top-5 chunks that stays the same.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_embeddings [--model all-MiniLM-L6-v2]
+    python -m benchmarks.bench_embeddings --onnx-files onnx/model.onnx \\
+        onnx/model_quint8_avx2.onnx
+"""
+
+import argparse
+import glob
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.eval_hybrid import LABELLED_QUERIES
+
+DOCS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docs",
+)
+
+
+def load_texts() -> List[str]:
+    from document_processor import DocumentProcessor
+
+    processor = DocumentProcessor(800, 100)
+    chunks = []
+    for path in sorted(glob.glob(os.path.join(DOCS_PATH, "*.txt"))):
+        _, course_chunks = processor.process_course_document(path)
+        chunks.extend(chunk.content for chunk in course_chunks)
+    return chunks
+
+
+def measure(args):
+    """Child process: load one backend, embed, write vectors and timings"""
+    start = time.perf_counter()
+    if args.backend == "sentence-transformers":
+        from chromadb.utils.embedding_functions import (
+            SentenceTransformerEmbeddingFunction,
+        )
+
+        embed = SentenceTransformerEmbeddingFunction(model_name=args.model)
+    else:
+        from onnx_embedding import OnnxEmbeddingFunction
+
+        embed = OnnxEmbeddingFunction(args.model, args.backend)
+    embed(["warm up"])
+    load_seconds = time.perf_counter() - start
+
+    queries = [query for query, _ in LABELLED_QUERIES]
+    latencies = []
+    for _ in range(args.repeat):
+        for query in queries:
+            start = time.perf_counter()
+            embed([query])
+            latencies.append((time.perf_counter() - start) * 1000)
+    query_vectors = np.asarray(embed(queries), dtype=np.float32)
+    # Peak so far: a server that only embeds queries
+    query_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    chunks = load_texts()
+    start = time.perf_counter()
+    chunk_vectors = np.concatenate(
+        [
+            np.asarray(embed(chunks[i : i + 64]), dtype=np.float32)
+            for i in range(0, len(chunks), 64)
+        ]
+    )
+    ingest_seconds = time.perf_counter() - start
+
+    np.savez(args.output, queries=query_vectors, chunks=chunk_vectors)
+    report = {
+        "load_s": load_seconds,
+        "query_p50_ms": statistics.median(latencies),
+        "query_p95_ms": float(np.percentile(latencies, 95)),
+        "chunks_per_s": len(chunks) / ingest_seconds,
+        "query_rss_mib": query_rss,
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "torch_loaded": "torch" in sys.modules,
+    }
+    print(json.dumps(report))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument(
+        "--onnx-files",
+        nargs="+",
+        default=["onnx/model.onnx", "onnx/model_quint8_avx2.onnx"],
+    )
+    parser.add_argument("--repeat", type=int, default=4, help="Passes over queries")
+    parser.add_argument("--backend", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        measure(args)
+        return
+
+    backends = ["sentence-transformers"] + args.onnx_files
+    reports, vectors = {}, {}
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in backends:
+            output = os.path.join(directory, f"{len(reports)}.npz")
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.bench_embeddings",
+                    "--model",
+                    args.model,
+                    "--repeat",
+                    str(args.repeat),
+                    "--backend",
+                    backend,
+                    "--output",
+                    output,
+                ],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                print(f"{backend} failed:\n{result.stderr.strip()[-2000:]}")
+                continue
+            reports[backend] = json.loads(result.stdout.strip().splitlines()[-1])
+            with np.load(output) as data:
+                vectors[backend] = (data["queries"], data["chunks"])
+
+    print(
+        f"{'backend':<30}{'load s':>7}{'p50 ms':>8}{'p95 ms':>8}{'chunks/s':>9}"
+        f"{'RSS MiB':>9}{'peak':>6}{'torch':>6}"
+        f"{'max diff':>10}{'min cos':>9}{'top-5':>7}"
+    )
+    reference = vectors.get("sentence-transformers")
+    for backend, report in reports.items():
+        row = (
+            f"{backend:<30}{report['load_s']:>7.1f}{report['query_p50_ms']:>8.2f}"
+            f"{report['query_p95_ms']:>8.2f}{report['chunks_per_s']:>9.0f}"
+            f"{report['query_rss_mib']:>9.0f}{report['peak_rss_mib']:>6.0f}"
+            f"{str(report['torch_loaded']):>6}"
+        )
+        if reference is not None:
+            queries, chunks = vectors[backend]
+            both = np.concatenate([queries, chunks])
+            expected = np.concatenate(reference)
+            cosines = (both * expected).sum(axis=1) / (
+                np.linalg.norm(both, axis=1) * np.linalg.norm(expected, axis=1)
+            )
+            # Same top-5 chunks per query as with the reference vectors
+            top = np.argsort(-(queries @ chunks.T), axis=1)[:, :5]
+            expected_top = np.argsort(-(reference[0] @ reference[1].T), axis=1)[:, :5]
+            agreement = statistics.mean(
+                len(set(a) & set(b)) / 5 for a, b in zip(top, expected_top)
+            )
+            row += (
+                f"{np.abs(both - expected).max():>10.1e}{cosines.min():>9.5f}"
+                f"{agreement:>7.2f}"
+            )
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Query latency of the course content backends: Chroma vs. NumPy flat/IVF
+
+Loads the same vectors and course/lesson metadata into a Chroma collection
+(persistent, in a temporary directory) and into NumpyContentIndex, with and
+without IVF lists, then times the three query shapes VectorStore sends:
+unfiltered, by course, and by course and lesson. Recall is measured against
+the exact NumPy results. Vectors are synthetic topic clusters by default so
+the benchmark runs without the embedding model; pass --docs to embed the
+chunks in docs/ instead.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_vector_backends [--rows 20000] [--queries 200]
+    python -m benchmarks.bench_vector_backends --docs
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numpy_index import NumpyContentIndex
+
+DOCS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docs",
+)
+
+
+def synthetic_corpus(rows: int, dim: int, courses: int, seed: int = 0):
+    """Unit vectors around one center per lesson, like topic embeddings"""
+    rng = np.random.default_rng(seed)
+    lessons_per_course = 8
+    centers = rng.standard_normal((courses * lessons_per_course, dim))
+    labels = rng.integers(0, len(centers), rows)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((rows, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    metadatas = [
+        {
+            "course_title": f"Course {label // lessons_per_course}",
+            "lesson_number": int(label % lessons_per_course),
+            "chunk_index": i,
+        }
+        for i, label in enumerate(labels)
+    ]
+    documents = [f"chunk {i}" for i in range(rows)]
+    return documents, metadatas, vectors.astype(np.float32)
+
+
+def docs_corpus(model_name: str):
+    from document_processor import DocumentProcessor
+    from sentence_transformers import SentenceTransformer
+
+    processor = DocumentProcessor(800, 100)
+    documents, metadatas = [], []
+    for path in sorted(glob.glob(os.path.join(DOCS_PATH, "*.txt"))):
+        _, chunks = processor.process_course_document(path)
+        for chunk in chunks:
+            documents.append(chunk.content)
+            metadatas.append(
+                {
+                    "course_title": chunk.course_title,
+                    "lesson_number": chunk.lesson_number,
+                    "chunk_index": chunk.chunk_index,
+                }
+            )
+    vectors = SentenceTransformer(model_name).encode(documents, batch_size=64)
+    return documents, metadatas, np.asarray(vectors, dtype=np.float32)
+
+
+def query_shapes(metadatas: List[Dict], rng) -> List[Tuple[str, Optional[Dict]]]:
+    sample = metadatas[int(rng.integers(len(metadatas)))]
+    return [
+        ("unfiltered", None),
+        ("course", {"course_title": sample["course_title"]}),
+        (
+            "course+lesson",
+            {
+                "$and": [
+                    {"course_title": sample["course_title"]},
+                    {"lesson_number": sample["lesson_number"]},
+                ]
+            },
+        ),
+    ]
+
+
+def time_queries(
+    query: Callable, queries: np.ndarray, where: Optional[Dict], limit: int
+) -> Tuple[List[float], List[List[str]]]:
+    latencies, results = [], []
+    for vector in queries:
+        start = time.perf_counter()
+        result = query(query_embeddings=[vector.tolist()], n_results=limit, where=where)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(result["ids"][0])
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--ivf-lists", type=int, default=64)
+    parser.add_argument("--ivf-probes", type=int, default=8)
+    parser.add_argument("--docs", action="store_true", help="Embed docs/ instead")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    if args.docs:
+        documents, metadatas, vectors = docs_corpus(args.model)
+    else:
+        documents, metadatas, vectors = synthetic_corpus(
+            args.rows, args.dim, args.courses
+        )
+    ids = [f"chunk_{i}" for i in range(len(documents))]
+    rng = np.random.default_rng(1)
+    noise = 0.3 * rng.standard_normal((args.queries, vectors.shape[1]))
+    queries = (vectors[rng.integers(len(vectors), size=args.queries)] + noise).astype(
+        np.float32
+    )
+    shapes = query_shapes(metadatas, rng)
+    print(f"{len(ids)} chunks x {vectors.shape[1]} dims, {args.queries} queries")
+
+    import chromadb
+    from chromadb.config import Settings
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends: Dict[str, Callable] = {}
+        load_seconds: Dict[str, float] = {}
+
+        start = time.perf_counter()
+        client = chromadb.PersistentClient(
+            path=os.path.join(directory, "chroma"),
+            settings=Settings(anonymized_telemetry=False),
+        )
+        collection = client.get_or_create_collection("course_content")
+        batch = client.get_max_batch_size()
+        for i in range(0, len(ids), batch):
+            collection.add(
+                ids=ids[i : i + batch],
+                documents=documents[i : i + batch],
+                metadatas=metadatas[i : i + batch],
+                embeddings=vectors[i : i + batch],
+            )
+        load_seconds["chroma"] = time.perf_counter() - start
+        backends["chroma"] = collection.query
+
+        for name, lists in [("numpy flat", 0), ("numpy ivf", args.ivf_lists)]:
+            start = time.perf_counter()
+            index = NumpyContentIndex(
+                os.path.join(directory, name.replace(" ", "_")),
+                ivf_lists=lists,
+                ivf_probes=args.ivf_probes,
+            )
+            for i in range(0, len(ids), 1024):
+                index.add(
+                    documents[i : i + 1024],
+                    metadatas[i : i + 1024],
+                    ids[i : i + 1024],
+                    vectors[i : i + 1024],
+                )
+            load_seconds[name] = time.perf_counter() - start
+            backends[name] = index.query
+
+        print(
+            "load: "
+            + ", ".join(
+                f"{name} {seconds:.1f}s" for name, seconds in load_seconds.items()
+            )
+        )
+        print(f"{'backend':<12}{'filter':<15}{'p50 ms':>8}{'p95 ms':>8}{'recall':>8}")
+        for shape, where in shapes:
+            exact = None
+            rows = []
+            for name, query in backends.items():
+                # Warm up caches and lazily built structures
+                query(query_embeddings=[queries[0].tolist()], n_results=1, where=where)
+                latencies, results = time_queries(query, queries, where, args.limit)
+                if name == "numpy flat":
+                    exact = results
+                rows.append((name, latencies, results))
+            for name, latencies, results in rows:
+                recall = statistics.mean(
+                    len(set(found) & set(expected)) / max(1, len(expected))
+                    for found, expected in zip(results, exact)
+                )
+                p95 = np.percentile(latencies, 95)
+                print(
+                    f"{name:<12}{shape:<15}{statistics.median(latencies):>8.2f}"
+                    f"{p95:>8.2f}{recall:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Offline retrieval eval: embedding vs. BM25 vs. hybrid (reciprocal rank fusion)
+
+Chunks the scripts in docs/ like the app does, then runs a labelled set of
+queries. Each query names the text a relevant chunk must contain; most are
+exact terms (identifiers, acronyms, jargon) that embeddings tend to miss,
+the rest are paraphrases where the embedding ranking should carry the
+fusion. Reports recall@k and MRR per method, plus the lexical index's
+build time, file size and load time.
+
+Usage (from the backend directory):
+    python -m benchmarks.eval_hybrid [--k 5] [--model all-MiniLM-L6-v2]
+    python -m benchmarks.eval_hybrid --lexical-only   # no embedding model
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_processor import DocumentProcessor
+from lexical_index import LexicalIndex, reciprocal_rank_fusion
+
+DOCS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docs",
+)
+
+# (query, text a relevant chunk contains, case-insensitive)
+LABELLED_QUERIES: List[Tuple[str, str]] = [
+    # Exact terms
+    ("What is research_server used for?", "research_server"),
+    ("What is in custom_utils?", "custom_utils"),
+    ("How is cache_creation_input_tokens reported?", "cache_creation"),
+    ("What does input_tokens count?", "input_token"),
+    ("Which transport uses server-sent events?", "server-sent"),
+    ("Does MCP support OAUTH?", "OAUTH"),
+    ("Where does SQLite come up?", "SQLite"),
+    ("Why is the image encoded as UTF-8?", "UTF-8"),
+    ("How does the model perform a left-click?", "left-click"),
+    ("What is a post-filter in vector search?", "post-filter"),
+    ("What is n-shot prompting?", "n-shot"),
+    ("Which tool searches arXiv?", "arXiv"),
+    ("What is the airbnb dataset?", "airbnb"),
+    ("How is pymongo used?", "pymongo"),
+    ("What is HyDE?", "HyDE"),
+    ("How does UMAP help with embeddings?", "UMAP"),
+    ("What does a cross encoder score?", "cross encoder"),
+    ("How do I configure Claude Desktop?", "Claude Desktop"),
+    ("Does it run inside Docker?", "Docker"),
+    ("When should I use Haiku?", "Haiku"),
+    # Paraphrases
+    ("How can a query be expanded with generated answers?", "query expansion"),
+    ("Which results are irrelevant to the question?", "distractor"),
+    ("How can repeated prompt prefixes be reused to save cost?", "prompt caching"),
+    ("How do I limit which fields a database query returns?", "projection"),
+    ("How does the model see the screen?", "screenshot"),
+]
+
+
+def load_chunks() -> Tuple[List[str], List[str], List[Dict]]:
+    processor = DocumentProcessor(800, 100)
+    ids, documents, metadatas = [], [], []
+    for path in sorted(glob.glob(os.path.join(DOCS_PATH, "*.txt"))):
+        course, chunks = processor.process_course_document(path)
+        for chunk in chunks:
+            ids.append(f"{course.title.replace(' ', '_')}_{chunk.chunk_index}")
+            documents.append(chunk.content)
+            metadatas.append(
+                {
+                    "course_title": chunk.course_title,
+                    "lesson_number": chunk.lesson_number,
+                }
+            )
+    return ids, documents, metadatas
+
+
+def dense_ranker(model_name: str, documents: List[str], ids: List[str]):
+    """Exact cosine ranking over all chunks, standing in for Chroma"""
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name)
+    matrix = model.encode(documents, batch_size=64, normalize_embeddings=True)
+
+    def rank(query: str, k: int) -> List[str]:
+        vector = model.encode([query], normalize_embeddings=True)[0]
+        scores = matrix @ vector
+        return [ids[i] for i in np.argsort(-scores)[:k]]
+
+    return rank
+
+
+def evaluate(
+    rank: Callable[[str, int], List[str]],
+    relevant: Dict[str, set],
+    k: int,
+    verbose: bool,
+    name: str,
+) -> Tuple[float, float]:
+    hits = 0
+    reciprocal_ranks = 0.0
+    for query, _ in LABELLED_QUERIES:
+        ranked = rank(query, k)
+        position = next(
+            (i for i, chunk_id in enumerate(ranked, 1) if chunk_id in relevant[query]),
+            None,
+        )
+        if position:
+            hits += 1
+            reciprocal_ranks += 1 / position
+        if verbose and not position:
+            print(f"  {name:<8} missed {query!r}")
+    return hits / len(LABELLED_QUERIES), reciprocal_ranks / len(LABELLED_QUERIES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--candidates", type=int, default=20, help="Fused per side")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--lexical-only", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="Show misses")
+    args = parser.parse_args()
+
+    ids, documents, metadatas = load_chunks()
+    relevant = {
+        query: {
+            chunk_id
+            for chunk_id, document in zip(ids, documents)
+            if needle.lower() in document.lower()
+        }
+        for query, needle in LABELLED_QUERIES
+    }
+    unanswerable = [query for query, chunks in relevant.items() if not chunks]
+    if unanswerable:
+        sys.exit(f"No chunk contains the answer to: {unanswerable}")
+
+    start = time.perf_counter()
+    index = LexicalIndex()
+    index.add(ids, documents, metadatas)
+    index.search("warm up", 1)
+    build_seconds = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "lexical_index.npz")
+        index.save(path)
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        LexicalIndex(path).search("warm up", 1)
+        load_seconds = time.perf_counter() - start
+    print(
+        f"{len(ids)} chunks, {len(LABELLED_QUERIES)} queries; lexical index "
+        f"built in {build_seconds * 1000:.0f} ms, {size / 1024:.0f} KiB on disk, "
+        f"loaded in {load_seconds * 1000:.1f} ms"
+    )
+
+    def lexical(query: str, k: int) -> List[str]:
+        return [chunk_id for chunk_id, _ in index.search(query, k)]
+
+    rankers: Dict[str, Callable[[str, int], List[str]]] = {"bm25": lexical}
+    dense: Optional[Callable[[str, int], List[str]]] = None
+    if not args.lexical_only:
+        dense = dense_ranker(args.model, documents, ids)
+        rankers["dense"] = dense
+
+        def hybrid(query: str, k: int) -> List[str]:
+            candidates = max(k, args.candidates)
+            return reciprocal_rank_fusion(
+                [dense(query, candidates), lexical(query, candidates)]
+            )[:k]
+
+        rankers["hybrid"] = hybrid
+
+    for name, rank in rankers.items():
+        recall, mrr = evaluate(rank, relevant, args.k, args.verbose, name)
+        print(f"{name:<8} recall@{args.k} {recall:.2f}  MRR {mrr:.2f}")
+
+
+if __name__ == "__main__":
+    main()
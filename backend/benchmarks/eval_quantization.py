@@ -0,0 +1,123 @@
+"""
+Memory and recall of quantized NumPy content search against float32
+
+Embeds the chunks in docs/ (or builds synthetic topic clusters with
+--synthetic, which needs no embedding model), loads them into
+NumpyContentIndex with no quantization, float16 and int8, and compares
+each quantized index's top-k against the float32 one for queries near the
+stored chunks, with and without a course filter. Reports the resident
+vector bytes, the bytes saved, recall@k and query latency, for a few
+re-rank factors.
+
+Usage (from the backend directory):
+    python -m benchmarks.eval_quantization [--k 5] [--model all-MiniLM-L6-v2]
+    python -m benchmarks.eval_quantization --synthetic [--rows 100000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_vector_backends import docs_corpus, synthetic_corpus
+from numpy_index import NumpyContentIndex
+
+
+def run_queries(
+    index: NumpyContentIndex, queries: np.ndarray, where: Optional[Dict], k: int
+) -> Tuple[List[List[str]], float]:
+    index.query([queries[0]], 1, where=where)  # Warm up
+    results, latencies = [], []
+    for vector in queries:
+        start = time.perf_counter()
+        results.append(index.query([vector], k, where=where)["ids"][0])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--rerank-factors", default="1,2,4,8")
+    parser.add_argument("--synthetic", action="store_true", help="No model needed")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        documents, metadatas, vectors = synthetic_corpus(args.rows, args.dim, 20)
+    else:
+        documents, metadatas, vectors = docs_corpus(args.model)
+    ids = [f"chunk_{i}" for i in range(len(documents))]
+    rng = np.random.default_rng(1)
+    picks = rng.integers(len(vectors), size=args.queries)
+    scale = float(np.linalg.norm(vectors, axis=1).mean())
+    noise = 0.3 * scale / np.sqrt(vectors.shape[1])
+    queries = (
+        vectors[picks] + noise * rng.standard_normal((args.queries, vectors.shape[1]))
+    ).astype(np.float32)
+    course = {"course_title": metadatas[int(picks[0])]["course_title"]}
+    print(f"{len(ids)} chunks x {vectors.shape[1]} dims, {args.queries} queries")
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        def load(quantization: str, rerank_factor: int = 4) -> NumpyContentIndex:
+            path = os.path.join(directory, f"{quantization}_{rerank_factor}")
+            index = NumpyContentIndex(
+                path, quantization=quantization, rerank_factor=rerank_factor
+            )
+            for i in range(0, len(ids), 1024):
+                index.add(
+                    documents[i : i + 1024],
+                    metadatas[i : i + 1024],
+                    ids[i : i + 1024],
+                    vectors[i : i + 1024],
+                )
+            return index
+
+        exact = load("none")
+        baseline = {
+            name: run_queries(exact, queries, where, args.k)
+            for name, where in [("all", None), ("course", course)]
+        }
+        print(
+            f"{'vectors':<9}{'rerank':>7}{'MiB':>8}{'saved':>8}"
+            f"{'recall':>8}{'ms':>7}{'recall/course':>15}{'ms':>7}"
+        )
+        print(
+            f"{'float32':<9}{'-':>7}"
+            f"{exact.memory_stats()['vector_bytes'] / 2**20:>8.2f}{'-':>8}"
+            f"{1.0:>8.3f}{baseline['all'][1]:>7.2f}"
+            f"{1.0:>15.3f}{baseline['course'][1]:>7.2f}"
+        )
+        for quantization in ["float16", "int8"]:
+            for factor in [int(f) for f in args.rerank_factors.split(",")]:
+                index = load(quantization, factor)
+                stats = index.memory_stats()
+                row = (
+                    f"{quantization:<9}{factor:>7}"
+                    f"{stats['vector_bytes'] / 2**20:>8.2f}"
+                    f"{stats['saved_bytes'] / stats['float32_bytes']:>8.0%}"
+                )
+                for name, where in [("all", None), ("course", course)]:
+                    results, latency = run_queries(index, queries, where, args.k)
+                    recall = statistics.mean(
+                        len(set(found) & set(expected)) / max(1, len(expected))
+                        for found, expected in zip(results, baseline[name][0])
+                    )
+                    width = 8 if name == "all" else 15
+                    row += f"{recall:>{width}.3f}{latency:>7.2f}"
+                print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Offline precision/recall check for the outline query router
+
+Classifies a hand-labelled set of queries against the titles in docs/ and
+reports how many structure questions are answered without the LLM (recall)
+and how many routed queries really were structure questions about the
+right course (precision). A wrong route costs a bad answer while a missed
+one only costs latency, so precision is the number to keep at 1.0.
+
+Usage (from the backend directory):
+    python -m benchmarks.eval_router [--verbose]
+"""
+
+import argparse
+import glob
+import os
+import sys
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_index import CatalogIndex
+from course_resolver import CourseNameResolver
+from query_router import OUTLINE, QueryRouter
+
+DOCS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docs",
+)
+
+MCP = "MCP: Build Rich-Context AI Apps with Anthropic"
+CHROMA = "Advanced Retrieval for AI with Chroma"
+COMPUTER_USE = "Building Towards Computer Use with Anthropic"
+PROMPT = "Prompt Compression and Query Optimization"
+
+# (query, course the outline should be for, or None for the LLM path)
+LABELLED_QUERIES: List[Tuple[str, Optional[str]]] = [
+    ("What lessons are in the MCP course?", MCP),
+    ("which lessons does the chroma course have", CHROMA),
+    ("Show me the outline of the Computer Use course", COMPUTER_USE),
+    ("What is the outline of MCP?", MCP),
+    ("Give me the syllabus for prompt compression", PROMPT),
+    ("MCP course outline", MCP),
+    ("list all lessons in advanced retrieval", CHROMA),
+    ("What are the lessons in the MCP course", MCP),
+    ("what's the structure of the chroma course?", CHROMA),
+    ("Can you list the lessons of Prompt Compression and Query Optimization", PROMPT),
+    ("chroma syllabus", CHROMA),
+    ("tell me the lessons in building towards computer use", COMPUTER_USE),
+    # Structure questions about an ambiguous or unknown course
+    ("What lessons are in the Anthropic course?", None),
+    ("show me the outline of the RAG course", None),
+    # Content questions
+    ("What is MCP?", None),
+    ("What is covered in lesson 1 of the MCP course?", None),
+    ("what lessons in MCP cover tool use", None),
+    ("Explain the outline of a good prompt", None),
+    ("How do I write a course outline?", None),
+    ("Which lesson explains embeddings in the chroma course?", None),
+    ("What does the computer use course teach about screenshots?", None),
+    ("Compare the MCP and Chroma courses", None),
+    ("list the tools used in the MCP course", None),
+    ("What is query optimization?", None),
+]
+
+
+def load_titles() -> List[str]:
+    titles = []
+    for path in sorted(glob.glob(os.path.join(DOCS_PATH, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            first_line = f.readline()
+        if first_line.startswith("Course Title:"):
+            titles.append(first_line.split(":", 1)[1].strip())
+    return titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--verbose", action="store_true", help="Show every query")
+    args = parser.parse_args()
+
+    titles = load_titles()
+    catalog = CatalogIndex(lambda: [{"title": t} for t in titles])
+    # No embedding model here; the router never uses the semantic tier anyway
+    router = QueryRouter(CourseNameResolver(catalog, lambda name: None))
+
+    true_pos = false_pos = false_neg = 0
+    for query, expected in LABELLED_QUERIES:
+        decision = router.classify(query)
+        routed = decision.course_title if decision.route == OUTLINE else None
+        if routed and routed == expected:
+            true_pos += 1
+            verdict = "ok"
+        elif routed:
+            false_pos += 1
+            verdict = "WRONG ROUTE"
+        elif expected:
+            false_neg += 1
+            verdict = "missed"
+        else:
+            verdict = "ok"
+        if args.verbose or verdict != "ok":
+            print(f"{verdict:<12}{query!r} -> {routed}")
+
+    routed_total = true_pos + false_pos
+    expected_total = true_pos + false_neg
+    precision = true_pos / routed_total if routed_total else 1.0
+    recall = true_pos / expected_total if expected_total else 1.0
+    print(
+        f"{len(LABELLED_QUERIES)} queries, {routed_total} routed: "
+        f"precision {precision:.2f}, recall {recall:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
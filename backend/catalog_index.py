@@ -0,0 +1,121 @@
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class CatalogIndex:
+    """
+    In-process index of the course catalog.
+
+    Loaded once from the course_catalog collection on first use and kept in
+    sync by VectorStore writes, so catalog lookups (titles, course links,
+    lesson links, outlines) never touch ChromaDB or re-parse lessons_json.
+    """
+
+    def __init__(self, loader: Callable[[], List[Dict[str, Any]]]):
+        self._loader = loader  # Returns the raw catalog metadatas
+        self._courses: Dict[str, Dict[str, Any]] = {}
+        self._lesson_links: Dict[Tuple[str, int], Optional[str]] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+        self.version = 0  # Bumped on every change, for caches derived from titles
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            for metadata in self._loader():
+                self._add(metadata)
+            self._loaded = True
+            self.version += 1
+
+    def _add(self, metadata: Dict[str, Any]):
+        """Index one catalog metadata record, replacing any previous version"""
+        course = {k: v for k, v in metadata.items() if k != "lessons_json"}
+        lessons = json.loads(metadata.get("lessons_json") or "[]")
+        course["lessons"] = lessons
+
+        title = course["title"]
+        self._remove(title)
+        self._courses[title] = course
+        for lesson in lessons:
+            self._lesson_links[(title, lesson.get("lesson_number"))] = lesson.get(
+                "lesson_link"
+            )
+
+    def _remove(self, title: str):
+        previous = self._courses.pop(title, None)
+        if previous:
+            for lesson in previous["lessons"]:
+                self._lesson_links.pop((title, lesson.get("lesson_number")), None)
+
+    @staticmethod
+    def _copy(course: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a course so callers cannot mutate the index"""
+        return {**course, "lessons": [dict(lesson) for lesson in course["lessons"]]}
+
+    def upsert(self, metadata: Dict[str, Any]):
+        """Add or replace a course using the metadata stored in the catalog"""
+        with self._lock:
+            self._ensure_loaded()
+            self._add(metadata)
+            self.version += 1
+
+    def remove(self, title: str):
+        """Forget a course"""
+        with self._lock:
+            self._ensure_loaded()
+            self._remove(title)
+            self.version += 1
+
+    def clear(self):
+        """Forget every course; the (now empty) catalog needs no reload"""
+        with self._lock:
+            self._courses = {}
+            self._lesson_links = {}
+            self._loaded = True
+            self.version += 1
+
+    def invalidate(self):
+        """Reload from the catalog on next access"""
+        with self._lock:
+            self._courses = {}
+            self._lesson_links = {}
+            self._loaded = False
+            self.version += 1
+
+    def titles(self) -> List[str]:
+        self._ensure_loaded()
+        return list(self._courses)
+
+    def snapshot(self) -> Tuple[int, List[str]]:
+        """Version and titles, read consistently"""
+        with self._lock:
+            self._ensure_loaded()
+            return self.version, list(self._courses)
+
+    def count(self) -> int:
+        self._ensure_loaded()
+        return len(self._courses)
+
+    def get(self, title: str) -> Optional[Dict[str, Any]]:
+        """Course metadata with parsed lessons, or None if unknown"""
+        self._ensure_loaded()
+        course = self._courses.get(title)
+        return self._copy(course) if course else None
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Metadata for every course, in catalog order"""
+        self._ensure_loaded()
+        return [self._copy(course) for course in list(self._courses.values())]
+
+    def course_link(self, title: str) -> Optional[str]:
+        self._ensure_loaded()
+        course = self._courses.get(title)
+        return course.get("course_link") if course else None
+
+    def lesson_link(self, title: str, lesson_number: int) -> Optional[str]:
+        self._ensure_loaded()
+        return self._lesson_links.get((title, lesson_number))
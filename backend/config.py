@@ -15,18 +15,53 @@ class Config:
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     ANTHROPIC_MODEL: str = "claude-haiku-4-5"
     BASE_URL: str = os.getenv("BASE_URL", "")
+    PROMPT_CACHING: bool = False  # Cache system prompt + tools (see README minimum)
 
     # Embedding model settings
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND: str = "sentence-transformers"  # Or "onnx" (ONNX Runtime)
+    EMBEDDING_ONNX_FILE: str = "onnx/model.onnx"  # Graph in the model repo (onnx)
+    EMBEDDING_BATCH_SIZE: int = 64  # Texts per embedding model call
+    CHROMA_WRITE_BATCH_SIZE: int = 1024  # Records per ChromaDB add (capped by Chroma)
+    EMBEDDING_CACHE: bool = True  # Reuse chunk embeddings across rebuilds
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024  # Cached query embeddings (0 = off)
+    HYBRID_SEARCH: bool = True  # Fuse BM25 keyword ranking with embedding search
+    VECTOR_BACKEND: str = "chroma"  # Course content: "chroma" or "numpy" (flat matrix)
+    VECTOR_IVF_LISTS: int = 0  # numpy backend: IVF partitions (0 = exact search)
+    VECTOR_IVF_PROBES: int = 8  # numpy backend: partitions scanned per query
+    VECTOR_QUANTIZATION: str = "none"  # numpy backend: "float16"/"int8" scan copy
+    VECTOR_RERANK_FACTOR: int = 4  # Quantized candidates per result, re-scored exactly
 
     # Document processing settings
     CHUNK_SIZE: int = 800  # Size of text chunks for vector storage
     CHUNK_OVERLAP: int = 100  # Characters to overlap between chunks
     MAX_RESULTS: int = 5  # Maximum search results to return
     MAX_HISTORY: int = 2  # Number of conversation messages to remember
+    MAX_SESSIONS: int = 10000  # Sessions kept in memory (least recently used evicted)
+    SESSION_TTL: float = 3600.0  # Seconds a session may stay idle before it is dropped
+    SESSION_BACKEND: str = "memory"  # "memory" (per process) or "sqlite" (shared)
+    SESSION_DB_PATH: str = "./sessions.db"  # SQLite session database location
+    HISTORY_TOKEN_BUDGET: int = 0  # History tokens before summarizing (0 = off)
+    HISTORY_SUMMARY_TOKENS: int = 200  # Max tokens of the rolling history summary
 
     # Tool execution settings
     MAX_TOOL_ROUNDS: int = 2  # Maximum sequential tool calls per query
+    QUERY_WORKERS: int = 8  # Threads for tool calls (shared by concurrent queries)
+    TOOL_TIMEOUT: float = 20.0  # Seconds before a tool call is reported as failed
+    QUERY_ROUTER: bool = True  # Answer course outline questions without the LLM
+    SEARCH_PREFETCH: bool = False  # Search the raw query during the first LLM call
+    PREFETCH_MIN_OVERLAP: float = 0.5  # Word overlap for the model's search to match
+
+    # Answer cache settings (standalone questions only)
+    ANSWER_CACHE: bool = False  # Reuse answers to near-identical questions
+    ANSWER_CACHE_THRESHOLD: float = 0.95  # Minimum cosine similarity for a hit
+    ANSWER_CACHE_SIZE: int = 256  # Cached answers (least recently used evicted)
+    ANSWER_CACHE_TTL: float = 3600.0  # Seconds before a cached answer expires
+
+    # Ingestion settings
+    INGEST_WORKERS: int = 1  # Processes used to parse documents (1 = inline)
+    INGEST_BATCH_SIZE: int = 256  # Chunks per vector store write during ingestion
+    INGEST_MANIFEST: bool = True  # Skip unchanged files using a content-hash manifest
 
     # Database paths
     CHROMA_PATH: str = "./chroma_db"  # ChromaDB storage location
@@ -0,0 +1,173 @@
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+from catalog_index import CatalogIndex
+
+# Tiers in the order they are tried
+EXACT = "exact"
+CASE_INSENSITIVE = "case_insensitive"
+PREFIX = "prefix"
+SEMANTIC = "semantic"
+TIERS = (EXACT, CASE_INSENSITIVE, PREFIX, SEMANTIC)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class CourseResolution:
+    """Outcome of resolving a course name"""
+
+    title: Optional[str]
+    tier: Optional[str]  # Which tier answered; None when nothing matched
+    cached: bool = False
+
+
+class _TrieNode:
+    __slots__ = ("children", "titles")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.titles: Set[str] = set()  # Titles with a token under this prefix
+
+
+class _TitleTrie:
+    """Character trie over the lowercased word tokens of every title"""
+
+    def __init__(self, titles: List[str]):
+        self.root = _TrieNode()
+        for title in titles:
+            for token in tokenize(title):
+                node = self.root
+                for char in token:
+                    node = node.children.setdefault(char, _TrieNode())
+                    node.titles.add(title)
+
+    def titles_with_prefix(self, prefix: str) -> Set[str]:
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.titles
+
+    def match(self, tokens: List[str]) -> Set[str]:
+        """Titles in which every query token prefixes some title token"""
+        candidates: Optional[Set[str]] = None
+        for token in tokens:
+            titles = self.titles_with_prefix(token)
+            candidates = set(titles) if candidates is None else candidates & titles
+            if not candidates:
+                return set()
+        return candidates or set()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens"""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+class CourseNameResolver:
+    """
+    Resolve a (possibly partial) course name to a catalog title.
+
+    Cheap tiers run first: exact title, case-insensitive title, then a
+    token-prefix trie that accepts a unique match (e.g. "mcp" or "chroma
+    adv"). Only when all of them miss or are ambiguous does it fall back to
+    the embedding search. Answers are memoized until the catalog changes.
+    """
+
+    def __init__(
+        self,
+        catalog_index: CatalogIndex,
+        semantic_match: Callable[[str], Optional[str]],
+        max_cache_size: int = 1024,
+    ):
+        self.catalog_index = catalog_index
+        self._semantic_match = semantic_match
+        self.max_cache_size = max(0, max_cache_size)
+        self._cache: "OrderedDict[str, CourseResolution]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._titles: Set[str] = set()
+        self._casefolded: Dict[str, str] = {}
+        self._trie = _TitleTrie([])
+        self.tier_counts: Dict[str, int] = {tier: 0 for tier in TIERS}
+        self.cache_hits = 0
+
+    def _refresh(self):
+        """Rebuild lookup tables if the catalog changed; call with the lock held"""
+        if self.catalog_index.version == self._version:
+            return
+        version, titles = self.catalog_index.snapshot()
+        self._titles = set(titles)
+        self._casefolded = {}
+        for title in titles:
+            # Keep the first title if two only differ in case
+            self._casefolded.setdefault(title.casefold(), title)
+        self._trie = _TitleTrie(titles)
+        self._cache.clear()
+        self._version = version
+
+    def _match_catalog(self, name: str) -> CourseResolution:
+        if name in self._titles:
+            return CourseResolution(name, EXACT)
+        title = self._casefolded.get(name.casefold())
+        if title:
+            return CourseResolution(title, CASE_INSENSITIVE)
+        tokens = tokenize(name)
+        if tokens:
+            candidates = self._trie.match(tokens)
+            if len(candidates) == 1:
+                return CourseResolution(candidates.pop(), PREFIX)
+        return CourseResolution(None, None)
+
+    def resolve(
+        self, course_name: str, allow_semantic: bool = True
+    ) -> CourseResolution:
+        """
+        Resolve a course name.
+
+        Args:
+            course_name: Title or partial title as given by the model or user
+            allow_semantic: Fall back to the embedding search when the
+                catalog tiers miss
+
+        Returns:
+            CourseResolution with the matched title (or None) and the tier
+            that produced it
+        """
+        name = " ".join(course_name.split())
+        with self._lock:
+            self._refresh()
+            version = self._version
+            cached = self._cache.get(name)
+            if cached:
+                self._cache.move_to_end(name)
+                self.cache_hits += 1
+                return CourseResolution(cached.title, cached.tier, cached=True)
+            resolution = (
+                self._match_catalog(name) if name else CourseResolution(None, None)
+            )
+
+        if resolution.title is None and allow_semantic:
+            # Embedding search runs outside the lock so it doesn't serialize
+            title = self._semantic_match(name) if name else None
+            resolution = CourseResolution(title, SEMANTIC if title else None)
+
+        with self._lock:
+            if resolution.tier:
+                self.tier_counts[resolution.tier] += 1
+            # Misses are not memoized: a course may be added under that name
+            if resolution.title and self.max_cache_size and version == self._version:
+                self._cache[name] = resolution
+                while len(self._cache) > self.max_cache_size:
+                    self._cache.popitem(last=False)
+        return resolution
+
+    def stats(self) -> Dict[str, int]:
+        """Answers per tier plus memo hits"""
+        with self._lock:
+            return {**self.tier_counts, "cache_hits": self.cache_hits}
@@ -1,9 +1,15 @@
+import itertools
 import os
 import re
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 from models import Course, CourseChunk, Lesson
 
+# Sentence boundaries: terminal punctuation followed by whitespace and a capital
+# letter, ignoring common abbreviations. The cheap punctuation lookbehind comes
+# first so the abbreviation checks only run at candidate boundaries.
+SENTENCE_ENDINGS = re.compile(r"(?<=[.!?])(?<!\w\.\w.)(?<![A-Z][a-z]\.)\s+(?=[A-Z])")
+
 
 class DocumentProcessor:
     """Processes course documents and extracts structured information"""
@@ -25,72 +31,50 @@ class DocumentProcessor:
     def chunk_text(self, text: str) -> List[str]:
         """Split text into sentence-based chunks with overlap using config settings"""
 
-        # Clean up the text
-        text = re.sub(r"\s+", " ", text.strip())  # Normalize whitespace
+        # Clean up the text - same result as re.sub(r"\s+", " ", text.strip())
+        text = " ".join(text.split())  # Normalize whitespace
 
         # Better sentence splitting that handles abbreviations
-        # This regex looks for periods followed by whitespace and capital letters
-        # but ignores common abbreviations
-        sentence_endings = re.compile(
-            r"(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\!|\?)\s+(?=[A-Z])"
-        )
-        sentences = sentence_endings.split(text)
+        sentences = SENTENCE_ENDINGS.split(text)
 
         # Clean sentences
         sentences = [s.strip() for s in sentences if s.strip()]
 
+        # prefix[k] is the joined length of sentences[:k] with one trailing space
+        # per sentence, so sentences[a:b] joined is prefix[b] - prefix[a] - 1 chars
+        prefix = [0] * (len(sentences) + 1)
+        for k, sentence in enumerate(sentences):
+            prefix[k + 1] = prefix[k] + len(sentence) + 1
+
+        overlap = self.chunk_overlap if getattr(self, "chunk_overlap", 0) > 0 else 0
+
+        # Sliding window [start, end) over sentences. Both window ends and the
+        # overlap pointer only move forward, so chunking is O(n) in sentences.
         chunks = []
-        i = 0
-
-        while i < len(sentences):
-            current_chunk = []
-            current_size = 0
-
-            # Build chunk starting from sentence i
-            for j in range(i, len(sentences)):
-                sentence = sentences[j]
-
-                # Calculate size with space
-                space_size = 1 if current_chunk else 0
-                total_addition = len(sentence) + space_size
-
-                # Check if adding this sentence would exceed chunk size
-                if current_size + total_addition > self.chunk_size and current_chunk:
-                    break
-
-                current_chunk.append(sentence)
-                current_size += total_addition
-
-            # Add chunk if we have content
-            if current_chunk:
-                chunks.append(" ".join(current_chunk))
-
-                # Calculate overlap for next chunk
-                if hasattr(self, "chunk_overlap") and self.chunk_overlap > 0:
-                    # Find how many sentences to overlap
-                    overlap_size = 0
-                    overlap_sentences = 0
-
-                    # Count backwards from end of current chunk
-                    for k in range(len(current_chunk) - 1, -1, -1):
-                        sentence_len = len(current_chunk[k]) + (
-                            1 if k < len(current_chunk) - 1 else 0
-                        )
-                        if overlap_size + sentence_len <= self.chunk_overlap:
-                            overlap_size += sentence_len
-                            overlap_sentences += 1
-                        else:
-                            break
-
-                    # Move start position considering overlap
-                    next_start = i + len(current_chunk) - overlap_sentences
-                    i = max(next_start, i + 1)  # Ensure we make progress
-                else:
-                    # No overlap - move to next sentence after current chunk
-                    i += len(current_chunk)
+        start = end = overlap_start = 0
+
+        while start < len(sentences):
+            # Grow the window while the joined chunk still fits; the first
+            # sentence is always taken so oversized sentences still progress
+            end = max(end, start + 1)
+            while (
+                end < len(sentences)
+                and prefix[end + 1] - prefix[start] - 1 <= self.chunk_size
+            ):
+                end += 1
+
+            chunks.append(" ".join(sentences[start:end]))
+
+            if overlap:
+                # Earliest sentence in this chunk from which the tail fits in
+                # the overlap budget; the next chunk starts there
+                overlap_start = max(overlap_start, start)
+                while prefix[end] - prefix[overlap_start] - 1 > overlap:
+                    overlap_start += 1
+                start = max(overlap_start, start + 1)  # Ensure we make progress
             else:
-                # No sentences fit, move to next
-                i += 1
+                # No overlap - move to next sentence after current chunk
+                start = end
 
         return chunks
 
@@ -104,10 +88,30 @@ class DocumentProcessor:
         Line 3: Course Instructor: [instructor]
         Following lines: Lesson markers and content
         """
-        content = self.read_file(file_path)
-        filename = os.path.basename(file_path)
+        course, chunks = self.stream_course_document(file_path)
+        course_chunks = list(chunks)
+        return course, course_chunks
 
-        lines = content.strip().split("\n")
+    def stream_course_document(
+        self, file_path: str
+    ) -> Tuple[Course, Iterator[CourseChunk]]:
+        """
+        Parse a course document lazily, one lesson at a time.
+
+        The course header is read immediately. Chunks are produced by the
+        returned iterator as each lesson ends, and each lesson is appended to
+        course.lessons as it is chunked, so the lesson list is complete once the
+        iterator is exhausted. Only the current lesson is held in memory.
+
+        Args:
+            file_path: Path to the course document
+
+        Returns:
+            Tuple of (Course with header fields, iterator of CourseChunks)
+        """
+        lines = self._iter_lines(file_path)
+        header = list(itertools.islice(lines, 4))
+        filename = os.path.basename(file_path)
 
         # Extract course metadata from first three lines
         course_title = filename  # Default fallback
@@ -115,18 +119,18 @@ class DocumentProcessor:
         instructor_name = "Unknown"
 
         # Parse course title from first line
-        if len(lines) >= 1 and lines[0].strip():
+        if len(header) >= 1 and header[0].strip():
             title_match = re.match(
-                r"^Course Title:\s*(.+)$", lines[0].strip(), re.IGNORECASE
+                r"^Course Title:\s*(.+)$", header[0].strip(), re.IGNORECASE
             )
             if title_match:
                 course_title = title_match.group(1).strip()
             else:
-                course_title = lines[0].strip()
+                course_title = header[0].strip()
 
         # Parse remaining lines for course metadata
-        for i in range(1, min(len(lines), 4)):  # Check first 4 lines for metadata
-            line = lines[i].strip()
+        for line in header[1:4]:  # Check first 4 lines for metadata
+            line = line.strip()
             if not line:
                 continue
 
@@ -151,22 +155,104 @@ class DocumentProcessor:
             instructor=instructor_name if instructor_name != "Unknown" else None,
         )
 
-        # Process lessons and create chunks
-        course_chunks = []
+        # Start processing from line 4 (after metadata), skipping an empty
+        # line after the instructor
+        body = itertools.chain(
+            header[3:] if header[3:] and header[3].strip() else [], lines
+        )
+        return course, self._iter_course_chunks(course, body)
+
+    def _iter_lines(self, file_path: str) -> Iterator[str]:
+        """
+        Yield the lines of a file without line endings, skipping leading blank
+        lines. Invalid UTF-8 is dropped, matching read_file's fallback.
+        """
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as file:
+            started = False
+            for line in file:
+                line = line[:-1] if line.endswith("\n") else line
+                if not started:
+                    if not line.strip():
+                        continue
+                    started = True
+                yield line
+
+    def _lesson_chunks(
+        self,
+        course: Course,
+        lesson_number: int,
+        lesson_text: str,
+        last: bool,
+        first_index: int,
+    ) -> Iterator[CourseChunk]:
+        """Chunk one lesson's text, adding lesson context to the chunk content"""
+        for idx, chunk in enumerate(self.chunk_text(lesson_text)):
+            if last:
+                # For any chunk of the last lesson, add lesson context & course title
+                content = (
+                    f"Course {course.title} Lesson {lesson_number} content: {chunk}"
+                )
+            elif idx == 0:
+                # For the first chunk of each lesson, add lesson context
+                content = f"Lesson {lesson_number} content: {chunk}"
+            else:
+                content = chunk
+
+            yield CourseChunk(
+                content=content,
+                course_title=course.title,
+                lesson_number=lesson_number,
+                chunk_index=first_index + idx,
+            )
+
+    def _iter_course_chunks(
+        self, course: Course, body: Iterator[str]
+    ) -> Iterator[CourseChunk]:
+        """Process lesson markers and content lines into chunks, lesson by lesson"""
+        chunk_counter = 0
         current_lesson = None
         lesson_title = None
         lesson_link = None
         lesson_content = []
-        chunk_counter = 0
+        expect_link = False
 
-        # Start processing from line 4 (after metadata)
-        start_index = 3
-        if len(lines) > 3 and not lines[3].strip():
-            start_index = 4  # Skip empty line after instructor
+        # Every body line is kept until the first chunk is produced, in case no
+        # lesson yields content and the whole body must be chunked instead
+        fallback_lines: Optional[List[str]] = []
 
-        i = start_index
-        while i < len(lines):
-            line = lines[i]
+        def finish_lesson(last: bool) -> Iterator[CourseChunk]:
+            nonlocal chunk_counter, fallback_lines
+            lesson_text = "\n".join(lesson_content).strip()
+            if not lesson_text:
+                return
+            # Add lesson to course
+            course.lessons.append(
+                Lesson(
+                    lesson_number=current_lesson,
+                    title=lesson_title,
+                    lesson_link=lesson_link,
+                )
+            )
+            for course_chunk in self._lesson_chunks(
+                course, current_lesson, lesson_text, last, chunk_counter
+            ):
+                chunk_counter += 1
+                fallback_lines = None
+                yield course_chunk
+
+        for line in body:
+            if fallback_lines is not None:
+                fallback_lines.append(line)
+
+            # Check if the line right after a lesson marker is a lesson link
+            if expect_link:
+                expect_link = False
+                link_match = re.match(
+                    r"^Lesson Link:\s*(.+)$", line.strip(), re.IGNORECASE
+                )
+                if link_match:
+                    lesson_link = link_match.group(1).strip()
+                    continue  # Skip the link line so it's not added to content
 
             # Check for lesson markers (e.g., "Lesson 0: Introduction")
             lesson_match = re.match(
@@ -176,96 +262,30 @@ class DocumentProcessor:
             if lesson_match:
                 # Process previous lesson if it exists
                 if current_lesson is not None and lesson_content:
-                    lesson_text = "\n".join(lesson_content).strip()
-                    if lesson_text:
-                        # Add lesson to course
-                        lesson = Lesson(
-                            lesson_number=current_lesson,
-                            title=lesson_title,
-                            lesson_link=lesson_link,
-                        )
-                        course.lessons.append(lesson)
-
-                        # Create chunks for this lesson
-                        chunks = self.chunk_text(lesson_text)
-                        for idx, chunk in enumerate(chunks):
-                            # For the first chunk of each lesson, add lesson context
-                            if idx == 0:
-                                chunk_with_context = (
-                                    f"Lesson {current_lesson} content: {chunk}"
-                                )
-                            else:
-                                chunk_with_context = chunk
-
-                            course_chunk = CourseChunk(
-                                content=chunk_with_context,
-                                course_title=course.title,
-                                lesson_number=current_lesson,
-                                chunk_index=chunk_counter,
-                            )
-                            course_chunks.append(course_chunk)
-                            chunk_counter += 1
+                    yield from finish_lesson(last=False)
 
                 # Start new lesson
                 current_lesson = int(lesson_match.group(1))
                 lesson_title = lesson_match.group(2).strip()
                 lesson_link = None
-
-                # Check if next line is a lesson link
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    link_match = re.match(
-                        r"^Lesson Link:\s*(.+)$", next_line, re.IGNORECASE
-                    )
-                    if link_match:
-                        lesson_link = link_match.group(1).strip()
-                        i += 1  # Skip the link line so it's not added to content
-
+                expect_link = True
                 lesson_content = []
             else:
                 # Add line to current lesson content
                 lesson_content.append(line)
 
-            i += 1
-
         # Process the last lesson
         if current_lesson is not None and lesson_content:
-            lesson_text = "\n".join(lesson_content).strip()
-            if lesson_text:
-                lesson = Lesson(
-                    lesson_number=current_lesson,
-                    title=lesson_title,
-                    lesson_link=lesson_link,
-                )
-                course.lessons.append(lesson)
-
-                chunks = self.chunk_text(lesson_text)
-                for idx, chunk in enumerate(chunks):
-                    # For any chunk of each lesson, add lesson context & course title
-
-                    chunk_with_context = f"Course {course_title} Lesson {current_lesson} content: {chunk}"
-
-                    course_chunk = CourseChunk(
-                        content=chunk_with_context,
-                        course_title=course.title,
-                        lesson_number=current_lesson,
-                        chunk_index=chunk_counter,
-                    )
-                    course_chunks.append(course_chunk)
-                    chunk_counter += 1
+            yield from finish_lesson(last=True)
 
         # If no lessons found, treat entire content as one document
-        if not course_chunks and len(lines) > 2:
-            remaining_content = "\n".join(lines[start_index:]).strip()
+        if chunk_counter == 0 and fallback_lines:
+            remaining_content = "\n".join(fallback_lines).strip()
             if remaining_content:
-                chunks = self.chunk_text(remaining_content)
-                for chunk in chunks:
-                    course_chunk = CourseChunk(
+                for chunk in self.chunk_text(remaining_content):
+                    yield CourseChunk(
                         content=chunk,
                         course_title=course.title,
                         chunk_index=chunk_counter,
                     )
-                    course_chunks.append(course_chunk)
                     chunk_counter += 1
-
-        return course, course_chunks
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+KEY_SIZE = 16  # Bytes of BLAKE2b digest used as the cache key
+
+
+class EmbeddingCache:
+    """
+    Append-only on-disk cache of text embeddings for one embedding model.
+
+    Vectors are stored as a contiguous float32 matrix in `<model>.vectors` and
+    read through a memory map; the row for each text is found via the 16-byte
+    content hashes stored in the same order in `<model>.keys`. Keeping one file
+    pair per model means a model change never serves stale vectors.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str):
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self.vectors_path = os.path.join(cache_dir, f"{slug}.vectors")
+        self.keys_path = os.path.join(cache_dir, f"{slug}.keys")
+        self.meta_path = os.path.join(cache_dir, f"{slug}.json")
+
+        self.dim: Optional[int] = None
+        self._rows: Dict[bytes, int] = {}
+        self._matrix: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        """Content hash used to identify a text in the cache"""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_SIZE).digest()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _load(self):
+        """Read the key index and map the vector file, if the cache exists"""
+        if not os.path.exists(self.meta_path):
+            return
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as file:
+                self.dim = int(json.load(file)["dim"])
+            with open(self.keys_path, "rb") as file:
+                keys = file.read()
+            # Vectors are appended before keys, so a torn write can only leave
+            # extra vector rows; never trust more rows than both files hold
+            vector_rows = os.path.getsize(self.vectors_path) // (4 * self.dim)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable embedding cache {self.cache_dir}: {e}")
+            self.dim = None
+            return
+
+        count = min(len(keys) // KEY_SIZE, vector_rows)
+        if count != vector_rows or count * KEY_SIZE != len(keys):
+            # Drop a partially written tail so new rows stay aligned with keys
+            os.truncate(self.vectors_path, count * 4 * self.dim)
+            os.truncate(self.keys_path, count * KEY_SIZE)
+        for row in range(count):
+            self._rows[keys[row * KEY_SIZE : (row + 1) * KEY_SIZE]] = row
+
+    def _map(self) -> np.memmap:
+        """Return a read-only map covering every committed row"""
+        rows = len(self._rows)
+        if self._matrix is None or self._matrix.shape[0] < rows:
+            self._matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+            )
+        return self._matrix
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            One float32 vector per text, or None where the text is not cached
+        """
+        with self._lock:
+            rows = [self._rows.get(self.key(text)) for text in texts]
+            if all(row is None for row in rows):
+                return [None] * len(texts)
+            matrix = self._map()
+            return [
+                None if row is None else np.array(matrix[row], dtype=np.float32)
+                for row in rows
+            ]
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Append embeddings for texts that are not cached yet"""
+        if not texts:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            raise ValueError("Expected one embedding vector per text")
+
+        with self._lock:
+            if self.dim is None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self.dim = matrix.shape[1]
+                with open(self.meta_path, "w", encoding="utf-8") as file:
+                    json.dump({"model": self.model_name, "dim": self.dim}, file)
+                # Start from empty files in case of leftovers without metadata
+                open(self.vectors_path, "wb").close()
+                open(self.keys_path, "wb").close()
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {matrix.shape[1]} does not match "
+                    f"cache dimension {self.dim}"
+                )
+
+            new_keys = []
+            new_rows = []
+            seen = set()
+            for text, vector in zip(texts, matrix):
+                key = self.key(text)
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+            if not new_keys:
+                return
+
+            with open(self.vectors_path, "ab") as file:
+                file.write(np.stack(new_rows).tobytes())
+            with open(self.keys_path, "ab") as file:
+                file.write(b"".join(new_keys))
+
+            start = len(self._rows)
+            for offset, key in enumerate(new_keys):
+                self._rows[key] = start + offset
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded, thread-safe LRU cache from normalized query text to its embedding.
+
+    Query texts repeat heavily (course names in particular), so keeping recent
+    embeddings in memory saves a model forward pass per repeated lookup.
+    """
+
+    def __init__(self, embed: Callable[[str], Any], max_size: int = 1024):
+        self._embed = embed
+        self.max_size = max(0, max_size)
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace so trivially different queries share an entry"""
+        return " ".join(text.split())
+
+    def get(self, text: str) -> Any:
+        """Return the embedding for a query, computing and caching it on a miss"""
+        key = self.normalize(text)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Embed outside the lock so concurrent misses don't serialize
+        embedding = self._embed(key)
+
+        if self.max_size:
+            with self._lock:
+                self._entries[key] = embedding
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return embedding
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Drop all cached embeddings (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
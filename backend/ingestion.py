@@ -0,0 +1,482 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from document_processor import DocumentProcessor
+from models import Course, CourseChunk
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+# Per-process document processor, created once by the pool initializer
+_worker_processor: Optional[DocumentProcessor] = None
+
+
+def _init_worker(chunk_size: int, chunk_overlap: int):
+    """Create the document processor used by this pool worker"""
+    global _worker_processor
+    _worker_processor = DocumentProcessor(chunk_size, chunk_overlap)
+
+
+def _parse_document(file_path: str) -> Tuple[Course, List[CourseChunk], float]:
+    """Parse and chunk a single document inside a pool worker"""
+    start = time.perf_counter()
+    course, chunks = _worker_processor.process_course_document(file_path)
+    return course, chunks, time.perf_counter() - start
+
+
+def _timed(chunks: Iterable[CourseChunk], stats: "StageStats") -> Iterator[CourseChunk]:
+    """Iterate chunks, charging the time spent producing each one to a stage"""
+    iterator = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            stats.seconds += time.perf_counter() - start
+            return
+        stats.seconds += time.perf_counter() - start
+        stats.chunks += 1
+        yield chunk
+
+
+def list_course_files(folder_path: str) -> List[str]:
+    """Return supported course documents in a folder, sorted for stable ordering"""
+    file_paths = []
+    for file_name in sorted(os.listdir(folder_path)):
+        file_path = os.path.join(folder_path, file_name)
+        if os.path.isfile(file_path) and file_name.lower().endswith(
+            SUPPORTED_EXTENSIONS
+        ):
+            file_paths.append(file_path)
+    return file_paths
+
+
+class IngestionManifest:
+    """
+    Persistent record of ingested files keyed by absolute file path.
+
+    Each entry stores the file's mtime, size and SHA-256 content hash together
+    with the course title it produced, so unchanged files can be skipped
+    without being read and edited files can be detected and replaced.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._owners: Dict[str, str] = {}  # course title -> file key
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        """Load entries from disk, starting empty if the file is missing or invalid"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if data.get("version") == self.VERSION:
+                self.entries = data.get("files", {})
+                self._owners = {
+                    entry["course_title"]: key for key, entry in self.entries.items()
+                }
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable ingestion manifest {self.path}: {e}")
+
+    @staticmethod
+    def key(file_path: str) -> str:
+        """Normalize a file path into a manifest key"""
+        return os.path.abspath(file_path)
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """Compute the SHA-256 hex digest of a file's contents"""
+        with open(file_path, "rb") as file:
+            return hashlib.file_digest(file, "sha256").hexdigest()
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get the manifest entry for a file, if any"""
+        return self.entries.get(self.key(file_path))
+
+    def check(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Check whether a file changed since it was last ingested.
+
+        Args:
+            file_path: Path to the course document
+
+        Returns:
+            None if the file is unchanged, otherwise its new fingerprint
+            (mtime, size and sha256) to pass to record()
+        """
+        stat = os.stat(file_path)
+        entry = self.get(file_path)
+        if (
+            entry
+            and entry["mtime"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            return None
+
+        fingerprint = {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": self.hash_file(file_path),
+        }
+        if entry and entry["sha256"] == fingerprint["sha256"]:
+            # Touched but not edited - refresh the stat fields only
+            entry.update(fingerprint)
+            self._dirty = True
+            return None
+        return fingerprint
+
+    def owner_of(self, course_title: str) -> Optional[str]:
+        """Get the manifest key of the file that produced a course title"""
+        return self._owners.get(course_title)
+
+    def record(
+        self,
+        file_path: str,
+        fingerprint: Dict[str, Any],
+        course_title: str,
+        chunk_count: int,
+    ):
+        """Record a successfully ingested file"""
+        key = self.key(file_path)
+        previous = self.entries.get(key)
+        if previous and self._owners.get(previous["course_title"]) == key:
+            del self._owners[previous["course_title"]]
+        self.entries[key] = {
+            **fingerprint,
+            "course_title": course_title,
+            "chunk_count": chunk_count,
+        }
+        self._owners[course_title] = key
+        self._dirty = True
+
+    def clear(self):
+        """Forget every entry, e.g. after the vector store was wiped"""
+        self.entries = {}
+        self._owners = {}
+        self._dirty = True
+
+    def save(self):
+        """Atomically write the manifest to disk if it changed"""
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"version": self.VERSION, "files": self.entries}, file)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+@dataclass
+class StageStats:
+    """Throughput counters for a single ingestion stage"""
+
+    name: str
+    documents: int = 0
+    chunks: int = 0
+    seconds: float = 0.0  # Time spent doing work in this stage
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: {self.documents} docs, {self.chunks} chunks in "
+            f"{self.seconds:.2f}s ({self.chunks_per_second:.1f} chunks/s)"
+        )
+
+
+@dataclass
+class IngestionReport:
+    """Per-stage throughput report for one ingestion run"""
+
+    workers: int
+    parse: StageStats = field(default_factory=lambda: StageStats("parse"))
+    embed: StageStats = field(default_factory=lambda: StageStats("embed"))
+    write: StageStats = field(default_factory=lambda: StageStats("write"))
+    wall_seconds: float = 0.0
+    unchanged: int = 0  # Files skipped by the manifest without being parsed
+    updated: int = 0  # Courses whose previous chunks were replaced
+    skipped: int = 0
+    errors: int = 0
+
+    def summary(self) -> str:
+        total_rate = (
+            self.write.chunks / self.wall_seconds if self.wall_seconds > 0 else 0.0
+        )
+        return "\n".join(
+            [
+                f"Ingestion report ({self.workers} worker(s)):",
+                f"  {self.parse.summary()}",
+                f"  {self.embed.summary()}",
+                f"  {self.write.summary()}",
+                f"  total: {self.wall_seconds:.2f}s wall ({total_rate:.1f} chunks/s), "
+                f"{self.unchanged} unchanged, {self.updated} updated, "
+                f"{self.skipped} skipped, {self.errors} errors",
+            ]
+        )
+
+
+class CourseIngestor:
+    """
+    Two-stage ingestion pipeline for course documents.
+
+    Stage 1 parses and chunks documents, either streamed inline one lesson at a
+    time or on a process pool.
+    Stage 2 runs on the calling thread and writes chunks to the vector store in
+    batches. Results are consumed in file order, so course deduplication and
+    chunk IDs are identical regardless of the worker count.
+    """
+
+    def __init__(
+        self,
+        document_processor: DocumentProcessor,
+        vector_store,
+        workers: int = 1,
+        batch_size: int = 256,
+    ):
+        self.document_processor = document_processor
+        self.vector_store = vector_store
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+
+    def ingest(
+        self,
+        file_paths: List[str],
+        existing_titles: Set[str],
+        manifest: Optional[IngestionManifest] = None,
+    ) -> Tuple[int, int, IngestionReport]:
+        """
+        Ingest documents, skipping courses that are already stored.
+
+        Without a manifest, any course whose title is already known is skipped.
+        With a manifest, files whose fingerprint is unchanged are skipped before
+        parsing, and edited files have their previous chunks and catalog entry
+        replaced.
+
+        Args:
+            file_paths: Documents to ingest, in the order they should be applied
+            existing_titles: Course titles already stored; updated in place
+            manifest: Optional ingestion manifest; updated and saved in place
+
+        Returns:
+            Tuple of (courses added or updated, chunks added, ingestion report)
+        """
+        from vector_store import ContentWriteStats
+
+        report = IngestionReport(workers=self.workers)
+        self._content_stats = ContentWriteStats()
+        start = time.perf_counter()
+        pending_chunks: List[CourseChunk] = []
+        total_courses = 0
+        embedded_documents = 0  # Documents with chunks handed to the embedder
+
+        fingerprints: Dict[str, Dict[str, Any]] = {}
+        if manifest is not None:
+            to_parse = []
+            for file_path in file_paths:
+                try:
+                    fingerprint = manifest.check(file_path)
+                except OSError as e:
+                    print(f"Error processing {os.path.basename(file_path)}: {e}")
+                    report.errors += 1
+                    continue
+                entry = manifest.get(file_path)
+                if fingerprint is None and entry["course_title"] in existing_titles:
+                    report.unchanged += 1
+                    continue
+                fingerprints[file_path] = fingerprint or {
+                    k: entry[k] for k in ("mtime", "size", "sha256")
+                }
+                to_parse.append(file_path)
+            file_paths = to_parse
+        completed = []
+        claimed: Dict[str, str] = {}  # course title -> manifest key, this run
+
+        for file_path, result in self._parse_all(file_paths):
+            file_name = os.path.basename(file_path)
+            if isinstance(result, Exception):
+                print(f"Error processing {file_name}: {result}")
+                report.errors += 1
+                continue
+
+            # course_chunks may be a lazy stream; only the header is parsed so far
+            course, course_chunks, parse_seconds = result
+            report.parse.documents += 1
+            report.parse.seconds += parse_seconds
+
+            if not course:
+                continue
+
+            replace = False
+            if manifest is not None:
+                key = manifest.key(file_path)
+                previous = manifest.get(file_path)
+                owner = claimed.get(course.title) or manifest.owner_of(course.title)
+                # A title stays with the file that first produced it, unless
+                # that file has since been removed from disk
+                if owner is not None and owner != key and os.path.exists(owner):
+                    print(f"Course already exists: {course.title} - skipping")
+                    report.skipped += 1
+                    continue
+                # Replace anything stored under this title, plus the previous
+                # title if the edit renamed the course
+                replace = course.title in existing_titles
+                if previous and previous["course_title"] != course.title:
+                    self.vector_store.delete_course(previous["course_title"])
+                    existing_titles.discard(previous["course_title"])
+            elif course.title in existing_titles:
+                print(f"Course already exists: {course.title} - skipping")
+                report.skipped += 1
+                continue
+
+            if replace:
+                write_start = time.perf_counter()
+                self.vector_store.delete_course(course.title)
+                report.write.seconds += time.perf_counter() - write_start
+                report.updated += 1
+
+            chunk_count = 0
+            own_pending = 0  # This course's chunks still waiting in pending_chunks
+            written = False  # Whether any of this course's chunks were flushed
+            try:
+                for chunk in _timed(course_chunks, report.parse):
+                    pending_chunks.append(chunk)
+                    chunk_count += 1
+                    own_pending += 1
+                    if len(pending_chunks) >= self.batch_size:
+                        self._write_batch(pending_chunks, report)
+                        pending_chunks = []
+                        own_pending = 0
+                        written = True
+            except Exception as e:
+                # Drop the partial course so no orphaned chunks are left behind
+                print(f"Error processing {file_name}: {e}")
+                report.errors += 1
+                del pending_chunks[len(pending_chunks) - own_pending :]
+                if written:
+                    embedded_documents += 1
+                if written or replace:
+                    self.vector_store.delete_course(course.title)
+                    existing_titles.discard(course.title)
+                continue
+
+            # Lessons are complete once the chunk stream is exhausted
+            write_start = time.perf_counter()
+            self.vector_store.add_course_metadata(course)
+            report.write.seconds += time.perf_counter() - write_start
+            report.write.documents += 1
+
+            existing_titles.add(course.title)
+            total_courses += 1
+            if chunk_count:
+                embedded_documents += 1
+            action = "Updated course" if replace else "Added new course"
+            print(f"{action}: {course.title} ({chunk_count} chunks)")
+
+            if manifest is not None:
+                # Claim the title now so later duplicates in this run are skipped
+                claimed[course.title] = key
+                completed.append((file_path, course.title, chunk_count))
+
+        if pending_chunks:
+            self._write_batch(pending_chunks, report)
+        self.vector_store.flush()
+
+        report.embed.documents = embedded_documents
+        report.embed.chunks = self._content_stats.chunks
+        report.embed.seconds = self._content_stats.encode_seconds
+        report.write.seconds += self._content_stats.write_seconds
+
+        if manifest is not None:
+            # Fingerprints are only stored once every chunk has been written, so
+            # an interrupted run re-processes these files next time
+            for file_path, course_title, chunk_count in completed:
+                manifest.record(
+                    file_path, fingerprints[file_path], course_title, chunk_count
+                )
+            manifest.save()
+
+        report.wall_seconds = time.perf_counter() - start
+        return total_courses, report.write.chunks, report
+
+    def _write_batch(self, chunks: List[CourseChunk], report: IngestionReport):
+        """Queue one batch of chunks for the content collection"""
+        # Don't wait for the write: the store persists it while the next batch
+        # is parsed and encoded, and ingest() flushes once at the end
+        self.vector_store.add_course_content(
+            chunks, wait=False, stats=self._content_stats
+        )
+        report.write.chunks += len(chunks)
+
+    def _parse_all(self, file_paths: List[str]):
+        """Yield (file_path, parse result or exception) in input order"""
+        if self.workers == 1 or len(file_paths) <= 1:
+            # Stream each document so memory is bounded by the largest lesson
+            for file_path in file_paths:
+                print(f"Processing: {os.path.basename(file_path)}")
+                try:
+                    start = time.perf_counter()
+                    course, chunks = self.document_processor.stream_course_document(
+                        file_path
+                    )
+                    yield file_path, (course, chunks, time.perf_counter() - start)
+                except Exception as e:
+                    yield file_path, e
+            return
+
+        # Spawn rather than fork: the parent already holds the embedding model
+        # and ChromaDB background threads, which are not fork-safe.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(
+                self.document_processor.chunk_size,
+                self.document_processor.chunk_overlap,
+            ),
+        ) as executor:
+            # Keep a bounded window of in-flight documents so parsed chunks
+            # never pile up faster than the write stage can drain them
+            window = self.workers * 2
+            in_flight = deque()
+            paths = iter(file_paths)
+
+            for file_path in paths:
+                in_flight.append(
+                    (file_path, executor.submit(_parse_document, file_path))
+                )
+                if len(in_flight) >= window:
+                    break
+
+            while in_flight:
+                file_path, future = in_flight.popleft()
+                print(f"Processing: {os.path.basename(file_path)}")
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+
+                next_path = next(paths, None)
+                if next_path is not None:
+                    in_flight.append(
+                        (next_path, executor.submit(_parse_document, next_path))
+                    )
+
+                yield file_path, result
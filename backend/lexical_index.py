@@ -0,0 +1,406 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Words, plus identifiers joined by ".", "-" or "/" (client.messages.create,
+# --max-tokens, text-embedding-3-small) kept whole
+TOKEN_PATTERN = re.compile(r"\w+(?:[./-]\w+)*")
+SUBWORD_SPLIT = re.compile(r"([._/-]+)")
+
+NO_LESSON = -1  # Stored lesson number of chunks outside any lesson
+REMOVED = -1  # Course code of a removed row
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase terms of a text for BM25.
+
+    Compound identifiers are indexed whole, by their leading parts and by
+    each part, so an exact "max_tokens" ranks highest, "research_server"
+    matches "research_server.py" and "max tokens" still matches.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(match)
+        # [word, separator, word, ...]
+        pieces = SUBWORD_SPLIT.split(match.strip("._/-"))
+        if len(pieces) < 3:
+            continue
+        for end in range(3, len(pieces) - 1, 2):
+            tokens.append("".join(pieces[:end]))
+        tokens.extend(pieces[::2])
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k: int = 60) -> List[str]:
+    """
+    Merge ranked ID lists by reciprocal rank fusion.
+
+    Args:
+        rankings: ID lists, best first
+        k: Damping constant; larger values flatten the rank weighting
+
+    Returns:
+        Every ID, ordered by the sum of 1 / (k + rank) over the lists
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    # Stable sort: ties keep the order of first appearance
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def _pack(strings: List[str]) -> np.ndarray:
+    """Newline-joined UTF-8 bytes: far smaller than a fixed-width str array"""
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack(packed: np.ndarray) -> List[str]:
+    text = packed.tobytes().decode("utf-8")
+    return text.split("\n") if text else []
+
+
+@dataclass
+class _Postings:
+    """Read-only CSR snapshot of the index, shared by concurrent searches"""
+
+    terms: Dict[str, int]  # Term -> position in offsets
+    offsets: np.ndarray  # int64, postings of term i are [offsets[i], offsets[i + 1])
+    rows: np.ndarray  # uint32 row of each posting
+    freqs: np.ndarray  # uint16 term frequency of each posting
+    lengths: np.ndarray  # float32 token count of each row
+    courses: np.ndarray  # int32 course code of each row, REMOVED if deleted
+    lessons: np.ndarray  # int32 lesson number of each row, NO_LESSON if none
+    # Chunk ID of each row and course title -> code. Writes only append to
+    # them and compaction replaces them, so rows here never shift
+    ids: List[str]
+    course_codes: Dict[str, int]
+    live_rows: int
+    average_length: float
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over course content chunks.
+
+    Kept next to the course_content collection, keyed by the same chunk IDs
+    and filterable by course title and lesson number like Chroma queries.
+    Writes go to a dict of postings; searches use a CSR snapshot (one
+    array slice per query term, scored with NumPy) rebuilt after writes.
+    The snapshot is what gets saved: a single uncompressed .npz that loads
+    in one read, without rebuilding any Python dicts until the next write.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+
+        self._ids: List[str] = []  # Chunk ID of each row
+        self._rows: Dict[str, int] = {}  # Live chunk ID -> row
+        self._course_titles: List[str] = []
+        self._course_codes: Dict[str, int] = {}
+        self._row_courses: List[int] = []
+        self._row_lessons: List[int] = []
+        self._row_lengths: List[int] = []
+        self._postings: Optional[Dict[str, Dict[int, int]]] = {}
+        self._snapshot: Optional[_Postings] = None
+        self._dirty = False  # Changed since the last save
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # Writes
+
+    def add(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict],
+    ):
+        """Index chunks, replacing any previously indexed under the same ID"""
+        with self._lock:
+            postings = self._mutable_postings()
+            replaced = {self._rows[i] for i in ids if i in self._rows}
+            if replaced:
+                self._remove_rows(replaced)
+            for chunk_id, document, metadata in zip(ids, documents, metadatas):
+                row = len(self._ids)
+                terms = Counter(tokenize(document))
+                for term, freq in terms.items():
+                    postings.setdefault(term, {})[row] = min(freq, 65535)
+                lesson = metadata.get("lesson_number")
+                self._ids.append(chunk_id)
+                self._rows[chunk_id] = row
+                self._row_courses.append(self._course_code(metadata["course_title"]))
+                self._row_lessons.append(NO_LESSON if lesson is None else lesson)
+                self._row_lengths.append(sum(terms.values()))
+            self._changed()
+
+    def remove_course(self, course_title: str):
+        """Drop every chunk of a course"""
+        with self._lock:
+            code = self._course_codes.get(course_title)
+            if code is None:
+                return
+            rows = {
+                row for row in self._rows.values() if self._row_courses[row] == code
+            }
+            if rows:
+                self._mutable_postings()
+                self._remove_rows(rows)
+                self._changed()
+
+    def clear(self):
+        """Drop everything"""
+        with self._lock:
+            self._reset()
+            self._changed()
+
+    def _reset(self):
+        self._ids = []
+        self._rows = {}
+        self._course_titles = []
+        self._course_codes = {}
+        self._row_courses = []
+        self._row_lessons = []
+        self._row_lengths = []
+        self._postings = {}
+
+    def _course_code(self, course_title: str) -> int:
+        code = self._course_codes.get(course_title)
+        if code is None:
+            code = self._course_codes[course_title] = len(self._course_titles)
+            self._course_titles.append(course_title)
+        return code
+
+    def _remove_rows(self, rows: set):
+        """Unlink rows from the postings; their slots stay until compaction"""
+        for row in rows:
+            del self._rows[self._ids[row]]
+            self._row_courses[row] = REMOVED
+        for term in list(self._postings):
+            entries = self._postings[term]
+            for row in rows.intersection(entries):
+                del entries[row]
+            if not entries:
+                del self._postings[term]
+
+    def _mutable_postings(self) -> Dict[str, Dict[int, int]]:
+        """Dict postings for writes, expanded from the snapshot after a load"""
+        if self._postings is None:
+            snapshot = self._snapshot
+            self._postings = {}
+            for term, i in snapshot.terms.items():
+                start, end = snapshot.offsets[i], snapshot.offsets[i + 1]
+                self._postings[term] = dict(
+                    zip(
+                        snapshot.rows[start:end].tolist(),
+                        snapshot.freqs[start:end].tolist(),
+                    )
+                )
+        return self._postings
+
+    def _changed(self):
+        self._snapshot = None
+        self._dirty = True
+
+    # Reads
+
+    def _current(self) -> _Postings:
+        """The CSR snapshot, rebuilt if a write invalidated it"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._freeze()
+            return self._snapshot
+
+    def _freeze(self) -> _Postings:
+        terms: Dict[str, int] = {}
+        offsets = [0]
+        rows: List[int] = []
+        freqs: List[int] = []
+        for i, (term, entries) in enumerate(self._postings.items()):
+            terms[term] = i
+            rows.extend(entries.keys())
+            freqs.extend(entries.values())
+            offsets.append(len(rows))
+        lengths = np.asarray(self._row_lengths, dtype=np.float32)
+        courses = np.asarray(self._row_courses, dtype=np.int32)
+        live = courses != REMOVED
+        live_rows = int(live.sum())
+        return _Postings(
+            terms=terms,
+            offsets=np.asarray(offsets, dtype=np.int64),
+            rows=np.asarray(rows, dtype=np.uint32),
+            freqs=np.asarray(freqs, dtype=np.uint16),
+            lengths=lengths,
+            courses=courses,
+            lessons=np.asarray(self._row_lessons, dtype=np.int32),
+            ids=self._ids,
+            course_codes=self._course_codes,
+            live_rows=live_rows,
+            average_length=float(lengths[live].mean()) if live_rows else 0.0,
+        )
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        course_title: Optional[str] = None,
+        lesson_number: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank chunks against a query with BM25.
+
+        Args:
+            query: Search text
+            limit: Maximum results to return
+            course_title: Only chunks of this course (exact title)
+            lesson_number: Only chunks of this lesson
+
+        Returns:
+            (chunk ID, score) pairs, best first; chunks sharing no term with
+            the query are never returned
+        """
+        snapshot = self._current()
+        if limit <= 0 or not snapshot.live_rows:
+            return []
+
+        course_code = None
+        if course_title is not None:
+            course_code = snapshot.course_codes.get(course_title)
+            if course_code is None:
+                return []
+
+        scores = np.zeros(len(snapshot.lengths), dtype=np.float32)
+        n = snapshot.live_rows
+        norm = self.k1 * (
+            1 - self.b + self.b * snapshot.lengths / max(snapshot.average_length, 1.0)
+        )
+        for term in set(tokenize(query)):
+            i = snapshot.terms.get(term)
+            if i is None:
+                continue
+            start, end = snapshot.offsets[i], snapshot.offsets[i + 1]
+            rows = snapshot.rows[start:end]
+            freqs = snapshot.freqs[start:end].astype(np.float32)
+            # Lucene's IDF, which stays positive for very common terms
+            idf = math.log(1 + (n - (end - start) + 0.5) / ((end - start) + 0.5))
+            scores[rows] += idf * freqs * (self.k1 + 1) / (freqs + norm[rows])
+
+        if course_code is not None:
+            scores[snapshot.courses != course_code] = 0
+        if lesson_number is not None:
+            scores[snapshot.lessons != lesson_number] = 0
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit)[:limit]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(snapshot.ids[row], float(scores[row])) for row in ranked]
+
+    # Persistence
+
+    def save(self, path: Optional[str] = None):
+        """Write the index if it changed since the last save or load"""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            if not self._dirty and os.path.exists(path):
+                return
+            # Drop removed rows so the file only holds live chunks
+            if len(self._rows) < len(self._ids):
+                self._compact()
+            if self._snapshot is None:
+                self._snapshot = self._freeze()
+            snapshot = self._snapshot
+            terms = sorted(snapshot.terms, key=snapshot.terms.get)
+            arrays = {
+                "terms": _pack(terms),
+                "offsets": snapshot.offsets,
+                "rows": snapshot.rows,
+                "freqs": snapshot.freqs,
+                "lengths": snapshot.lengths,
+                "courses": snapshot.courses,
+                "lessons": snapshot.lessons,
+                "ids": _pack(self._ids),
+                "course_titles": _pack(self._course_titles),
+            }
+            self._dirty = False
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        # Write under a temporary name so readers never see a partial file
+        with open(temp_path, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temp_path, path)
+
+    def _compact(self):
+        """Renumber rows without the removed ones; hold the lock"""
+        postings = self._mutable_postings()
+        live = sorted(self._rows.values())
+        renumber = {old: new for new, old in enumerate(live)}
+        self._postings = {
+            term: {renumber[row]: freq for row, freq in entries.items()}
+            for term, entries in postings.items()
+        }
+        self._ids = [self._ids[row] for row in live]
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._row_courses = [self._row_courses[row] for row in live]
+        self._row_lessons = [self._row_lessons[row] for row in live]
+        self._row_lengths = [self._row_lengths[row] for row in live]
+        self._snapshot = None
+
+    def _load(self, path: str):
+        try:
+            with np.load(path) as data:
+                terms = _unpack(data["terms"])
+                ids = _unpack(data["ids"])
+                course_titles = _unpack(data["course_titles"])
+                course_codes = {title: code for code, title in enumerate(course_titles)}
+                lengths = data["lengths"]
+                courses = data["courses"]
+                lessons = data["lessons"]
+                snapshot = _Postings(
+                    terms={term: i for i, term in enumerate(terms)},
+                    offsets=data["offsets"],
+                    rows=data["rows"],
+                    freqs=data["freqs"],
+                    lengths=lengths,
+                    courses=courses,
+                    lessons=lessons,
+                    ids=ids,
+                    course_codes=course_codes,
+                    live_rows=len(ids),
+                    average_length=float(lengths.mean()) if len(ids) else 0.0,
+                )
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Ignoring unreadable lexical index {path}: {e}")
+            return
+
+        self._ids = ids
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(ids)}
+        self._course_titles = course_titles
+        self._course_codes = course_codes
+        self._row_courses = courses.tolist()
+        self._row_lessons = lessons.tolist()
+        self._row_lengths = lengths.astype(np.int64).tolist()
+        self._postings = None  # Expanded from the snapshot on the next write
+        self._snapshot = snapshot
+        self._dirty = False
@@ -0,0 +1,623 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+META_FILE = "meta.json"
+NO_LESSON = -1  # Lesson column value of chunks outside any lesson
+ROWS_PER_CENTROID = 40  # Fewer rows per IVF list than this: stay exact
+TRAINING_ROWS_PER_LIST = 256  # k-means sample size per list
+ASSIGN_BATCH = 8192  # Rows per distance matrix when assigning IVF lists
+SCORE_BATCH = 16384  # Quantized rows widened to float32 at a time
+QUANTIZATIONS = ("none", "float16", "int8")
+
+
+def parse_where(where: Optional[Dict]) -> Tuple[Optional[str], Optional[int]]:
+    """
+    Read a course/lesson filter as built by VectorStore._build_filter.
+
+    Returns:
+        (course_title, lesson_number), either None when not filtered
+    """
+    if not where:
+        return None, None
+    clauses = where["$and"] if "$and" in where else [where]
+    course_title = lesson_number = None
+    for clause in clauses:
+        for key, value in clause.items():
+            if key == "course_title":
+                course_title = value
+            elif key == "lesson_number":
+                lesson_number = value
+            else:
+                raise ValueError(f"Unsupported filter field: {key}")
+    return course_title, lesson_number
+
+
+@dataclass
+class _IVF:
+    """Inverted file lists: rows grouped by their nearest centroid"""
+
+    centroids: np.ndarray  # float32 (lists, dim)
+    assignments: np.ndarray  # int32 list of each row
+    order: np.ndarray  # Row numbers sorted by list
+    offsets: np.ndarray  # Rows of list i are order[offsets[i]:offsets[i + 1]]
+    trained_rows: int
+
+
+@dataclass
+class _Snapshot:
+    """Arrays a search reads; replaced, never mutated, on writes"""
+
+    matrix: np.ndarray  # float32 (rows, dim), memory-mapped
+    squared_norms: np.ndarray  # float32 per row
+    courses: np.ndarray  # int32 course code per row
+    lessons: np.ndarray  # int32 lesson number per row, NO_LESSON if none
+    ivf: Optional[_IVF]
+    # Row lists and course title -> code of this generation: writes append
+    # to them and a rewrite replaces them, so a row here never shifts
+    ids: List[str]
+    documents: List[str]
+    metadatas: List[Dict[str, Any]]
+    course_codes: Dict[str, int]
+    codes: Optional[np.ndarray] = None  # In-memory float16/int8 copy of matrix
+    scales: Optional[np.ndarray] = None  # int8: per-dimension step, x ~ code * scale
+
+
+class NumpyContentIndex:
+    """
+    Course content vectors in a memory-mapped NumPy matrix.
+
+    A stand-in for the course_content Chroma collection: add, query, get,
+    delete and count take the same arguments VectorStore passes to Chroma
+    and return the same shapes, with squared L2 distances like Chroma's
+    default space. Embeddings live in one contiguous float32 file, chunk
+    texts and metadata in a JSON-lines file, and course and lesson are kept
+    as integer columns so filters are a vectorized mask.
+
+    Search is a single matrix-vector product with an argpartition top-k.
+    With ivf_lists set, rows are also grouped around k-means centroids once
+    there are enough of them, and an unfiltered query only scores the
+    ivf_probes nearest lists. Filtered queries scan the matching rows
+    exactly, which is already a small slice of the matrix.
+
+    With quantization "float16" or "int8" (symmetric, one scale per
+    dimension), a 2x or 4x smaller copy of the matrix is kept in memory
+    and scanned instead; the best limit * rerank_factor candidates are then
+    re-scored exactly from the float32 file, so only those rows are read.
+    NumPy widens float16 slowly, so int8 is both the smaller and the faster
+    of the two.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ivf_lists: int = 0,
+        ivf_probes: int = 8,
+        quantization: str = "none",
+        rerank_factor: int = 4,
+    ):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization: {quantization!r}")
+        self.path = path
+        self.ivf_lists = max(0, ivf_lists)
+        self.ivf_probes = max(1, ivf_probes)
+        self.quantization = quantization
+        self.rerank_factor = max(1, rerank_factor)
+
+        self.dim: Optional[int] = None
+        self._generation = 0
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._course_codes: Dict[str, int] = {}
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    # Files
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.{self._generation}")
+
+    @property
+    def _vectors_path(self) -> str:
+        return self._file("vectors.f32")
+
+    @property
+    def _chunks_path(self) -> str:
+        return self._file("chunks.jsonl")
+
+    def _write_meta(self):
+        """Atomically point the index at the current generation's files"""
+        meta_path = os.path.join(self.path, META_FILE)
+        with open(f"{meta_path}.tmp", "w", encoding="utf-8") as file:
+            json.dump({"dim": self.dim, "generation": self._generation}, file)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def _load(self):
+        meta_path = os.path.join(self.path, META_FILE)
+        if not os.path.exists(meta_path):
+            return
+        try:
+            with open(meta_path, "r", encoding="utf-8") as file:
+                meta = json.load(file)
+            self.dim = int(meta["dim"])
+            self._generation = int(meta["generation"])
+            vector_rows = os.path.getsize(self._vectors_path) // (4 * self.dim)
+            chunks, chunk_bytes = self._read_chunks(vector_rows)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable vector index {self.path}: {e}")
+            self.dim = None
+            return
+
+        # Vectors are appended before chunks, so a torn write can only leave
+        # extra vector rows or a partial last line; keep what both files hold
+        count = len(chunks)
+        if count != vector_rows:
+            os.truncate(self._vectors_path, count * 4 * self.dim)
+        if chunk_bytes != os.path.getsize(self._chunks_path):
+            os.truncate(self._chunks_path, chunk_bytes)
+
+        vectors = self._map(count)
+        self._append_rows(
+            [chunk["id"] for chunk in chunks],
+            [chunk["document"] for chunk in chunks],
+            [chunk["metadata"] for chunk in chunks],
+            vectors,
+        )
+
+    def _read_chunks(self, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Complete chunk records (at most limit) and the bytes they span"""
+        chunks = []
+        size = 0
+        with open(self._chunks_path, "rb") as file:
+            for line in file:
+                if len(chunks) == limit or not line.endswith(b"\n"):
+                    break
+                try:
+                    chunks.append(json.loads(line))
+                except ValueError:
+                    break
+                size += len(line)
+        return chunks, size
+
+    def _map(self, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        return np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+        )
+
+    # Chroma collection interface
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """Bytes of vectors scanned per query, against plain float32"""
+        snapshot = self._snapshot
+        rows = len(self._ids)
+        float32_bytes = rows * (self.dim or 0) * 4
+        if snapshot is not None and snapshot.codes is not None:
+            resident = snapshot.codes.nbytes
+            if snapshot.scales is not None:
+                resident += snapshot.scales.nbytes
+        else:
+            resident = float32_bytes
+        return {
+            "rows": rows,
+            "dim": self.dim,
+            "quantization": self.quantization,
+            "vector_bytes": resident,
+            "float32_bytes": float32_bytes,
+            "saved_bytes": float32_bytes - resident,
+        }
+
+    def add(
+        self,
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+    ):
+        """Append chunks; IDs already present are skipped"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(ids):
+            raise ValueError("Expected one embedding vector per ID")
+
+        with self._lock:
+            keep = [i for i, chunk_id in enumerate(ids) if chunk_id not in self._rows]
+            if not keep:
+                return
+            if self.dim is None:
+                os.makedirs(self.path, exist_ok=True)
+                self.dim = vectors.shape[1]
+                open(self._vectors_path, "wb").close()
+                open(self._chunks_path, "wb").close()
+                self._write_meta()
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match "
+                    f"index dimension {self.dim}"
+                )
+
+            ids = [ids[i] for i in keep]
+            documents = [documents[i] for i in keep]
+            metadatas = [dict(metadatas[i]) for i in keep]
+            vectors = vectors[keep]
+            with open(self._vectors_path, "ab") as file:
+                file.write(vectors.tobytes())
+            with open(self._chunks_path, "ab") as file:
+                file.write(self._encode_chunks(ids, documents, metadatas))
+            total = self.count() + len(ids)
+            self._append_rows(ids, documents, metadatas, self._map(total))
+
+    def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Dict] = None,
+        **_,
+    ) -> Dict[str, List[List[Any]]]:
+        """Nearest chunks for each query embedding, in Chroma's result shape"""
+        course_title, lesson_number = parse_where(where)
+        snapshot = self._snapshot
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for embedding in query_embeddings:
+            rows, distances = [], []
+            if snapshot is not None:
+                rows, distances = self._search(
+                    snapshot,
+                    np.asarray(embedding, dtype=np.float32),
+                    n_results,
+                    course_title,
+                    lesson_number,
+                )
+            results["ids"].append([snapshot.ids[row] for row in rows])
+            results["documents"].append([snapshot.documents[row] for row in rows])
+            results["metadatas"].append([snapshot.metadatas[row] for row in rows])
+            results["distances"].append(distances)
+        return results
+
+    def get(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[Dict] = None,
+        **_,
+    ) -> Dict[str, List[Any]]:
+        """Chunks by ID and/or filter (all chunks if neither), in stored order"""
+        # Rarely called, unlike query: the lock keeps a delete from
+        # renumbering rows between the lookup and the reads
+        with self._lock:
+            rows = self._matching_rows(ids, where)
+            return {
+                "ids": [self._ids[row] for row in rows],
+                "documents": [self._documents[row] for row in rows],
+                "metadatas": [self._metadatas[row] for row in rows],
+            }
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict] = None):
+        """Remove chunks by ID and/or filter, rewriting the files without them"""
+        with self._lock:
+            removed = set(self._matching_rows(ids, where))
+            if not removed:
+                return
+            keep = [row for row in range(self.count()) if row not in removed]
+            self._rewrite(keep)
+
+    def clear(self):
+        """Remove every chunk"""
+        with self._lock:
+            self._rewrite([])
+
+    # Internals
+
+    def _matching_rows(
+        self, ids: Optional[Sequence[str]], where: Optional[Dict]
+    ) -> List[int]:
+        """Rows of the given IDs that match the filter; hold the lock"""
+        if ids is not None:
+            rows = sorted({self._rows[i] for i in ids if i in self._rows})
+        else:
+            rows = list(range(self.count()))
+        if where and rows:
+            course_title, lesson_number = parse_where(where)
+            snapshot = self._snapshot
+            mask = self._filter_mask(snapshot, course_title, lesson_number)
+            if mask is not None:
+                rows = [row for row in rows if mask[row]]
+        return rows
+
+    @staticmethod
+    def _encode_chunks(
+        ids: Sequence[str], documents: Sequence[str], metadatas: Sequence[Dict]
+    ) -> bytes:
+        lines = [
+            json.dumps({"id": i, "document": d, "metadata": m}, ensure_ascii=False)
+            for i, d, m in zip(ids, documents, metadatas)
+        ]
+        return "".join(f"{line}\n" for line in lines).encode("utf-8")
+
+    def _course_code(self, course_title: Optional[str]) -> int:
+        code = self._course_codes.get(course_title)
+        if code is None:
+            code = self._course_codes[course_title] = len(self._course_codes)
+        return code
+
+    def _append_rows(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        matrix: np.ndarray,
+    ):
+        """Index rows just written to the files; hold the lock (or be loading)"""
+        start = len(self._ids)
+        for offset, chunk_id in enumerate(ids):
+            self._rows[chunk_id] = start + offset
+        self._ids.extend(ids)
+        self._documents.extend(documents)
+        self._metadatas.extend(metadatas)
+
+        new = np.asarray(matrix[start:], dtype=np.float32)
+        courses = np.array(
+            [self._course_code(m.get("course_title")) for m in metadatas],
+            dtype=np.int32,
+        )
+        lessons = np.array(
+            [
+                NO_LESSON if m.get("lesson_number") is None else m["lesson_number"]
+                for m in metadatas
+            ],
+            dtype=np.int32,
+        )
+        previous = self._snapshot
+        if previous is not None:
+            squared_norms = np.concatenate(
+                [previous.squared_norms, np.einsum("ij,ij->i", new, new)]
+            )
+            courses = np.concatenate([previous.courses, courses])
+            lessons = np.concatenate([previous.lessons, lessons])
+        else:
+            squared_norms = np.einsum("ij,ij->i", new, new)
+        ivf = self._update_ivf(matrix, previous.ivf if previous else None, start)
+        codes, scales = self._update_codes(matrix, previous, start, new)
+        self._snapshot = _Snapshot(
+            matrix=matrix,
+            squared_norms=squared_norms,
+            courses=courses,
+            lessons=lessons,
+            ivf=ivf,
+            ids=self._ids,
+            documents=self._documents,
+            metadatas=self._metadatas,
+            course_codes=self._course_codes,
+            codes=codes,
+            scales=scales,
+        )
+
+    def _update_codes(
+        self,
+        matrix: np.ndarray,
+        previous: Optional[_Snapshot],
+        start: int,
+        new: np.ndarray,
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """Quantize new rows, re-quantizing all if int8 scales must widen"""
+        if self.quantization == "none":
+            return None, None
+        if self.quantization == "float16":
+            codes = new.astype(np.float16)
+            if previous is not None and start:
+                codes = np.concatenate([previous.codes, codes])
+            return codes, None
+
+        scales = previous.scales if previous is not None and start else None
+        needed = np.abs(new).max(axis=0) / 127 if len(new) else None
+        if needed is not None and (scales is None or np.any(needed > scales)):
+            # A value beyond the current range: rescale every row once
+            scales = needed if scales is None else np.maximum(scales, needed)
+            scales = np.maximum(scales, np.finfo(np.float32).tiny).astype(np.float32)
+            start = 0
+        if scales is None:
+            return np.zeros((0, self.dim or 0), dtype=np.int8), None
+        parts = [] if start == 0 else [previous.codes]
+        for i in range(start, len(matrix), SCORE_BATCH):
+            block = np.asarray(matrix[i : i + SCORE_BATCH], dtype=np.float32)
+            parts.append(np.clip(np.rint(block / scales), -127, 127).astype(np.int8))
+        return np.concatenate(parts), scales
+
+    def _rewrite(self, keep: List[int]):
+        """Write the kept rows to a new generation of files; hold the lock"""
+        snapshot = self._snapshot
+        ids = [self._ids[row] for row in keep]
+        documents = [self._documents[row] for row in keep]
+        metadatas = [self._metadatas[row] for row in keep]
+        vectors = (
+            np.asarray(snapshot.matrix[keep], dtype=np.float32)
+            if snapshot is not None and keep
+            else None
+        )
+
+        old_files = [self._vectors_path, self._chunks_path]
+        self._ids, self._rows, self._documents, self._metadatas = [], {}, [], []
+        self._course_codes = {}
+        self._snapshot = None
+        if self.dim is None:
+            return
+
+        self._generation += 1
+        with open(self._vectors_path, "wb") as file:
+            if vectors is not None:
+                file.write(vectors.tobytes())
+        with open(self._chunks_path, "wb") as file:
+            file.write(self._encode_chunks(ids, documents, metadatas))
+        # The new files only count once the metadata points at them
+        self._write_meta()
+        for path in old_files:
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"Could not remove old vector index file {path}: {e}")
+
+        if ids:
+            self._append_rows(ids, documents, metadatas, self._map(len(ids)))
+
+    def _filter_mask(
+        self,
+        snapshot: Optional[_Snapshot],
+        course_title: Optional[str],
+        lesson_number: Optional[int],
+    ) -> Optional[np.ndarray]:
+        """Rows matching the filter, or None when nothing is filtered"""
+        if snapshot is None:
+            return None
+        mask = None
+        if course_title is not None:
+            code = snapshot.course_codes.get(course_title, -1)
+            mask = snapshot.courses == code
+        if lesson_number is not None:
+            lesson_mask = snapshot.lessons == lesson_number
+            mask = lesson_mask if mask is None else mask & lesson_mask
+        return mask
+
+    def _search(
+        self,
+        snapshot: _Snapshot,
+        query: np.ndarray,
+        limit: int,
+        course_title: Optional[str],
+        lesson_number: Optional[int],
+    ) -> Tuple[List[int], List[float]]:
+        """Rows nearest to a query (squared L2), best first"""
+        if limit <= 0 or len(snapshot.squared_norms) == 0:
+            return [], []
+        mask = self._filter_mask(snapshot, course_title, lesson_number)
+
+        # A filter already narrows the scan to one course or lesson, and its
+        # nearest rows need not lie in the lists nearest the query: scan exactly
+        if mask is not None:
+            rows = np.flatnonzero(mask)
+        elif snapshot.ivf is not None:
+            rows = self._probe(snapshot.ivf, query)
+        else:
+            rows = None
+
+        # Shortlist on the quantized copy; only the shortlist is read exactly
+        if snapshot.codes is not None:
+            candidates = limit * self.rerank_factor
+            scanned = len(snapshot.codes) if rows is None else len(rows)
+            if scanned > candidates:
+                approximate = self._approximate_scores(snapshot, rows, query)
+                shortlist = np.argpartition(approximate, candidates - 1)[:candidates]
+                # Sorted, so the float32 file is read front to back
+                rows = np.sort(shortlist if rows is None else rows[shortlist])
+
+        # |x - q|^2 = |x|^2 - 2 x.q + |q|^2, one BLAS matrix-vector product
+        if rows is None:
+            scores = snapshot.squared_norms - 2 * (snapshot.matrix @ query)
+        else:
+            scores = snapshot.squared_norms[rows] - 2 * (snapshot.matrix[rows] @ query)
+        if len(scores) == 0:
+            return [], []
+
+        if len(scores) > limit:
+            top = np.argpartition(scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(scores[top], kind="stable")]
+        distances = np.maximum(scores[top] + float(query @ query), 0.0)
+        found = top if rows is None else rows[top]
+        return found.tolist(), distances.tolist()
+
+    @staticmethod
+    def _approximate_scores(
+        snapshot: _Snapshot, rows: Optional[np.ndarray], query: np.ndarray
+    ) -> np.ndarray:
+        """|x|^2 - 2 x.q from the quantized rows, widened in bounded blocks"""
+        # x ~ code * scale, so x.q ~ code . (scale * q)
+        weights = query if snapshot.scales is None else query * snapshot.scales
+        count = len(snapshot.codes) if rows is None else len(rows)
+        dots = np.empty(count, dtype=np.float32)
+        for i in range(0, count, SCORE_BATCH):
+            block = (
+                snapshot.codes[i : i + SCORE_BATCH]
+                if rows is None
+                else snapshot.codes[rows[i : i + SCORE_BATCH]]
+            )
+            dots[i : i + SCORE_BATCH] = block.astype(np.float32) @ weights
+        norms = snapshot.squared_norms if rows is None else snapshot.squared_norms[rows]
+        return norms - 2 * dots
+
+    def _probe(self, ivf: _IVF, query: np.ndarray) -> np.ndarray:
+        """Rows in the lists whose centroids are nearest the query"""
+        centroid_scores = np.einsum("ij,ij->i", ivf.centroids, ivf.centroids) - 2 * (
+            ivf.centroids @ query
+        )
+        probes = min(self.ivf_probes, len(ivf.centroids))
+        nearest = np.argpartition(centroid_scores, probes - 1)[:probes]
+        return np.concatenate(
+            [ivf.order[ivf.offsets[i] : ivf.offsets[i + 1]] for i in nearest]
+        )
+
+    def _update_ivf(
+        self, matrix: np.ndarray, ivf: Optional[_IVF], start: int
+    ) -> Optional[_IVF]:
+        """Assign new rows to lists, retraining when the corpus has doubled"""
+        rows = len(matrix)
+        if not self.ivf_lists or rows < self.ivf_lists * ROWS_PER_CENTROID:
+            return None
+        if ivf is None or rows >= 2 * ivf.trained_rows or start == 0:
+            centroids = self._train_centroids(matrix)
+            assignments = self._assign(matrix, centroids, 0)
+            trained_rows = rows
+        else:
+            centroids = ivf.centroids
+            assignments = np.concatenate(
+                [ivf.assignments, self._assign(matrix, centroids, start)]
+            )
+            trained_rows = ivf.trained_rows
+        order = np.argsort(assignments, kind="stable").astype(np.int64)
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assignments, minlength=len(centroids)))
+        return _IVF(centroids, assignments, order, offsets, trained_rows)
+
+    def _train_centroids(self, matrix: np.ndarray, iterations: int = 10) -> np.ndarray:
+        """k-means (Lloyd) on a sample of the rows; seeded, so rebuilds agree"""
+        rng = np.random.default_rng(0)
+        size = min(len(matrix), self.ivf_lists * TRAINING_ROWS_PER_LIST)
+        sample = np.asarray(
+            matrix[np.sort(rng.choice(len(matrix), size, replace=False))],
+            dtype=np.float32,
+        )
+        centroids = sample[rng.choice(size, self.ivf_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = self._nearest(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=len(centroids))
+            filled = counts > 0  # An empty list keeps its previous centroid
+            centroids[filled] = sums[filled] / counts[filled, None]
+        return centroids
+
+    def _assign(self, matrix: np.ndarray, centroids: np.ndarray, start: int):
+        """Nearest centroid of rows start.., in bounded batches"""
+        parts = [
+            self._nearest(
+                np.asarray(matrix[i : i + ASSIGN_BATCH], dtype=np.float32), centroids
+            )
+            for i in range(start, len(matrix), ASSIGN_BATCH)
+        ]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int32)
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        scores = np.einsum("ij,ij->i", centroids, centroids) - 2 * (
+            vectors @ centroids.T
+        )
+        return np.argmin(scores, axis=1).astype(np.int32)
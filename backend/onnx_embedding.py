@@ -0,0 +1,169 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+NORMALIZE_MODULE = "sentence_transformers.models.Normalize"
+POOLING_MODULE = "sentence_transformers.models.Pooling"
+TRANSFORMER_MODULE = "sentence_transformers.models.Transformer"
+# Pooling config flags, in the order sentence-transformers concatenates them
+POOLING_MODES = {
+    "cls": "pooling_mode_cls_token",
+    "max": "pooling_mode_max_tokens",
+    "mean": "pooling_mode_mean_tokens",
+}
+
+
+class OnnxEmbeddingFunction:
+    """
+    sentence-transformers model run through ONNX Runtime, without PyTorch.
+
+    Reads the same files SentenceTransformer does (tokenizer.json,
+    sentence_bert_config.json, modules.json and the pooling config) from a
+    local model directory or the Hugging Face Hub, and reproduces its
+    pipeline: truncate to max_seq_length, pad to the longest text in the
+    batch, pool the token embeddings as configured and L2-normalize if the
+    model ends in a Normalize module. onnx_file selects the exported graph;
+    hub repos such as sentence-transformers/all-MiniLM-L6-v2 ship
+    onnx/model.onnx and int8-quantized variants like
+    onnx/model_quint8_avx2.onnx next to it.
+
+    Called like Chroma's embedding functions: a list of texts in, one
+    float32 vector per text out.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        onnx_file: str = "onnx/model.onnx",
+        threads: int = 0,
+    ):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.onnx_file = onnx_file
+        self._model_dir = model_name if os.path.isdir(model_name) else None
+        # Bare names resolve like SentenceTransformer("all-MiniLM-L6-v2")
+        self._repo_id = (
+            model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        )
+
+        modules = self._read_json("modules.json") or []
+        self.normalize = any(m.get("type") == NORMALIZE_MODULE for m in modules)
+        unsupported = [
+            m["type"]
+            for m in modules
+            if m.get("type")
+            not in (TRANSFORMER_MODULE, POOLING_MODULE, NORMALIZE_MODULE)
+        ]
+        if unsupported:
+            raise ValueError(f"Unsupported modules for ONNX embedding: {unsupported}")
+        pooling_path = next(
+            (m["path"] for m in modules if m.get("type") == POOLING_MODULE),
+            "1_Pooling",
+        )
+        self.pooling = self._pooling_modes(
+            self._read_json(f"{pooling_path}/config.json") or {}
+        )
+
+        bert_config = self._read_json("sentence_bert_config.json") or {}
+        self.tokenizer = Tokenizer.from_file(self._file("tokenizer.json"))
+        padding = self.tokenizer.padding or {}
+        max_length = bert_config.get("max_seq_length")
+        if max_length:
+            self.tokenizer.enable_truncation(max_length=int(max_length))
+        # Pad to the longest text in each batch, never to a fixed length
+        self.tokenizer.enable_padding(
+            pad_id=padding.get("pad_id", 0),
+            pad_type_id=padding.get("pad_type_id", 0),
+            pad_token=padding.get("pad_token", "[PAD]"),
+        )
+
+        options = onnxruntime.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            self._file(onnx_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._inputs = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _file(self, name: str, optional: bool = False) -> Optional[str]:
+        """Local path of a model file, downloading it from the hub if needed"""
+        if self._model_dir is not None:
+            path = os.path.join(self._model_dir, name)
+            if optional and not os.path.exists(path):
+                return None
+            return path
+        from huggingface_hub import hf_hub_download
+        from huggingface_hub.errors import EntryNotFoundError, LocalEntryNotFoundError
+
+        try:
+            return hf_hub_download(self._repo_id, name)
+        except LocalEntryNotFoundError:
+            raise  # Offline and not cached: not the same as the repo lacking it
+        except EntryNotFoundError:
+            if optional:
+                return None
+            raise
+
+    def _read_json(self, name: str) -> Optional[Any]:
+        """A model JSON file, or None if the model has none"""
+        path = self._file(name, optional=True)
+        if path is None:
+            return None
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    @staticmethod
+    def _pooling_modes(config: Dict[str, Any]) -> List[str]:
+        """Pooling modes a Pooling config enables (mean if there is none)"""
+        if not config:
+            return ["mean"]
+        modes = [mode for mode, key in POOLING_MODES.items() if config.get(key)]
+        unsupported = [
+            key
+            for key, enabled in config.items()
+            if key.startswith("pooling_mode_")
+            and enabled
+            and key not in POOLING_MODES.values()
+        ]
+        if unsupported or not modes:
+            raise ValueError(f"Unsupported pooling for ONNX embedding: {config}")
+        return modes
+
+    def __call__(self, texts: Sequence[str]) -> List[np.ndarray]:
+        if not texts:
+            return []
+        encodings = self.tokenizer.encode_batch(list(texts))
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._inputs:
+            feeds["token_type_ids"] = np.array(
+                [e.type_ids for e in encodings], dtype=np.int64
+            )
+        token_embeddings = self.session.run(None, feeds)[0]
+        embeddings = self._pool(token_embeddings, attention_mask)
+        if self.normalize:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        return list(embeddings.astype(np.float32))
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray):
+        """Pool token embeddings over the non-padding positions"""
+        mask = attention_mask[:, :, None].astype(token_embeddings.dtype)
+        pooled = []
+        for mode in self.pooling:
+            if mode == "cls":
+                pooled.append(token_embeddings[:, 0])
+            elif mode == "max":
+                masked = np.where(mask > 0, token_embeddings, -1e9)
+                pooled.append(masked.max(axis=1))
+            else:
+                summed = (token_embeddings * mask).sum(axis=1)
+                pooled.append(summed / np.maximum(mask.sum(axis=1), 1e-9))
+        return np.concatenate(pooled, axis=1)
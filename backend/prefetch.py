@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Optional
+
+from course_resolver import tokenize
+
+
+def query_overlap(a: str, b: str) -> float:
+    """Jaccard overlap of the word tokens of two queries"""
+    tokens_a, tokens_b = set(tokenize(a)), set(tokenize(b))
+    if not tokens_a or not tokens_b:
+        return 0.0
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+class SearchPrefetch:
+    """
+    An unfiltered content search started speculatively for one query.
+
+    RAGSystem starts it alongside the first LLM call; CourseSearchTool
+    takes the results instead of searching again when the model asks for
+    a compatible search: no course or lesson filter, and a query sharing
+    at least min_overlap of its words with the prefetched one.
+    """
+
+    def __init__(
+        self,
+        query: str,
+        search: Callable[[str], Any],
+        executor: Executor,
+        min_overlap: float = 0.5,
+    ):
+        self.query = query
+        self.min_overlap = min_overlap
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._future: Future = executor.submit(self._run, search)
+
+    def _run(self, search: Callable[[str], Any]) -> Any:
+        try:
+            return search(self.query)
+        finally:
+            self.finished = time.perf_counter()
+
+    def compatible(
+        self,
+        query: str,
+        course_name: Optional[str] = None,
+        lesson_number: Optional[int] = None,
+    ) -> bool:
+        if course_name or lesson_number is not None:
+            return False
+        return query_overlap(self.query, query) >= self.min_overlap
+
+    def take(
+        self,
+        query: str,
+        course_name: Optional[str] = None,
+        lesson_number: Optional[int] = None,
+    ) -> Optional[Any]:
+        """
+        Prefetched results for a search, if it is compatible.
+
+        Waits for the prefetch when it is still running.
+
+        Returns:
+            The prefetched search results, or None if the caller should
+            run its own search
+        """
+        if not self.compatible(query, course_name, lesson_number):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        requested = time.perf_counter()
+        try:
+            results = self._future.result()
+        except Exception:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # A fresh search started now would have taken as long as the
+        # prefetch did; only the part spent waiting for it was not saved
+        search_seconds = self.finished - self.started
+        waited = max(0.0, self.finished - requested)
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += search_seconds - waited
+        return results
+
+    def cancel(self):
+        """Stop the search if it has not started yet"""
+        self._future.cancel()
+
+
+class PrefetchStats:
+    """Outcome of every prefetch, to judge whether speculation pays off"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.issued = 0
+        self.hits = 0  # Model searched and the prefetch was used
+        self.misses = 0  # Model searched, but for something else
+        self.unused = 0  # Model never searched content
+        self.saved_seconds = 0.0
+
+    def record(self, prefetch: SearchPrefetch):
+        with self._lock:
+            self.issued += 1
+            if prefetch.hits:
+                self.hits += 1
+            elif prefetch.misses:
+                self.misses += 1
+            else:
+                self.unused += 1
+            self.saved_seconds += prefetch.saved_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts, hit rate and milliseconds of search latency saved"""
+        with self._lock:
+            return {
+                "issued": self.issued,
+                "hits": self.hits,
+                "misses": self.misses,
+                "unused": self.unused,
+                "hit_rate": self.hits / self.issued if self.issued else 0.0,
+                "saved_ms": round(self.saved_seconds * 1000, 1),
+                "saved_ms_per_hit": (
+                    round(self.saved_seconds * 1000 / self.hits, 1)
+                    if self.hits
+                    else 0.0
+                ),
+            }
@@ -0,0 +1,87 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from prefetch import SearchPrefetch
+
+# Token counters read from each Anthropic response's usage
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+@dataclass
+class ToolCallRecord:
+    """One tool execution within a query"""
+
+    name: str
+    arguments: Dict[str, Any]
+    seconds: float
+    error: Optional[str] = None
+
+
+@dataclass
+class QueryContext:
+    """
+    State for a single query, threaded through ToolManager.execute_tool.
+
+    Tools add the sources they cite here instead of on themselves, so
+    concurrent queries sharing the same tool instances never see each
+    other's sources.
+    """
+
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    tool_calls: List[ToolCallRecord] = field(default_factory=list)
+    usage: Dict[str, int] = field(default_factory=dict)  # Summed over API calls
+    api_calls: int = 0
+    prefetch: Optional[SearchPrefetch] = None  # Speculative content search
+    started: float = field(default_factory=time.perf_counter)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add_sources(self, sources: List[Dict[str, Any]]):
+        """Add sources, skipping ones already cited in this query"""
+        with self._lock:
+            seen = {(s.get("text"), s.get("link")) for s in self.sources}
+            for source in sources:
+                key = (source.get("text"), source.get("link"))
+                if key not in seen:
+                    self.sources.append(source)
+                    seen.add(key)
+
+    def record(self, call: ToolCallRecord):
+        with self._lock:
+            self.tool_calls.append(call)
+
+    def record_usage(self, usage: Any):
+        """Add the token counts of one API response"""
+        with self._lock:
+            self.api_calls += 1
+            for name in USAGE_FIELDS:
+                value = getattr(usage, name, None)
+                if isinstance(value, int):
+                    self.usage[name] = self.usage.get(name, 0) + value
+
+    def fork(self) -> "QueryContext":
+        """Empty context for one of several concurrent tool calls"""
+        return QueryContext(started=self.started, prefetch=self.prefetch)
+
+    def merge(self, child: "QueryContext"):
+        """Fold a forked context back in; merge children in call order"""
+        self.add_sources(child.sources)
+        with self._lock:
+            self.tool_calls.extend(child.tool_calls)
+
+    @property
+    def tool_seconds(self) -> float:
+        """Total time spent executing tools"""
+        return sum(call.seconds for call in self.tool_calls)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return time.perf_counter() - self.started
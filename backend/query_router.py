@@ -0,0 +1,102 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from course_resolver import SEMANTIC, CourseNameResolver
+
+# Routes a query can take
+OUTLINE = "outline"  # Answered from the course outline, no LLM call
+GENERAL = "general"  # Full tool-calling path
+
+_ASK = (
+    r"(?:(?:can you |could you |please )?(?:show|give|list|get|tell)(?: me)?"
+    r"(?: all)? |what(?: is|'s| are) )?"
+)
+_COURSE = r"(?:the )?(?P<course>.+?)(?: course)?"
+
+# Whole-query patterns for course structure questions. Anything after the
+# course name must be part of the pattern, so "what lessons in MCP cover
+# tools" leaves junk in the course group, which then fails to resolve.
+OUTLINE_PATTERNS = {
+    "outline_of": re.compile(
+        rf"^{_ASK}(?:the )?(?:outline|syllabus|structure|lesson list|list of lessons"
+        rf"|lessons) (?:of|for|in) {_COURSE}$"
+    ),
+    "which_lessons": re.compile(
+        rf"^(?:what|which) lessons (?:are (?:there )?)?(?:in|does|do) {_COURSE}"
+        r"(?: have| contain| include)?$"
+    ),
+    "course_outline": re.compile(
+        rf"^{_ASK}(?:the )?(?P<course>.+?) (?:course )?(?:outline|syllabus)$"
+    ),
+}
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """Where a query goes and, for OUTLINE, which course"""
+
+    route: str
+    course_title: Optional[str] = None
+    pattern: Optional[str] = None  # Name of the OUTLINE_PATTERNS entry
+
+
+class QueryRouter:
+    """
+    Send course structure questions straight to the outline.
+
+    A query is routed to OUTLINE only when it matches one of
+    OUTLINE_PATTERNS and the captured course name resolves through the
+    catalog tiers (exact, case-insensitive or unique prefix); an ambiguous
+    or embedding-only match goes to the LLM, which can ask or search.
+    """
+
+    def __init__(self, course_resolver: CourseNameResolver):
+        self.course_resolver = course_resolver
+        self._lock = threading.Lock()
+        self.route_counts: Dict[str, int] = {OUTLINE: 0, GENERAL: 0}
+        self.pattern_counts: Dict[str, int] = {name: 0 for name in OUTLINE_PATTERNS}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.casefold().split()).rstrip("?.! ")
+
+    def classify(self, query: str) -> RouteDecision:
+        """
+        Decide how to answer a query, without side effects.
+
+        Args:
+            query: The user's question
+
+        Returns:
+            RouteDecision for the query
+        """
+        text = self.normalize(query)
+        for name, pattern in OUTLINE_PATTERNS.items():
+            match = pattern.match(text)
+            if not match:
+                continue
+            resolution = self.course_resolver.resolve(
+                match.group("course"), allow_semantic=False
+            )
+            if resolution.title and resolution.tier != SEMANTIC:
+                return RouteDecision(OUTLINE, resolution.title, name)
+        return RouteDecision(GENERAL)
+
+    def route(self, query: str) -> RouteDecision:
+        """classify() and count the decision"""
+        decision = self.classify(query)
+        with self._lock:
+            self.route_counts[decision.route] += 1
+            if decision.pattern:
+                self.pattern_counts[decision.pattern] += 1
+        return decision
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Queries per route and outline matches per pattern"""
+        with self._lock:
+            return {
+                "routes": dict(self.route_counts),
+                "patterns": dict(self.pattern_counts),
+            }
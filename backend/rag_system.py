@@ -1,11 +1,25 @@
+import asyncio
+import functools
 import os
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from ai_generator import AIGenerator
+from answer_cache import SemanticAnswerCache
 from document_processor import DocumentProcessor
+from ingestion import (
+    CourseIngestor,
+    IngestionManifest,
+    IngestionReport,
+    list_course_files,
+)
 from models import Course, CourseChunk, Lesson
+from prefetch import PrefetchStats, SearchPrefetch
+from query_context import QueryContext
+from query_router import OUTLINE, QueryRouter
 from search_tools import CourseOutlineTool, CourseSearchTool, ToolManager
-from session_manager import SessionManager
+from session_manager import SessionManager, SessionStore
+from sqlite_sessions import SQLiteSessionStore
 from vector_store import VectorStore
 
 
@@ -20,12 +34,62 @@ class RAGSystem:
             config.CHUNK_SIZE, config.CHUNK_OVERLAP
         )
         self.vector_store = VectorStore(
-            config.CHROMA_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS
+            config.CHROMA_PATH,
+            config.EMBEDDING_MODEL,
+            config.MAX_RESULTS,
+            embedding_batch_size=config.EMBEDDING_BATCH_SIZE,
+            embedding_backend=config.EMBEDDING_BACKEND,
+            onnx_file=config.EMBEDDING_ONNX_FILE,
+            write_batch_size=config.CHROMA_WRITE_BATCH_SIZE,
+            embedding_cache_path=(
+                os.path.join(config.CHROMA_PATH, "embedding_cache")
+                if config.EMBEDDING_CACHE
+                else None
+            ),
+            query_cache_size=config.QUERY_EMBEDDING_CACHE_SIZE,
+            content_backend=config.VECTOR_BACKEND,
+            ivf_lists=config.VECTOR_IVF_LISTS,
+            ivf_probes=config.VECTOR_IVF_PROBES,
+            quantization=config.VECTOR_QUANTIZATION,
+            rerank_factor=config.VECTOR_RERANK_FACTOR,
+            lexical_index_path=(
+                os.path.join(config.CHROMA_PATH, "lexical_index.npz")
+                if config.HYBRID_SEARCH
+                else None
+            ),
         )
         self.ai_generator = AIGenerator(
-            config.ANTHROPIC_API_KEY, config.ANTHROPIC_MODEL, config.BASE_URL
+            config.ANTHROPIC_API_KEY,
+            config.ANTHROPIC_MODEL,
+            config.BASE_URL,
+            tool_timeout=config.TOOL_TIMEOUT,
+            prompt_caching=config.PROMPT_CACHING,
         )
-        self.session_manager = SessionManager(config.MAX_HISTORY)
+        self.session_manager = self._create_session_store(config)
+
+        # Bounded pool for blocking tool work (embeddings, ChromaDB): keeps the
+        # event loop free on the async path and runs a round's tools in parallel
+        self.query_executor = ThreadPoolExecutor(
+            max_workers=max(1, config.QUERY_WORKERS), thread_name_prefix="rag-query"
+        )
+
+        # Opt-in cache of answers to standalone questions, keyed on the query
+        # embedding; emptied whenever the course catalog changes
+        self.answer_cache: Optional[SemanticAnswerCache] = None
+        if config.ANSWER_CACHE:
+            self.answer_cache = SemanticAnswerCache(
+                self.vector_store.query_cache.get,
+                lambda: self.vector_store.catalog_index.version,
+                threshold=config.ANSWER_CACHE_THRESHOLD,
+                max_size=config.ANSWER_CACHE_SIZE,
+                ttl_seconds=config.ANSWER_CACHE_TTL,
+            )
+
+        # Speculative content search alongside the first LLM call (opt-in)
+        self.prefetch_stats = PrefetchStats()
+
+        # Throughput report from the most recent add_course_folder call
+        self.last_ingestion_report: Optional[IngestionReport] = None
 
         # Initialize search tools
         self.tool_manager = ToolManager()
@@ -34,6 +98,44 @@ class RAGSystem:
         self.tool_manager.register_tool(self.search_tool)
         self.tool_manager.register_tool(self.outline_tool)
 
+        # Course structure questions are answered from the outline directly
+        self.query_router: Optional[QueryRouter] = (
+            QueryRouter(self.vector_store.course_resolver)
+            if config.QUERY_ROUTER
+            else None
+        )
+
+    def _create_session_store(self, config) -> SessionStore:
+        """Session backend selected by config.SESSION_BACKEND"""
+        if config.SESSION_BACKEND == "sqlite":
+            return SQLiteSessionStore(
+                config.SESSION_DB_PATH,
+                config.MAX_HISTORY,
+                session_ttl=config.SESSION_TTL,
+            )
+        if config.SESSION_BACKEND != "memory":
+            raise ValueError(f"Unknown session backend: {config.SESSION_BACKEND!r}")
+        if config.HISTORY_TOKEN_BUDGET <= 0:
+            return SessionManager(
+                config.MAX_HISTORY,
+                max_sessions=config.MAX_SESSIONS,
+                session_ttl=config.SESSION_TTL,
+            )
+        # Older turns are folded into a summary by one background thread
+        return SessionManager(
+            config.MAX_HISTORY,
+            max_sessions=config.MAX_SESSIONS,
+            session_ttl=config.SESSION_TTL,
+            token_budget=config.HISTORY_TOKEN_BUDGET,
+            summarize=functools.partial(
+                self.ai_generator.summarize_conversation,
+                max_tokens=config.HISTORY_SUMMARY_TOKENS,
+            ),
+            summary_executor=ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="history-summary"
+            ),
+        )
+
     def add_course_document(self, file_path: str) -> Tuple[Course, int]:
         """
         Add a single course document to the knowledge base.
@@ -62,7 +164,10 @@ class RAGSystem:
             return None, 0
 
     def add_course_folder(
-        self, folder_path: str, clear_existing: bool = False
+        self,
+        folder_path: str,
+        clear_existing: bool = False,
+        workers: Optional[int] = None,
     ) -> Tuple[int, int]:
         """
         Add all course documents from a folder.
@@ -70,17 +175,24 @@ class RAGSystem:
         Args:
             folder_path: Path to folder containing course documents
             clear_existing: Whether to clear existing data first
+            workers: Parser processes to use (defaults to config.INGEST_WORKERS)
 
         Returns:
             Tuple of (total courses added, total chunks created)
         """
-        total_courses = 0
-        total_chunks = 0
+        manifest = None
+        if self.config.INGEST_MANIFEST:
+            manifest = IngestionManifest(
+                os.path.join(self.config.CHROMA_PATH, "ingestion_manifest.json")
+            )
 
         # Clear existing data if requested
         if clear_existing:
             print("Clearing existing data for fresh rebuild...")
             self.vector_store.clear_all_data()
+            if manifest is not None:
+                manifest.clear()
+                manifest.save()
 
         if not os.path.exists(folder_path):
             print(f"✗ Folder {folder_path} does not exist")
@@ -90,42 +202,28 @@ class RAGSystem:
         existing_course_titles = set(self.vector_store.get_existing_course_titles())
         print(f"Found {len(existing_course_titles)} existing courses in DB")
 
-        # Process each file in the folder
-        files_found = list(os.listdir(folder_path))
-        print(f"Found {len(files_found)} files in {folder_path}")
-
-        for file_name in files_found:
-            file_path = os.path.join(folder_path, file_name)
-            if os.path.isfile(file_path) and file_name.lower().endswith(
-                (".pdf", ".docx", ".txt")
-            ):
-                print(f"Processing: {file_name}")
-                try:
-                    # Check if this course might already exist
-                    # We'll process the document to get the course ID, but only add if new
-                    course, course_chunks = (
-                        self.document_processor.process_course_document(file_path)
-                    )
-
-                    if course and course.title not in existing_course_titles:
-                        # This is a new course - add it to the vector store
-                        self.vector_store.add_course_metadata(course)
-                        self.vector_store.add_course_content(course_chunks)
-                        total_courses += 1
-                        total_chunks += len(course_chunks)
-                        print(
-                            f"Added new course: {course.title} ({len(course_chunks)} chunks)"
-                        )
-                        existing_course_titles.add(course.title)
-                    elif course:
-                        print(f"Course already exists: {course.title} - skipping")
-                except Exception as e:
-                    print(f"Error processing {file_name}: {e}")
+        file_paths = list_course_files(folder_path)
+        print(f"Found {len(file_paths)} course files in {folder_path}")
+
+        ingestor = CourseIngestor(
+            self.document_processor,
+            self.vector_store,
+            workers=workers if workers is not None else self.config.INGEST_WORKERS,
+            batch_size=self.config.INGEST_BATCH_SIZE,
+        )
+        total_courses, total_chunks, report = ingestor.ingest(
+            file_paths, existing_course_titles, manifest
+        )
+        self.last_ingestion_report = report
+        print(report.summary())
 
         return total_courses, total_chunks
 
     def query(
-        self, query: str, session_id: Optional[str] = None
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        context: Optional[QueryContext] = None,
     ) -> Tuple[str, List[str]]:
         """
         Process a user query using the RAG system with tool-based search.
@@ -133,17 +231,25 @@ class RAGSystem:
         Args:
             query: User's question
             session_id: Optional session ID for conversation context
+            context: Optional QueryContext to collect sources and tool timings
+                (a fresh one is used if omitted)
 
         Returns:
             Tuple of (response, sources list - empty for tool-based approach)
         """
-        # Create prompt for the AI with clear instructions
-        prompt = f"""Answer this question about course materials: {query}"""
+        prompt, history = self._prepare_query(query, session_id)
+        if context is None:
+            context = QueryContext()
 
-        # Get conversation history if session exists
-        history = None
-        if session_id:
-            history = self.session_manager.get_conversation_history(session_id)
+        routed = self._routed_answer(query, context)
+        if routed is not None:
+            return self._finish_query(query, session_id, routed, context)
+
+        cached, version = self._cached_answer(query, history, context)
+        if cached is not None:
+            return self._finish_query(query, session_id, cached, context)
+
+        self._start_prefetch(query, context)
 
         # Generate response using AI with tools
         response = self.ai_generator.generate_response(
@@ -151,13 +257,238 @@ class RAGSystem:
             conversation_history=history,
             tools=self.tool_manager.get_tool_definitions(),
             tool_manager=self.tool_manager,
+            context=context,
+            executor=self.query_executor,
+        )
+
+        self._store_answer(query, response, context, version)
+        return self._finish_query(query, session_id, response, context)
+
+    async def acreate_session(self) -> str:
+        """Create a session on the query executor (a disk write with SQLite)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.query_executor, self.session_manager.create_session
+        )
+
+    async def aquery(
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        context: Optional[QueryContext] = None,
+    ) -> Tuple[str, List[str]]:
+        """
+        Async variant of query for the API.
+
+        The Anthropic calls are awaited; tool calls and session store reads
+        and writes (disk I/O with the SQLite backend) run on the bounded
+        query executor, so concurrent requests on one worker overlap.
+
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+            context: Optional QueryContext to collect sources and tool timings
+                (a fresh one is used if omitted)
+
+        Returns:
+            Tuple of (response, sources list)
+        """
+        loop = asyncio.get_running_loop()
+        prompt, history = await loop.run_in_executor(
+            self.query_executor, self._prepare_query, query, session_id
+        )
+        if context is None:
+            context = QueryContext()
+
+        answer = await loop.run_in_executor(
+            self.query_executor, self._routed_answer, query, context
+        )
+        version = None
+        if answer is None:
+            answer, version = await loop.run_in_executor(
+                self.query_executor, self._cached_answer, query, history, context
+            )
+        if answer is None:
+            self._start_prefetch(query, context)
+            answer = await self.ai_generator.agenerate_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager,
+                executor=self.query_executor,
+                context=context,
+            )
+            await loop.run_in_executor(
+                self.query_executor,
+                self._store_answer,
+                query,
+                answer,
+                context,
+                version,
+            )
+
+        return await loop.run_in_executor(
+            self.query_executor,
+            self._finish_query,
+            query,
+            session_id,
+            answer,
+            context,
+        )
+
+    async def astream_query(
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        context: Optional[QueryContext] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a query, streaming progress and answer text as they happen.
+
+        Yields the tool, text and reset events of
+        AIGenerator.astream_response, then {"type": "sources", "sources": [...]}
+        once the answer is complete and recorded in the session.
+
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+            context: Optional QueryContext to collect sources and tool timings
+                (a fresh one is used if omitted)
+        """
+        loop = asyncio.get_running_loop()
+        prompt, history = await loop.run_in_executor(
+            self.query_executor, self._prepare_query, query, session_id
+        )
+        if context is None:
+            context = QueryContext()
+
+        answer = await loop.run_in_executor(
+            self.query_executor, self._routed_answer, query, context
+        )
+        version = None
+        if answer is None:
+            answer, version = await loop.run_in_executor(
+                self.query_executor, self._cached_answer, query, history, context
+            )
+        if answer is not None:
+            yield {"type": "text", "text": answer}
+            _, sources = await loop.run_in_executor(
+                self.query_executor,
+                self._finish_query,
+                query,
+                session_id,
+                answer,
+                context,
+            )
+            yield {"type": "sources", "sources": sources}
+            return
+
+        self._start_prefetch(query, context)
+        answer = ""
+        async for event in self.ai_generator.astream_response(
+            query=prompt,
+            conversation_history=history,
+            tools=self.tool_manager.get_tool_definitions(),
+            tool_manager=self.tool_manager,
+            executor=self.query_executor,
+            context=context,
+        ):
+            if event["type"] == "done":
+                answer = event["answer"]
+            else:
+                yield event
+
+        await loop.run_in_executor(
+            self.query_executor, self._store_answer, query, answer, context, version
+        )
+        _, sources = await loop.run_in_executor(
+            self.query_executor, self._finish_query, query, session_id, answer, context
         )
+        yield {"type": "sources", "sources": sources}
+
+    def _prepare_query(
+        self, query: str, session_id: Optional[str]
+    ) -> Tuple[str, Optional[str]]:
+        """Build the prompt and look up conversation history"""
+        # Create prompt for the AI with clear instructions
+        prompt = f"""Answer this question about course materials: {query}"""
+
+        # Get conversation history if session exists
+        history = None
+        if session_id:
+            history = self.session_manager.get_conversation_history(session_id)
 
-        # Get sources from the search tool
-        sources = self.tool_manager.get_last_sources()
+        return prompt, history
+
+    def _routed_answer(self, query: str, context: QueryContext) -> Optional[str]:
+        """Answer a course structure question from its outline, or None"""
+        if self.query_router is None:
+            return None
+        decision = self.query_router.route(query)
+        if decision.route != OUTLINE:
+            return None
+        return self.tool_manager.execute_tool(
+            "get_course_outline", context=context, course_name=decision.course_title
+        )
+
+    def _cached_answer(
+        self, query: str, history: Optional[str], context: QueryContext
+    ) -> Tuple[Optional[str], Optional[int]]:
+        """
+        Look a query up in the answer cache.
+
+        Only standalone questions (no conversation history yet) are cached,
+        since a follow-up's answer depends on the earlier exchange.
+
+        Returns:
+            (cached answer, None) on a hit, with its sources added to the
+            context; (None, corpus version to store the new answer under)
+            on a miss; (None, None) when the query must not be cached
+        """
+        if self.answer_cache is None or history:
+            return None, None
+        version = self.answer_cache.corpus_version()
+        cached = self.answer_cache.get(query)
+        if cached is None:
+            return None, version
+        context.add_sources(cached.sources)
+        return cached.answer, None
+
+    def _store_answer(
+        self,
+        query: str,
+        answer: str,
+        context: QueryContext,
+        version: Optional[int],
+    ):
+        """Cache a fresh answer unless a tool call failed while producing it"""
+        if version is None or any(call.error for call in context.tool_calls):
+            return
+        self.answer_cache.put(query, answer, list(context.sources), version)
+
+    def _start_prefetch(self, query: str, context: QueryContext):
+        """Start searching the raw query while the model picks its tools"""
+        if self.config.SEARCH_PREFETCH and context.prefetch is None:
+            context.prefetch = SearchPrefetch(
+                query,
+                self.vector_store.search,
+                self.query_executor,
+                min_overlap=self.config.PREFETCH_MIN_OVERLAP,
+            )
+
+    def _finish_query(
+        self,
+        query: str,
+        session_id: Optional[str],
+        response: str,
+        context: QueryContext,
+    ) -> Tuple[str, List[str]]:
+        """Collect this query's sources and record the exchange"""
+        sources = list(context.sources)
 
-        # Reset sources after retrieving them
-        self.tool_manager.reset_sources()
+        if context.prefetch is not None:
+            context.prefetch.cancel()
+            self.prefetch_stats.record(context.prefetch)
 
         # Update conversation history
         if session_id:
@@ -1,6 +1,8 @@
+import time
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Optional, Protocol
 
+from query_context import QueryContext, ToolCallRecord
 from vector_store import SearchResults, VectorStore
 
 
@@ -14,16 +16,28 @@ class Tool(ABC):
 
     @abstractmethod
     def execute(self, **kwargs) -> str:
-        """Execute the tool with given parameters"""
+        """
+        Execute the tool with given parameters.
+
+        ToolManager passes a keyword-only `context` (QueryContext) when the
+        call belongs to a query; tools that cite sources add them to it.
+        """
         pass
 
+    def _store_sources(self, sources: list, context: Optional[QueryContext]):
+        """Record sources on the query context, or on the tool when called alone"""
+        if context is not None:
+            context.add_sources(sources)
+        else:
+            self.last_sources = sources
+
 
 class CourseSearchTool(Tool):
     """Tool for searching course content with semantic course name matching"""
 
     def __init__(self, vector_store: VectorStore):
         self.store = vector_store
-        self.last_sources = []  # Track sources from last search
+        self.last_sources = []  # Sources from the last call made without a context
 
     def get_tool_definition(self) -> Dict[str, Any]:
         """Return Anthropic tool definition for this tool"""
@@ -55,6 +69,8 @@ class CourseSearchTool(Tool):
         query: str,
         course_name: Optional[str] = None,
         lesson_number: Optional[int] = None,
+        *,
+        context: Optional[QueryContext] = None,
     ) -> str:
         """
         Execute the search tool with given parameters.
@@ -63,15 +79,20 @@ class CourseSearchTool(Tool):
             query: What to search for
             course_name: Optional course filter
             lesson_number: Optional lesson filter
+            context: Query the call belongs to, which collects its sources
 
         Returns:
             Formatted search results or error message
         """
 
-        # Use the vector store's unified search interface
-        results = self.store.search(
-            query=query, course_name=course_name, lesson_number=lesson_number
-        )
+        # Serve a compatible speculative search, else use the vector store
+        results = None
+        if context is not None and context.prefetch is not None:
+            results = context.prefetch.take(query, course_name, lesson_number)
+        if results is None:
+            results = self.store.search(
+                query=query, course_name=course_name, lesson_number=lesson_number
+            )
 
         # Handle errors
         if results.error:
@@ -87,9 +108,11 @@ class CourseSearchTool(Tool):
             return f"No relevant content found{filter_info}."
 
         # Format and return results
-        return self._format_results(results)
+        return self._format_results(results, context)
 
-    def _format_results(self, results: SearchResults) -> str:
+    def _format_results(
+        self, results: SearchResults, context: Optional[QueryContext] = None
+    ) -> str:
         """Format search results with course and lesson context"""
         formatted = []
         sources = []  # Track sources for the UI
@@ -126,7 +149,7 @@ class CourseSearchTool(Tool):
             formatted.append(f"{header}\n{doc}")
 
         # Store sources for retrieval
-        self.last_sources = sources
+        self._store_sources(sources, context)
 
         return "\n\n".join(formatted)
 
@@ -136,7 +159,7 @@ class CourseOutlineTool(Tool):
 
     def __init__(self, vector_store: VectorStore):
         self.store = vector_store
-        self.last_sources = []  # Track sources from last outline retrieval
+        self.last_sources = []  # Sources from the last call made without a context
 
     def get_tool_definition(self) -> Dict[str, Any]:
         """Return Anthropic tool definition for this tool"""
@@ -155,12 +178,15 @@ class CourseOutlineTool(Tool):
             },
         }
 
-    def execute(self, course_name: str) -> str:
+    def execute(
+        self, course_name: str, *, context: Optional[QueryContext] = None
+    ) -> str:
         """
         Execute the course outline retrieval tool.
 
         Args:
             course_name: Name or partial name of the course
+            context: Query the call belongs to, which collects its sources
 
         Returns:
             Formatted course outline or error message
@@ -173,9 +199,11 @@ class CourseOutlineTool(Tool):
             return f"No course found matching '{course_name}'."
 
         # Format the outline
-        return self._format_outline(outline)
+        return self._format_outline(outline, context)
 
-    def _format_outline(self, outline: Dict[str, Any]) -> str:
+    def _format_outline(
+        self, outline: Dict[str, Any], context: Optional[QueryContext] = None
+    ) -> str:
         """Format course outline for display"""
         formatted_parts = []
         sources = []  # Track sources for the UI
@@ -221,7 +249,7 @@ class CourseOutlineTool(Tool):
             formatted_parts.append("\nNo lessons found.")
 
         # Store sources for retrieval
-        self.last_sources = sources
+        self._store_sources(sources, context)
 
         return "\n".join(formatted_parts)
 
@@ -244,15 +272,49 @@ class ToolManager:
         """Get all tool definitions for Anthropic tool calling"""
         return [tool.get_tool_definition() for tool in self.tools.values()]
 
-    def execute_tool(self, tool_name: str, **kwargs) -> str:
-        """Execute a tool by name with given parameters"""
+    def execute_tool(
+        self, tool_name: str, context: Optional[QueryContext] = None, **kwargs
+    ) -> str:
+        """
+        Execute a tool by name with given parameters.
+
+        Args:
+            tool_name: Name of a registered tool
+            context: Query the call belongs to; collects sources and a
+                timing record of the call
+            **kwargs: Tool input as sent by the model
+
+        Returns:
+            Tool output for the model
+        """
         if tool_name not in self.tools:
             return f"Tool '{tool_name}' not found"
 
-        return self.tools[tool_name].execute(**kwargs)
+        tool = self.tools[tool_name]
+        if context is None:
+            return tool.execute(**kwargs)
+
+        start = time.perf_counter()
+        error = None
+        try:
+            return tool.execute(**kwargs, context=context)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            context.record(
+                ToolCallRecord(
+                    tool_name, kwargs, time.perf_counter() - start, error=error
+                )
+            )
 
     def get_last_sources(self) -> list:
-        """Get sources from the last search operation"""
+        """
+        Get sources from the last search operation.
+
+        Only meaningful for tools executed without a QueryContext; shared
+        across callers, so not safe for concurrent queries.
+        """
         # Check all tools for last_sources attribute
         for tool in self.tools.values():
             if hasattr(tool, "last_sources") and tool.last_sources:
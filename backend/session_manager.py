@@ -1,8 +1,15 @@
+import sys
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Represents a single message in a conversation"""
 
@@ -10,57 +17,294 @@ class Message:
     content: str  # The message content
 
 
-class SessionManager:
-    """Manages conversation sessions and message history"""
+def new_session_id() -> str:
+    """Random session ID, unique across workers and restarts"""
+    return f"session_{uuid.uuid4().hex}"
 
-    def __init__(self, max_history: int = 5):
+
+def format_message(message: Message) -> str:
+    """One line of conversation history"""
+    return f"{message.role.title()}: {message.content}"
+
+
+def format_history(messages: Iterable[Message]) -> Optional[str]:
+    """Format messages as conversation history, None if there are none"""
+    return "\n".join(format_message(msg) for msg in messages) or None
+
+
+class SessionStore(ABC):
+    """Interface of conversation history backends used by RAGSystem"""
+
+    @abstractmethod
+    def create_session(self) -> str:
+        """Create a new conversation session and return its ID"""
+        pass
+
+    @abstractmethod
+    def add_message(self, session_id: str, role: str, content: str):
+        """Add a message, creating the session if needed"""
+        pass
+
+    def add_exchange(self, session_id: str, user_message: str, assistant_message: str):
+        """Add a complete question-answer exchange"""
+        self.add_message(session_id, "user", user_message)
+        self.add_message(session_id, "assistant", assistant_message)
+
+    @abstractmethod
+    def get_conversation_history(self, session_id: Optional[str]) -> Optional[str]:
+        """Formatted recent history, or None for an unknown or empty session"""
+        pass
+
+    @abstractmethod
+    def clear_session(self, session_id: str):
+        """Clear all messages from a session"""
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Backend-specific size and eviction metrics"""
+        pass
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)"""
+    return (len(text) + 3) // 4
+
+
+class _Session:
+    __slots__ = (
+        "messages",
+        "lines",
+        "tokens",
+        "summary",
+        "folding",
+        "summarizing",
+        "last_access",
+    )
+
+    def __init__(self, max_messages: int, now: float):
+        self.messages: Deque[Message] = deque(maxlen=max_messages)
+        self.lines: Deque[str] = deque()  # format_message of each message
+        self.tokens = 0  # estimate_tokens of every message content
+        self.summary = ""  # Rolling summary of messages folded out of the window
+        self.folding: List[Message] = []  # Left the window, not yet summarized
+        self.summarizing = False
+        self.last_access = now
+
+    def pop_oldest(self) -> Message:
+        """Remove the oldest message and its history line"""
+        oldest = self.messages.popleft()
+        self.lines.popleft()
+        self.tokens -= estimate_tokens(oldest.content)
+        return oldest
+
+    def append(self, message: Message) -> Optional[Message]:
+        """Add a message, formatting only its own history line
+
+        Returns:
+            The oldest message if it had to make room, else None
+        """
+        if self.messages.maxlen == 0:
+            return None
+        dropped = None
+        if len(self.messages) == self.messages.maxlen:
+            dropped = self.pop_oldest()
+        self.messages.append(message)
+        self.lines.append(format_message(message))
+        self.tokens += estimate_tokens(message.content)
+        return dropped
+
+    def formatted(self) -> Optional[str]:
+        history = "\n".join(self.lines)
+        if self.summary:
+            return f"Summary of earlier conversation:\n{self.summary}\n\n{history}"
+        return history or None
+
+    def clear(self):
+        self.messages.clear()
+        self.lines.clear()
+        self.tokens = 0
+        self.summary = ""
+        self.folding.clear()
+
+
+class SessionManager(SessionStore):
+    """
+    Manages conversation sessions and message history in process memory.
+
+    Sessions are kept in least-recently-used order. One idle for longer
+    than session_ttl seconds is dropped, and the least recently used one
+    is evicted when there are more than max_sessions, so a long-running
+    worker holds a bounded amount of history.
+
+    With a token_budget and a summarize function, messages are not simply
+    dropped: once the recent messages exceed the budget (or max_history),
+    the oldest ones are folded into a rolling summary by summarize(previous
+    summary, transcript) on summary_executor, off the request path. The
+    last exchange always stays verbatim.
+    """
+
+    def __init__(
+        self,
+        max_history: int = 5,
+        max_sessions: int = 10000,
+        session_ttl: Optional[float] = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+        token_budget: Optional[int] = None,
+        summarize: Optional[Callable[[str, str], str]] = None,
+        summary_executor: Optional[Executor] = None,
+    ):
         self.max_history = max_history
-        self.sessions: Dict[str, List[Message]] = {}
-        self.session_counter = 0
+        self.max_sessions = max(1, max_sessions)
+        self.session_ttl = session_ttl  # None keeps idle sessions until evicted
+        self._clock = clock
+        self.sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0  # Dropped to stay within max_sessions
+        self.expired = 0  # Dropped after session_ttl idle seconds
+
+        # History compaction (off unless both are given)
+        self.token_budget = token_budget if summarize else None
+        self._summarize = summarize
+        self._summary_executor = summary_executor
+        self.summaries = 0  # Completed summarize calls
+        self.summary_failures = 0
+        self.folded = 0  # Messages folded into summaries
+
+    def _expire(self, now: float):
+        """Drop idle sessions; call with the lock held"""
+        if self.session_ttl is None:
+            return
+        # Oldest access first, so stop at the first live session
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if now - session.last_access < self.session_ttl:
+                break
+            del self.sessions[session_id]
+            self.expired += 1
+
+    def _session(self, session_id: str, create: bool) -> Optional[_Session]:
+        """Look up (or create) a live session and mark it used; hold the lock"""
+        now = self._clock()
+        self._expire(now)
+        session = self.sessions.get(session_id)
+        if session is None:
+            if not create:
+                return None
+            session = _Session(max(0, self.max_history * 2), now)
+            self.sessions[session_id] = session
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.evicted += 1
+        else:
+            session.last_access = now
+            self.sessions.move_to_end(session_id)
+        return session
 
     def create_session(self) -> str:
         """Create a new conversation session"""
-        self.session_counter += 1
-        session_id = f"session_{self.session_counter}"
-        self.sessions[session_id] = []
+        session_id = new_session_id()
+        with self._lock:
+            self._session(session_id, create=True)
         return session_id
 
     def add_message(self, session_id: str, role: str, content: str):
         """Add a message to the conversation history"""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = []
+        with self._lock:
+            session = self._session(session_id, create=True)
+            # The deque drops the oldest message once max_history is reached
+            dropped = session.append(Message(role=role, content=content))
+            if self.token_budget is None or not self._compact(session, dropped):
+                return
+        if self._summary_executor is None:
+            self._summary_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="history-summary"
+            )
+        self._summary_executor.submit(self._fold, session)
 
-        message = Message(role=role, content=content)
-        self.sessions[session_id].append(message)
+    def _compact(self, session: _Session, dropped: Optional[Message]) -> bool:
+        """Move messages beyond the budget aside; hold the lock
 
-        # Keep conversation history within limits
-        if len(self.sessions[session_id]) > self.max_history * 2:
-            self.sessions[session_id] = self.sessions[session_id][
-                -self.max_history * 2 :
-            ]
+        Returns:
+            True if a summary task should be started for the session
+        """
+        if dropped is not None:
+            session.folding.append(dropped)
+        while session.tokens > self.token_budget and len(session.messages) > 2:
+            session.folding.append(session.pop_oldest())
+        if not session.folding or session.summarizing:
+            return False
+        session.summarizing = True
+        return True
 
-    def add_exchange(self, session_id: str, user_message: str, assistant_message: str):
-        """Add a complete question-answer exchange"""
-        self.add_message(session_id, "user", user_message)
-        self.add_message(session_id, "assistant", assistant_message)
+    def _fold(self, session: _Session):
+        """Fold a session's pending messages into its summary (background)"""
+        while True:
+            with self._lock:
+                batch = list(session.folding)
+                previous = session.summary
+                if not batch:
+                    session.summarizing = False
+                    return
+            try:
+                summary = self._summarize(previous, format_history(batch))
+            except Exception as e:
+                # Keep the old summary; these messages are lost
+                print(f"Error summarizing conversation history: {e}")
+                summary = previous
+                failed = True
+            else:
+                failed = False
+            with self._lock:
+                # clear_session may have run meanwhile
+                if session.folding[: len(batch)] == batch:
+                    del session.folding[: len(batch)]
+                    session.summary = summary
+                self.summaries += not failed
+                self.summary_failures += failed
+                self.folded += len(batch)
 
     def get_conversation_history(self, session_id: Optional[str]) -> Optional[str]:
         """Get formatted conversation history for a session"""
-        if not session_id or session_id not in self.sessions:
-            return None
-
-        messages = self.sessions[session_id]
-        if not messages:
+        if not session_id:
             return None
 
-        # Format messages for context
-        formatted_messages = []
-        for msg in messages:
-            formatted_messages.append(f"{msg.role.title()}: {msg.content}")
-
-        return "\n".join(formatted_messages)
+        with self._lock:
+            session = self._session(session_id, create=False)
+            if session is None:
+                return None
+            return session.formatted()
 
     def clear_session(self, session_id: str):
         """Clear all messages from a session"""
-        if session_id in self.sessions:
-            self.sessions[session_id] = []
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Session and message counts, approximate memory and evictions"""
+        with self._lock:
+            self._expire(self._clock())
+            messages = 0
+            size = sys.getsizeof(self.sessions)
+            for session_id, session in self.sessions.items():
+                messages += len(session.messages)
+                size += sys.getsizeof(session_id) + sys.getsizeof(session)
+                size += sys.getsizeof(session.messages)
+                size += sys.getsizeof(session.lines)
+                size += sum(sys.getsizeof(line) for line in session.lines)
+                size += sys.getsizeof(session.summary)
+                for message in session.messages:
+                    size += sys.getsizeof(message) + sys.getsizeof(message.content)
+            return {
+                "sessions": len(self.sessions),
+                "max_sessions": self.max_sessions,
+                "messages": messages,
+                "approx_bytes": size,
+                "evicted": self.evicted,
+                "expired": self.expired,
+                "summaries": self.summaries,
+                "summary_failures": self.summary_failures,
+                "folded_messages": self.folded,
+            }
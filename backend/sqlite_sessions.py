@@ -0,0 +1,196 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from session_manager import Message, SessionStore, format_history, new_session_id
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id);
+"""
+
+# Fixed SQL texts, so sqlite3's per-connection statement cache reuses the
+# compiled statements
+TOUCH_SESSION = (
+    "INSERT INTO sessions (id, last_access) VALUES (?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET last_access = excluded.last_access"
+)
+INSERT_MESSAGE = "INSERT INTO messages (session_id, role, content) VALUES (?, ?, ?)"
+TRIM_MESSAGES = (
+    "DELETE FROM messages WHERE session_id = ? AND id NOT IN "
+    "(SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?)"
+)
+SELECT_LAST_ACCESS = "SELECT last_access FROM sessions WHERE id = ?"
+SELECT_MESSAGES = (
+    "SELECT role, content FROM messages WHERE session_id = ? "
+    "ORDER BY id DESC LIMIT ?"
+)
+UPDATE_LAST_ACCESS = "UPDATE sessions SET last_access = ? WHERE id = ?"
+DELETE_SESSION_MESSAGES = "DELETE FROM messages WHERE session_id = ?"
+DELETE_EXPIRED = "DELETE FROM sessions WHERE last_access < ?"
+DELETE_IF_EXPIRED = "DELETE FROM sessions WHERE id = ? AND last_access <= ?"
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Conversation history in a SQLite database shared by all workers.
+
+    The database runs in WAL mode, so readers in every worker process
+    proceed while one of them writes. Each thread gets its own connection.
+    An exchange is written in a single transaction together with the trim
+    to max_history, and expired sessions are purged in bulk every
+    purge_every writes rather than on each request.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_history: int = 5,
+        session_ttl: Optional[float] = 3600.0,
+        purge_every: int = 100,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = path
+        self.max_history = max_history
+        self.session_ttl = session_ttl  # None keeps sessions forever
+        self.purge_every = max(1, purge_every)
+        self._clock = clock  # Wall clock: compared across processes
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.expired = 0  # Sessions purged by this process
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only close() touches a connection from another thread
+            conn = sqlite3.connect(
+                self.path, timeout=5.0, cached_statements=64, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")  # Durable enough with WAL
+            conn.execute("PRAGMA foreign_keys = ON")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _expired(self, last_access: float, now: float) -> bool:
+        return self.session_ttl is not None and now - last_access >= self.session_ttl
+
+    def create_session(self) -> str:
+        """Create a new conversation session"""
+        session_id = new_session_id()
+        with self._connection() as conn:
+            conn.execute(TOUCH_SESSION, (session_id, self._clock()))
+        return session_id
+
+    def add_message(self, session_id: str, role: str, content: str):
+        """Add a message to the conversation history"""
+        self._write(session_id, [(role, content)])
+
+    def add_exchange(self, session_id: str, user_message: str, assistant_message: str):
+        """Add a question-answer exchange in one transaction"""
+        self._write(
+            session_id, [("user", user_message), ("assistant", assistant_message)]
+        )
+
+    def _write(self, session_id: str, messages: List[Tuple[str, str]]):
+        now = self._clock()
+        expired = 0
+        with self._connection() as conn:
+            if self.session_ttl is not None:
+                # Drop an expired session's messages (cascade) before the
+                # touch below revives it, or they would be read back
+                expired = conn.execute(
+                    DELETE_IF_EXPIRED, (session_id, now - self.session_ttl)
+                ).rowcount
+            conn.execute(TOUCH_SESSION, (session_id, now))
+            conn.executemany(
+                INSERT_MESSAGE,
+                [(session_id, role, content) for role, content in messages],
+            )
+            conn.execute(
+                TRIM_MESSAGES, (session_id, session_id, max(0, self.max_history * 2))
+            )
+        if expired:
+            with self._lock:
+                self.expired += expired
+        self._maybe_purge(now)
+
+    def _maybe_purge(self, now: float):
+        """Delete expired sessions once every purge_every writes"""
+        if self.session_ttl is None:
+            return
+        with self._lock:
+            self._writes += 1
+            if self._writes % self.purge_every:
+                return
+        with self._connection() as conn:
+            cursor = conn.execute(DELETE_EXPIRED, (now - self.session_ttl,))
+        with self._lock:
+            self.expired += cursor.rowcount
+
+    def get_conversation_history(self, session_id: Optional[str]) -> Optional[str]:
+        """Get formatted conversation history for a session"""
+        if not session_id:
+            return None
+
+        now = self._clock()
+        conn = self._connection()
+        row = conn.execute(SELECT_LAST_ACCESS, (session_id,)).fetchone()
+        if row is None or self._expired(row[0], now):
+            return None
+        rows = conn.execute(
+            SELECT_MESSAGES, (session_id, max(0, self.max_history * 2))
+        ).fetchall()
+        with conn:
+            conn.execute(UPDATE_LAST_ACCESS, (now, session_id))
+
+        return format_history(Message(role, content) for role, content in rows[::-1])
+
+    def clear_session(self, session_id: str):
+        """Clear all messages from a session"""
+        with self._connection() as conn:
+            conn.execute(DELETE_SESSION_MESSAGES, (session_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Session and message counts, database size and purges"""
+        conn = self._connection()
+        sessions = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        messages = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "sessions": sessions,
+            "messages": messages,
+            "db_bytes": page_count * page_size,
+            "expired": self.expired,
+        }
+
+    def close(self):
+        """Close every connection; call once no thread is using the store"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
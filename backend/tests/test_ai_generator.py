@@ -93,11 +93,11 @@ class TestAIGenerator:
             tool_manager=None,
         )
 
-        # Check that history was added to system prompt
+        # Check that history follows the system prompt as its own block
         call_args = mock_anthropic_client.messages.create.call_args
-        system_content = call_args[1]["system"]
-        assert "Previous question" in system_content
-        assert "Previous answer" in system_content
+        system_blocks = call_args[1]["system"]
+        assert system_blocks[0]["text"] == ai_generator.SYSTEM_PROMPT
+        assert system_blocks[-1]["text"] == history
 
     def test_generate_response_with_tools_but_no_tool_use(
         self, ai_generator, mock_anthropic_client
@@ -292,7 +292,7 @@ class TestAIGenerator:
         ai_generator.generate_response(query="Test")
 
         call_args = mock_anthropic_client.messages.create.call_args[1]
-        system_prompt = call_args["system"]
+        system_prompt = call_args["system"][0]["text"]
 
         # Check for key elements in system prompt
         assert "search_course_content" in system_prompt
@@ -0,0 +1,188 @@
+"""
+Tests for the semantic answer cache and its use in RAGSystem
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_cache import SemanticAnswerCache
+from query_context import ToolCallRecord
+
+# Hand-made embeddings: the two MCP phrasings are ~0.99 similar
+VECTORS = {
+    "what is mcp": [1.0, 0.0, 0.0],
+    "what is mcp?": [0.99, 0.1, 0.0],
+    "what is chroma": [0.0, 1.0, 0.0],
+    "lesson 1 of chroma": [0.0, 0.0, 1.0],
+    "lesson 2 of chroma": [0.0, 0.01, 1.0],
+}
+
+
+def fake_embed(text):
+    return np.array(VECTORS[text.casefold()])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+SOURCES = [{"text": "MCP - Lesson 1", "link": None}]
+
+
+class TestSemanticAnswerCache:
+    """Test SemanticAnswerCache lookups, eviction and invalidation"""
+
+    @pytest.fixture
+    def version(self):
+        return Mock(return_value=1)
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def cache(self, version, clock):
+        return SemanticAnswerCache(
+            fake_embed, version, threshold=0.95, max_size=2, ttl_seconds=60, clock=clock
+        )
+
+    def test_similar_query_hits(self, cache):
+        """Test that a near-identical phrasing returns the stored answer"""
+        cache.put("What is MCP", "A protocol", SOURCES, version=1)
+
+        cached = cache.get("what is  MCP?")
+
+        assert cached.answer == "A protocol"
+        assert cached.sources == SOURCES
+        assert cached.similarity > 0.95
+        assert cache.stats()["hits"] == 1
+
+    def test_dissimilar_query_misses(self, cache):
+        """Test that a different question is not answered from the cache"""
+        cache.put("What is MCP", "A protocol", SOURCES, version=1)
+
+        assert cache.get("What is Chroma") is None
+        assert cache.stats()["hit_rate"] == 0.0
+
+    def test_numbers_must_match(self, cache):
+        """Test that lesson 2 is not served lesson 1's answer"""
+        cache.put("lesson 1 of chroma", "Intro", [], version=1)
+
+        assert cache.get("lesson 2 of chroma") is None
+        assert cache.get("lesson 1 of chroma").answer == "Intro"
+
+    def test_entries_expire(self, cache, clock):
+        """Test that an entry older than the TTL is not returned"""
+        cache.put("What is MCP", "A protocol", SOURCES, version=1)
+        clock.now = 61
+
+        assert cache.get("What is MCP") is None
+        assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_evicted(self, cache):
+        """Test that the oldest unused entry goes first beyond max_size"""
+        cache.put("What is MCP", "A protocol", [], version=1)
+        cache.put("What is Chroma", "A vector DB", [], version=1)
+        cache.get("What is MCP")
+        cache.put("lesson 1 of chroma", "Intro", [], version=1)
+
+        assert cache.get("What is Chroma") is None
+        assert cache.get("What is MCP") is not None
+
+    def test_corpus_change_invalidates(self, cache, version):
+        """Test that a new corpus version drops all entries"""
+        cache.put("What is MCP", "A protocol", SOURCES, version=1)
+        version.return_value = 2
+
+        assert cache.get("What is MCP") is None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_stale_answer_not_stored(self, cache, version):
+        """Test that an answer computed before a corpus change is discarded"""
+        version.return_value = 2
+
+        cache.put("What is MCP", "A protocol", SOURCES, version=1)
+
+        assert cache.stats()["size"] == 0
+
+
+class TestRAGSystemAnswerCache:
+    """Test the answer cache in front of RAGSystem queries"""
+
+    @pytest.fixture
+    def rag_system(self, mock_config):
+        from rag_system import RAGSystem
+
+        mock_config.ANSWER_CACHE = True
+        with (
+            patch("anthropic.Anthropic"),
+            patch("anthropic.AsyncAnthropic"),
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction"
+            ),
+        ):
+            rag = RAGSystem(mock_config)
+        rag.vector_store.embedding_function = Mock(
+            side_effect=lambda texts: [fake_embed(text) for text in texts]
+        )
+        rag.ai_generator.generate_response = Mock(return_value="A protocol")
+        return rag
+
+    def test_repeat_question_skips_generation(self, rag_system):
+        """Test that a repeated standalone question is answered from cache"""
+        rag_system.query("What is MCP")
+        answer, sources = rag_system.query("What is MCP?")
+
+        assert answer == "A protocol"
+        rag_system.ai_generator.generate_response.assert_called_once()
+        assert rag_system.answer_cache.stats()["hit_rate"] == 0.5
+
+    def test_follow_up_bypasses_cache(self, rag_system):
+        """Test that a query with conversation history is never cached"""
+        session_id = rag_system.session_manager.create_session()
+        rag_system.query("What is MCP", session_id)
+        rag_system.query("What is MCP", session_id)
+
+        assert rag_system.ai_generator.generate_response.call_count == 2
+        assert rag_system.answer_cache.stats()["size"] == 1
+
+    def test_failed_tool_call_not_cached(self, rag_system):
+        """Test that answers produced around a tool error are not stored"""
+
+        def failing_generate(**kwargs):
+            kwargs["context"].record(
+                ToolCallRecord("search_course_content", {}, 0.1, error="db down")
+            )
+            return "Search is unavailable"
+
+        rag_system.ai_generator.generate_response.side_effect = failing_generate
+
+        rag_system.query("What is MCP")
+
+        assert rag_system.answer_cache.stats()["size"] == 0
+
+    def test_aquery_uses_cache(self, rag_system):
+        """Test that the async path reads entries stored by the sync path"""
+        rag_system.query("What is MCP")
+
+        answer, _ = asyncio.run(rag_system.aquery("what is mcp?"))
+
+        assert answer == "A protocol"
+        assert rag_system.answer_cache.stats()["hits"] == 1
+
+    def test_disabled_by_default(self, mock_rag_system):
+        """Test that no answer cache is created unless configured"""
+        assert mock_rag_system.answer_cache is None
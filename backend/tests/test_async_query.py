@@ -0,0 +1,415 @@
+"""
+Tests for the async and streaming query paths (AsyncAnthropic + off-loop
+tool execution)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_generator import AIGenerator
+from vector_store import SearchResults
+
+
+class FakeStream:
+    """Stand-in for the AsyncMessageStream context manager"""
+
+    def __init__(self, response):
+        self.response = response
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        for block in self.response.content:
+            if block.type == "text":
+                for word in block.text.split(" "):
+                    yield word + " "
+
+    async def get_final_message(self):
+        return self.response
+
+
+def collect(async_iterator):
+    """Run an async iterator to completion and return its items"""
+
+    async def run():
+        return [item async for item in async_iterator]
+
+    return asyncio.run(run())
+
+
+def parse_sse(body):
+    """Split a Server-Sent Events body into (event, data) pairs"""
+    frames = []
+    for frame in body.split("\n\n"):
+        if frame:
+            fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+            frames.append((fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+class TestAsyncGenerateResponse:
+    """Test AIGenerator.agenerate_response"""
+
+    @pytest.fixture
+    def generator(self):
+        with patch("anthropic.Anthropic"), patch("anthropic.AsyncAnthropic"):
+            generator = AIGenerator("test-key", "claude-test")
+        generator.async_client.messages.create = AsyncMock()
+        return generator
+
+    def test_direct_answer(self, generator, create_text_response):
+        """Test that a response without tools is returned as text"""
+        generator.async_client.messages.create.return_value = create_text_response(
+            "Paris"
+        )
+
+        answer = asyncio.run(generator.agenerate_response("Capital of France?"))
+
+        assert answer == "Paris"
+        generator.async_client.messages.create.assert_awaited_once()
+
+    def test_tool_round_runs_tool_off_loop(
+        self, generator, create_text_response, create_tool_use_response
+    ):
+        """Test that tools run on the executor and results reach the next call"""
+        generator.async_client.messages.create.side_effect = [
+            create_tool_use_response(
+                "search_course_content", "tool_1", {"query": "MCP"}
+            ),
+            create_text_response("MCP is a protocol"),
+        ]
+        tool_threads = []
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = lambda name, **kwargs: (
+            tool_threads.append(threading.current_thread()) or "search results"
+        )
+
+        answer = asyncio.run(
+            generator.agenerate_response(
+                "What is MCP?", tools=[{"name": "search"}], tool_manager=tool_manager
+            )
+        )
+
+        assert answer == "MCP is a protocol"
+        tool_manager.execute_tool.assert_called_once_with(
+            "search_course_content", query="MCP"
+        )
+        assert tool_threads[0] is not threading.main_thread()
+        second_call = generator.async_client.messages.create.call_args_list[1]
+        tool_result = second_call.kwargs["messages"][2]["content"][0]
+        assert tool_result["content"] == "search results"
+
+    def test_tool_error_is_reported_to_model(
+        self, generator, create_text_response, create_tool_use_response
+    ):
+        """Test that a failing tool ends the rounds with an error tool_result"""
+        generator.async_client.messages.create.side_effect = [
+            create_tool_use_response("search_course_content", "tool_1", {}),
+            create_text_response("Search is unavailable"),
+        ]
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = RuntimeError("db down")
+
+        answer = asyncio.run(
+            generator.agenerate_response(
+                "What is MCP?", tools=[{"name": "search"}], tool_manager=tool_manager
+            )
+        )
+
+        assert answer == "Search is unavailable"
+        final_call = generator.async_client.messages.create.call_args_list[1]
+        assert "tools" not in final_call.kwargs
+        tool_result = final_call.kwargs["messages"][2]["content"][0]
+        assert tool_result["is_error"] is True
+
+
+class TestRAGSystemAsyncQuery:
+    """Test RAGSystem.aquery concurrency"""
+
+    def test_concurrent_queries_overlap(self, mock_rag_system, create_text_response):
+        """Test that concurrent queries wait on the LLM at the same time"""
+        delay = 0.1
+        clients = 20
+
+        async def slow_llm(**params):
+            await asyncio.sleep(delay)
+            return create_text_response("answer")
+
+        mock_rag_system.ai_generator.async_client = Mock()
+        mock_rag_system.ai_generator.async_client.messages.create = slow_llm
+
+        async def run():
+            return await asyncio.gather(
+                *(mock_rag_system.aquery(f"question {i}") for i in range(clients))
+            )
+
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+
+        assert [answer for answer, _ in results] == ["answer"] * clients
+        # Serialized requests would take clients * delay = 2s
+        assert elapsed < clients * delay / 4
+
+    def test_aquery_records_exchange(self, mock_rag_system, create_text_response):
+        """Test that aquery updates conversation history like query"""
+        mock_rag_system.ai_generator.async_client = Mock()
+        mock_rag_system.ai_generator.async_client.messages.create = AsyncMock(
+            return_value=create_text_response("Hi there")
+        )
+        session_id = mock_rag_system.session_manager.create_session()
+
+        answer, sources = asyncio.run(mock_rag_system.aquery("Hello", session_id))
+
+        assert (answer, sources) == ("Hi there", [])
+        history = mock_rag_system.session_manager.get_conversation_history(session_id)
+        assert "Hello" in history and "Hi there" in history
+
+    def test_session_store_runs_off_loop(self, mock_rag_system, create_text_response):
+        """Test that session reads and writes never block the event loop"""
+        mock_rag_system.ai_generator.async_client = Mock()
+        mock_rag_system.ai_generator.async_client.messages.create = AsyncMock(
+            return_value=create_text_response("Hi there")
+        )
+        mock_rag_system.ai_generator.async_client.messages.stream = Mock(
+            return_value=FakeStream(create_text_response("Hello"))
+        )
+        manager = mock_rag_system.session_manager
+        threads = []
+        for name in ["create_session", "get_conversation_history", "add_exchange"]:
+            method = getattr(manager, name)
+            setattr(
+                manager,
+                name,
+                lambda *args, method=method, name=name: (
+                    threads.append((name, threading.current_thread())) or method(*args)
+                ),
+            )
+
+        session_id = asyncio.run(mock_rag_system.acreate_session())
+        asyncio.run(mock_rag_system.aquery("Hello", session_id))
+        collect(mock_rag_system.astream_query("Hello again", session_id))
+
+        assert [name for name, _ in threads] == ["create_session"] + [
+            "get_conversation_history",
+            "add_exchange",
+        ] * 2
+        assert all(thread is not threading.main_thread() for _, thread in threads)
+
+
+class TestStreamingQuery:
+    """Test AIGenerator.astream_response and RAGSystem.astream_query"""
+
+    @pytest.fixture
+    def generator(self):
+        with patch("anthropic.Anthropic"), patch("anthropic.AsyncAnthropic"):
+            generator = AIGenerator("test-key", "claude-test")
+        return generator
+
+    def use_responses(self, generator, responses):
+        responses = iter(responses)
+        generator.async_client.messages.stream = Mock(
+            side_effect=lambda **params: FakeStream(next(responses))
+        )
+
+    def test_streams_text_deltas(self, generator, create_text_response):
+        """Test that the answer arrives as several text events"""
+        self.use_responses(generator, [create_text_response("MCP is a protocol")])
+
+        events = collect(generator.astream_response("What is MCP?"))
+
+        texts = [e["text"] for e in events if e["type"] == "text"]
+        assert len(texts) == 4
+        assert events[-1] == {"type": "done", "answer": "MCP is a protocol"}
+
+    def test_tool_round_then_answer(
+        self, generator, create_text_response, create_tool_use_response
+    ):
+        """Test that tool progress precedes the streamed final answer"""
+        self.use_responses(
+            generator,
+            [
+                create_tool_use_response(
+                    "search_course_content", "tool_1", {"query": "MCP"}
+                ),
+                create_text_response("Found it"),
+            ],
+        )
+        tool_manager = Mock()
+        tool_manager.execute_tool.return_value = "results"
+
+        events = collect(
+            generator.astream_response(
+                "What is MCP?", tools=[{"name": "search"}], tool_manager=tool_manager
+            )
+        )
+
+        assert [e["type"] for e in events] == ["tool", "text", "text", "done"]
+        assert events[0] == {
+            "type": "tool",
+            "round": 1,
+            "name": "search_course_content",
+            "input": {"query": "MCP"},
+        }
+        assert events[-1]["answer"] == "Found it"
+
+    def test_preamble_before_tool_use_is_reset(
+        self, generator, create_text_response, create_tool_use_response
+    ):
+        """Test that text from a turn that calls tools is followed by reset"""
+        tool_turn = create_tool_use_response("search_course_content", "tool_1", {})
+        tool_turn.content.insert(0, Mock(type="text", text="Let me search"))
+        self.use_responses(generator, [tool_turn, create_text_response("Answer")])
+        tool_manager = Mock()
+        tool_manager.execute_tool.return_value = "results"
+
+        events = collect(
+            generator.astream_response(
+                "What is MCP?", tools=[{"name": "search"}], tool_manager=tool_manager
+            )
+        )
+
+        types = [e["type"] for e in events]
+        assert types.index("reset") < types.index("tool")
+        assert events[-1]["answer"] == "Answer"
+
+    def test_stream_query_ends_with_sources(
+        self, mock_rag_system, create_text_response, create_tool_use_response
+    ):
+        """Test that astream_query records the answer and emits sources"""
+        self.use_responses(
+            mock_rag_system.ai_generator,
+            [
+                create_tool_use_response(
+                    "search_course_content", "tool_1", {"query": "greetings"}
+                ),
+                create_text_response("Hi"),
+            ],
+        )
+        mock_rag_system.vector_store.search = Mock(
+            return_value=SearchResults(
+                ["Content"], [{"course_title": "Course A", "lesson_number": 1}], [0.1]
+            )
+        )
+        mock_rag_system.vector_store.get_lesson_link = Mock(return_value=None)
+        session_id = mock_rag_system.session_manager.create_session()
+
+        events = collect(mock_rag_system.astream_query("Hello", session_id))
+
+        assert events[-1] == {
+            "type": "sources",
+            "sources": [{"text": "Course A - Lesson 1", "link": None}],
+        }
+        assert all(e["type"] != "done" for e in events)
+        history = mock_rag_system.session_manager.get_conversation_history(session_id)
+        assert "Hi" in history
+
+
+class TestStreamEndpoint:
+    """Test the SSE framing of POST /api/query/stream in app.py"""
+
+    @pytest.fixture
+    def app_module(self, monkeypatch):
+        # app.py mounts ../frontend relative to the working directory
+        monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        with (
+            patch("anthropic.Anthropic"),
+            patch("anthropic.AsyncAnthropic"),
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction"
+            ),
+        ):
+            import app
+        return app
+
+    def stream(self, app_module, monkeypatch, events, error=None, **request):
+        """POST to the endpoint with astream_query yielding events, then error"""
+        calls = []
+
+        async def astream_query(query, session_id):
+            calls.append((query, session_id))
+            for event in events:
+                yield dict(event)
+            if error is not None:
+                raise error
+
+        monkeypatch.setattr(app_module.rag_system, "astream_query", astream_query)
+        response = TestClient(app_module.app).post(
+            "/api/query/stream", json={"query": "What is MCP?", **request}
+        )
+        return response, parse_sse(response.text), calls
+
+    def test_events_framed_in_order(self, app_module, monkeypatch):
+        """Test session first, then the query's events, sources and done"""
+        events = [
+            {"type": "tool", "round": 1, "name": "search", "input": {}},
+            {"type": "text", "text": "Let me "},
+            {"type": "reset"},
+            {"type": "text", "text": "MCP is "},
+            {"type": "text", "text": "a protocol"},
+            {"type": "sources", "sources": [{"text": "MCP - Lesson 1", "link": None}]},
+        ]
+
+        response, frames, calls = self.stream(
+            app_module, monkeypatch, events, session_id="session_abc"
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["cache-control"] == "no-cache"
+        assert calls == [("What is MCP?", "session_abc")]
+        assert frames == [
+            ("session", {"session_id": "session_abc"}),
+            ("tool", {"round": 1, "name": "search", "input": {}}),
+            ("text", {"text": "Let me "}),
+            ("reset", {}),
+            ("text", {"text": "MCP is "}),
+            ("text", {"text": "a protocol"}),
+            ("sources", {"sources": [{"text": "MCP - Lesson 1", "link": None}]}),
+            ("done", {}),
+        ]
+
+    def test_new_session_created(self, app_module, monkeypatch):
+        """Test that a request without session_id gets one in the first event"""
+        _, frames, calls = self.stream(
+            app_module, monkeypatch, [{"type": "sources", "sources": []}]
+        )
+
+        event, data = frames[0]
+        assert event == "session"
+        assert data["session_id"].startswith("session_")
+        assert calls == [("What is MCP?", data["session_id"])]
+
+    def test_error_replaces_rest_of_stream(self, app_module, monkeypatch):
+        """Test that a failing query ends with an error event and no done"""
+        response, frames, _ = self.stream(
+            app_module,
+            monkeypatch,
+            [{"type": "text", "text": "MCP "}],
+            error=RuntimeError("API overloaded"),
+            session_id="session_abc",
+        )
+
+        assert response.status_code == 200
+        assert frames == [
+            ("session", {"session_id": "session_abc"}),
+            ("text", {"text": "MCP "}),
+            ("error", {"detail": "API overloaded"}),
+        ]
@@ -0,0 +1,109 @@
+"""
+Tests for the in-memory course catalog index
+"""
+
+import json
+import os
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_index import CatalogIndex
+
+
+def catalog_metadata(title: str, lessons: int = 2):
+    return {
+        "title": title,
+        "instructor": "Instructor",
+        "course_link": f"https://example.com/{title}",
+        "lessons_json": json.dumps(
+            [
+                {
+                    "lesson_number": n,
+                    "lesson_title": f"Lesson {n}",
+                    "lesson_link": f"https://example.com/{title}/{n}",
+                }
+                for n in range(lessons)
+            ]
+        ),
+        "lesson_count": lessons,
+    }
+
+
+class TestCatalogIndex:
+    """Test suite for CatalogIndex"""
+
+    @pytest.fixture
+    def loader(self):
+        return Mock(return_value=[catalog_metadata("A"), catalog_metadata("B")])
+
+    def test_loads_once_lazily(self, loader):
+        """Test that the catalog is read on first access only"""
+        index = CatalogIndex(loader)
+        loader.assert_not_called()
+
+        assert index.titles() == ["A", "B"]
+        assert index.count() == 2
+        index.course_link("A")
+        index.lesson_link("B", 1)
+
+        loader.assert_called_once()
+
+    def test_lookups_parse_lessons(self, loader):
+        """Test that lessons are parsed and links are indexed"""
+        index = CatalogIndex(loader)
+
+        course = index.get("A")
+        assert "lessons_json" not in course
+        assert [lesson["lesson_number"] for lesson in course["lessons"]] == [0, 1]
+        assert index.course_link("A") == "https://example.com/A"
+        assert index.lesson_link("A", 1) == "https://example.com/A/1"
+        assert index.lesson_link("A", 5) is None
+        assert index.get("missing") is None
+
+    def test_upsert_replaces_course(self, loader):
+        """Test that an upsert replaces lessons and drops stale lesson links"""
+        index = CatalogIndex(loader)
+
+        index.upsert(catalog_metadata("A", lessons=1))
+
+        assert index.count() == 2
+        assert index.lesson_link("A", 0) == "https://example.com/A/0"
+        assert index.lesson_link("A", 1) is None
+
+    def test_remove_and_clear(self, loader):
+        """Test that removed or cleared courses are no longer served"""
+        index = CatalogIndex(loader)
+
+        index.remove("A")
+        assert index.titles() == ["B"]
+        assert index.lesson_link("A", 0) is None
+
+        index.clear()
+        assert index.count() == 0
+        loader.assert_called_once()
+
+    def test_invalidate_reloads(self, loader):
+        """Test that invalidate() reloads from the catalog on next access"""
+        index = CatalogIndex(loader)
+        index.count()
+
+        index.invalidate()
+        index.count()
+
+        assert loader.call_count == 2
+
+    def test_returned_metadata_is_a_copy(self, loader):
+        """Test that mutating a returned course does not change the index"""
+        index = CatalogIndex(loader)
+
+        course = index.get("A")
+        course["lessons"][0]["lesson_link"] = "changed"
+        course["title"] = "changed"
+
+        assert index.get("A")["title"] == "A"
+        assert index.get("A")["lessons"][0]["lesson_link"] == "https://example.com/A/0"
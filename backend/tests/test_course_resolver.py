@@ -0,0 +1,101 @@
+"""
+Tests for the tiered course name resolver
+"""
+
+import os
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_index import CatalogIndex
+from course_resolver import (
+    CASE_INSENSITIVE,
+    EXACT,
+    PREFIX,
+    SEMANTIC,
+    CourseNameResolver,
+)
+
+TITLES = [
+    "Advanced Retrieval for AI with Chroma",
+    "Building Towards Computer Use with Anthropic",
+    "MCP: Build Rich-Context AI Apps with Anthropic",
+    "Prompt Compression and Query Optimization",
+]
+
+
+class TestCourseNameResolver:
+    """Test suite for CourseNameResolver"""
+
+    @pytest.fixture
+    def index(self):
+        return CatalogIndex(lambda: [{"title": title} for title in TITLES])
+
+    @pytest.fixture
+    def semantic_match(self):
+        return Mock(return_value=TITLES[3])
+
+    @pytest.fixture
+    def resolver(self, index, semantic_match):
+        return CourseNameResolver(index, semantic_match)
+
+    @pytest.mark.parametrize(
+        "name, title, tier",
+        [
+            (TITLES[0], TITLES[0], EXACT),
+            (
+                "mcp: build rich-context ai apps with anthropic",
+                TITLES[2],
+                CASE_INSENSITIVE,
+            ),
+            ("MCP", TITLES[2], PREFIX),
+            ("computer", TITLES[1], PREFIX),
+            ("adv retr chroma", TITLES[0], PREFIX),
+        ],
+    )
+    def test_catalog_tiers(self, resolver, semantic_match, name, title, tier):
+        """Test that exact, case-insensitive and prefix matches skip embeddings"""
+        resolution = resolver.resolve(name)
+
+        assert (resolution.title, resolution.tier) == (title, tier)
+        semantic_match.assert_not_called()
+
+    def test_ambiguous_prefix_falls_back_to_semantic(self, resolver, semantic_match):
+        """Test that a prefix matching several titles uses embedding search"""
+        resolution = resolver.resolve("anthropic")
+
+        assert resolution.tier == SEMANTIC
+        semantic_match.assert_called_once_with("anthropic")
+
+    def test_unknown_name_falls_back_to_semantic(self, resolver, semantic_match):
+        """Test that names without a token match use embedding search"""
+        semantic_match.return_value = None
+
+        resolution = resolver.resolve("vector databases")
+
+        assert resolution.title is None and resolution.tier is None
+        semantic_match.assert_called_once()
+
+    def test_results_are_memoized(self, resolver, semantic_match):
+        """Test that repeated names are answered from the memo"""
+        resolver.resolve("query optimisation tips")
+        resolution = resolver.resolve("query  optimisation tips")
+
+        assert resolution.cached and resolution.tier == SEMANTIC
+        semantic_match.assert_called_once()
+        assert resolver.stats()["cache_hits"] == 1
+
+    def test_catalog_change_invalidates(self, index, resolver):
+        """Test that new titles are visible and stale memo entries dropped"""
+        assert resolver.resolve("MCP").tier == PREFIX
+
+        index.upsert({"title": "MCP Advanced Topics"})
+        resolution = resolver.resolve("MCP")
+
+        assert not resolution.cached
+        assert resolution.tier == SEMANTIC
+        assert resolver.resolve("MCP Advanced Topics").tier == EXACT
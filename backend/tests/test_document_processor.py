@@ -0,0 +1,333 @@
+"""
+Tests for DocumentProcessor chunking and streaming document parsing
+"""
+
+import glob
+import os
+import random
+import re
+import sys
+from typing import List, Tuple
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_chunking import DOCS_PATH, legacy_chunk_text
+from document_processor import DocumentProcessor
+from models import Course, CourseChunk, Lesson
+
+SETTINGS = [(800, 100), (800, 0), (50, 40), (30, 200), (1, 1)]
+
+HEADER = "Course Title: Edges\nCourse Link: https://e.com\nCourse Instructor: Ann\n"
+
+# Documents exercising the parser's corner cases, as raw bytes
+EDGE_CASES = {
+    "crlf": (
+        HEADER + "\nLesson 0: One\nLesson Link: https://e.com/0\nFirst. Text.\n"
+        "Lesson 1: Two\nSecond lesson text here.\n"
+    ).replace("\n", "\r\n"),
+    "leading_blank_lines": "\n \n\t\n" + HEADER + "\nLesson 0: One\nSome text.\n",
+    "link_after_marker": (
+        HEADER + "\nLesson 0: One\nLesson Link: https://e.com/0\nText zero.\n"
+        "Lesson 1: Two\n\nLesson Link: https://e.com/1\nText one.\n"
+        "Lesson 2: Three\nLesson Link: https://e.com/2\n"
+    ),
+    "empty_lessons": (
+        HEADER + "\nLesson 0: Empty\n\n  \nLesson 1: Full\nReal content. More.\n"
+        "Lesson 2: Also empty\nLesson Link: https://e.com/2\n\n"
+    ),
+    "all_lessons_empty": HEADER + "\nLesson 0: A\n\nLesson 1: B\nLesson Link: x\n",
+    "no_lessons": HEADER + "\nJust notes. No lesson markers at all.\n\nMore notes.",
+    "preamble_before_lessons": HEADER + "\nIntro text.\nLesson 3: Late\nBody.\n",
+    "no_blank_after_header": HEADER + "Lesson 0: Tight\nBody text.",
+    "bare_header": "Just a title\nhttps://e.com\n",
+    "trailing_whitespace": HEADER + "\nLesson 0: One\nBody.   \n\n\n   \n",
+    "invalid_utf8": HEADER + "\nLesson 0: Bytes\nCaf\udcff text.\n",
+}
+
+
+def legacy_process_course_document(
+    processor: DocumentProcessor, file_path: str
+) -> Tuple[Course, List[CourseChunk]]:
+    """
+    Reference copy of process_course_document from before streaming (whole
+    file read, then parsed). Kept verbatim to check stream_course_document's
+    output; do not modify.
+    """
+    content = processor.read_file(file_path)
+    filename = os.path.basename(file_path)
+
+    lines = content.strip().split("\n")
+
+    course_title = filename
+    course_link = None
+    instructor_name = "Unknown"
+
+    if len(lines) >= 1 and lines[0].strip():
+        title_match = re.match(
+            r"^Course Title:\s*(.+)$", lines[0].strip(), re.IGNORECASE
+        )
+        if title_match:
+            course_title = title_match.group(1).strip()
+        else:
+            course_title = lines[0].strip()
+
+    for i in range(1, min(len(lines), 4)):
+        line = lines[i].strip()
+        if not line:
+            continue
+        link_match = re.match(r"^Course Link:\s*(.+)$", line, re.IGNORECASE)
+        if link_match:
+            course_link = link_match.group(1).strip()
+            continue
+        instructor_match = re.match(r"^Course Instructor:\s*(.+)$", line, re.IGNORECASE)
+        if instructor_match:
+            instructor_name = instructor_match.group(1).strip()
+            continue
+
+    course = Course(
+        title=course_title,
+        course_link=course_link,
+        instructor=instructor_name if instructor_name != "Unknown" else None,
+    )
+
+    course_chunks = []
+    current_lesson = None
+    lesson_title = None
+    lesson_link = None
+    lesson_content = []
+    chunk_counter = 0
+
+    start_index = 3
+    if len(lines) > 3 and not lines[3].strip():
+        start_index = 4
+
+    i = start_index
+    while i < len(lines):
+        line = lines[i]
+        lesson_match = re.match(
+            r"^Lesson\s+(\d+):\s*(.+)$", line.strip(), re.IGNORECASE
+        )
+
+        if lesson_match:
+            if current_lesson is not None and lesson_content:
+                lesson_text = "\n".join(lesson_content).strip()
+                if lesson_text:
+                    course.lessons.append(
+                        Lesson(
+                            lesson_number=current_lesson,
+                            title=lesson_title,
+                            lesson_link=lesson_link,
+                        )
+                    )
+                    chunks = processor.chunk_text(lesson_text)
+                    for idx, chunk in enumerate(chunks):
+                        if idx == 0:
+                            chunk_with_context = (
+                                f"Lesson {current_lesson} content: {chunk}"
+                            )
+                        else:
+                            chunk_with_context = chunk
+                        course_chunks.append(
+                            CourseChunk(
+                                content=chunk_with_context,
+                                course_title=course.title,
+                                lesson_number=current_lesson,
+                                chunk_index=chunk_counter,
+                            )
+                        )
+                        chunk_counter += 1
+
+            current_lesson = int(lesson_match.group(1))
+            lesson_title = lesson_match.group(2).strip()
+            lesson_link = None
+
+            if i + 1 < len(lines):
+                next_line = lines[i + 1].strip()
+                link_match = re.match(
+                    r"^Lesson Link:\s*(.+)$", next_line, re.IGNORECASE
+                )
+                if link_match:
+                    lesson_link = link_match.group(1).strip()
+                    i += 1
+
+            lesson_content = []
+        else:
+            lesson_content.append(line)
+
+        i += 1
+
+    if current_lesson is not None and lesson_content:
+        lesson_text = "\n".join(lesson_content).strip()
+        if lesson_text:
+            course.lessons.append(
+                Lesson(
+                    lesson_number=current_lesson,
+                    title=lesson_title,
+                    lesson_link=lesson_link,
+                )
+            )
+            chunks = processor.chunk_text(lesson_text)
+            for idx, chunk in enumerate(chunks):
+                chunk_with_context = (
+                    f"Course {course_title} Lesson {current_lesson} content: {chunk}"
+                )
+                course_chunks.append(
+                    CourseChunk(
+                        content=chunk_with_context,
+                        course_title=course.title,
+                        lesson_number=current_lesson,
+                        chunk_index=chunk_counter,
+                    )
+                )
+                chunk_counter += 1
+
+    if not course_chunks and len(lines) > 2:
+        remaining_content = "\n".join(lines[start_index:]).strip()
+        if remaining_content:
+            chunks = processor.chunk_text(remaining_content)
+            for chunk in chunks:
+                course_chunks.append(
+                    CourseChunk(
+                        content=chunk,
+                        course_title=course.title,
+                        chunk_index=chunk_counter,
+                    )
+                )
+                chunk_counter += 1
+
+    return course, course_chunks
+
+
+def random_text(rng: random.Random) -> str:
+    """Build text with varied sentence lengths, abbreviations and whitespace"""
+    words = ["Alpha", "beta", "Dr.", "e.g.", "API", "call", "x", "Mr.", "q?"]
+    sentences = []
+    for _ in range(rng.randint(0, 60)):
+        body = " ".join(rng.choice(words) for _ in range(rng.randint(1, 25)))
+        sentences.append(body.capitalize() + rng.choice([".", "!", "?", ""]))
+    return rng.choice([" ", "\n", "  \t"]).join(sentences)
+
+
+class TestChunkText:
+    """Test that the linear-time chunker matches the previous output exactly"""
+
+    @pytest.mark.parametrize("chunk_size,chunk_overlap", SETTINGS)
+    def test_matches_legacy_on_course_scripts(self, chunk_size, chunk_overlap):
+        """Test byte-identical chunks on the bundled course scripts"""
+        processor = DocumentProcessor(chunk_size, chunk_overlap)
+        for path in sorted(glob.glob(os.path.join(DOCS_PATH, "course*_script.txt"))):
+            text = processor.read_file(path)
+            assert processor.chunk_text(text) == legacy_chunk_text(
+                text, chunk_size, chunk_overlap
+            )
+
+    @pytest.mark.parametrize("chunk_size,chunk_overlap", SETTINGS)
+    def test_matches_legacy_on_random_text(self, chunk_size, chunk_overlap):
+        """Test byte-identical chunks on randomized edge-case text"""
+        rng = random.Random(chunk_size * 1000 + chunk_overlap)
+        processor = DocumentProcessor(chunk_size, chunk_overlap)
+        for _ in range(200):
+            text = random_text(rng)
+            assert processor.chunk_text(text) == legacy_chunk_text(
+                text, chunk_size, chunk_overlap
+            )
+
+    def test_oversized_sentence_is_kept_whole(self):
+        """Test that a sentence longer than chunk_size becomes its own chunk"""
+        processor = DocumentProcessor(10, 5)
+        chunks = processor.chunk_text("This sentence is long. Short.")
+        assert chunks == ["This sentence is long.", "Short."]
+
+    def test_empty_text(self):
+        """Test that blank text produces no chunks"""
+        assert DocumentProcessor(800, 100).chunk_text("  \n ") == []
+
+
+class TestStreamCourseDocument:
+    """Test the lazy, lesson-by-lesson document parser"""
+
+    @pytest.fixture
+    def processor(self):
+        return DocumentProcessor(800, 100)
+
+    @pytest.mark.parametrize(
+        "path", sorted(glob.glob(os.path.join(DOCS_PATH, "course*_script.txt")))
+    )
+    def test_matches_legacy_parser_on_course_scripts(self, processor, path):
+        """Test that streaming yields the same course and chunks as before"""
+        expected_course, expected_chunks = legacy_process_course_document(
+            processor, path
+        )
+
+        course, chunks = processor.stream_course_document(path)
+
+        assert list(chunks) == expected_chunks
+        assert course == expected_course
+        assert len(course.lessons) > 0
+
+    @pytest.mark.parametrize("name", sorted(EDGE_CASES))
+    @pytest.mark.parametrize("chunk_size,chunk_overlap", [(800, 100), (12, 5)])
+    def test_matches_legacy_parser_on_edge_cases(
+        self, tmp_path, name, chunk_size, chunk_overlap
+    ):
+        """Test line endings, blank lines, links, empty lessons and fallbacks"""
+        path = tmp_path / f"{name}.txt"
+        path.write_bytes(EDGE_CASES[name].encode("utf-8", "surrogateescape"))
+        processor = DocumentProcessor(chunk_size, chunk_overlap)
+        expected_course, expected_chunks = legacy_process_course_document(
+            processor, str(path)
+        )
+
+        course, chunks = processor.stream_course_document(str(path))
+
+        assert list(chunks) == expected_chunks
+        assert course == expected_course
+        assert processor.process_course_document(str(path)) == (
+            expected_course,
+            expected_chunks,
+        )
+
+    def test_lessons_are_emitted_incrementally(self, processor, tmp_path):
+        """Test that a lesson's chunks are available before later lessons are read"""
+        path = tmp_path / "course.txt"
+        path.write_text(
+            "Course Title: Streaming\n"
+            "Course Link: https://example.com\n"
+            "Course Instructor: Someone\n"
+            "\n"
+            "Lesson 0: First\n"
+            "Lesson Link: https://example.com/0\n"
+            "First lesson text.\n"
+            "Lesson 1: Second\n"
+            "Second lesson text.\n"
+        )
+
+        course, chunks = processor.stream_course_document(str(path))
+        assert course.title == "Streaming"
+        assert course.lessons == []
+
+        first = next(chunks)
+        assert first.lesson_number == 0
+        assert first.content == "Lesson 0 content: First lesson text."
+        assert [lesson.lesson_number for lesson in course.lessons] == [0]
+        assert course.lessons[0].lesson_link == "https://example.com/0"
+
+        rest = list(chunks)
+        assert [c.chunk_index for c in rest] == [1]
+        assert rest[0].content.startswith("Course Streaming Lesson 1 content:")
+        assert [lesson.lesson_number for lesson in course.lessons] == [0, 1]
+
+    def test_document_without_lessons_is_chunked_whole(self, processor, tmp_path):
+        """Test the fallback for documents with no lesson markers"""
+        path = tmp_path / "notes.txt"
+        path.write_text("Course Title: Notes\nLink\nInstructor\nJust some notes.\n")
+
+        course, chunks = processor.stream_course_document(str(path))
+        chunks = list(chunks)
+
+        assert [c.content for c in chunks] == ["Just some notes."]
+        assert chunks[0].lesson_number is None
+        assert course.lessons == []
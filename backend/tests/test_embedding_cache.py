@@ -0,0 +1,120 @@
+"""
+Tests for the on-disk embedding cache
+"""
+
+import os
+import sys
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_cache import KEY_SIZE, EmbeddingCache, QueryEmbeddingCache
+
+
+class TestEmbeddingCache:
+    """Test suite for EmbeddingCache"""
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path):
+        return str(tmp_path / "embedding_cache")
+
+    def test_roundtrip_and_misses(self, cache_dir):
+        """Test that cached vectors are returned and unknown texts miss"""
+        cache = EmbeddingCache(cache_dir, "test-model")
+        cache.put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+
+        a, missing, b = cache.get_many(["a", "missing", "b"])
+
+        assert missing is None
+        np.testing.assert_array_equal(a, np.array([1.0, 2.0], dtype=np.float32))
+        np.testing.assert_array_equal(b, np.array([3.0, 4.0], dtype=np.float32))
+        assert a.dtype == np.float32
+
+    def test_persists_across_instances(self, cache_dir):
+        """Test that a new instance reads vectors written by a previous one"""
+        EmbeddingCache(cache_dir, "test-model").put_many(["text"], [[0.5, 0.25]])
+        EmbeddingCache(cache_dir, "test-model").put_many(["more"], [[1.5, 1.25]])
+
+        cache = EmbeddingCache(cache_dir, "test-model")
+
+        assert len(cache) == 2
+        np.testing.assert_array_equal(cache.get_many(["more"])[0], [1.5, 1.25])
+
+    def test_models_are_isolated(self, cache_dir):
+        """Test that vectors from one model are never served for another"""
+        EmbeddingCache(cache_dir, "model-a").put_many(["text"], [[1.0, 1.0]])
+        assert EmbeddingCache(cache_dir, "model-b").get_many(["text"]) == [None]
+
+    def test_duplicates_are_stored_once(self, cache_dir):
+        """Test that re-adding a cached text does not grow the cache"""
+        cache = EmbeddingCache(cache_dir, "test-model")
+        cache.put_many(["x", "x"], [[1.0], [1.0]])
+        cache.put_many(["x"], [[2.0]])
+        assert len(cache) == 1
+        assert os.path.getsize(cache.keys_path) == KEY_SIZE
+
+    def test_dimension_mismatch_is_rejected(self, cache_dir):
+        """Test that vectors of a different size raise an error"""
+        cache = EmbeddingCache(cache_dir, "test-model")
+        cache.put_many(["a"], [[1.0, 2.0]])
+        with pytest.raises(ValueError):
+            cache.put_many(["b"], [[1.0, 2.0, 3.0]])
+
+    def test_torn_write_is_truncated(self, cache_dir):
+        """Test that vector rows without keys are dropped on load"""
+        cache = EmbeddingCache(cache_dir, "test-model")
+        cache.put_many(["a"], [[1.0, 2.0]])
+        with open(cache.vectors_path, "ab") as file:
+            file.write(np.array([9.0, 9.0], dtype=np.float32).tobytes())
+
+        reloaded = EmbeddingCache(cache_dir, "test-model")
+        reloaded.put_many(["b"], [[3.0, 4.0]])
+
+        np.testing.assert_array_equal(reloaded.get_many(["b"])[0], [3.0, 4.0])
+        assert len(reloaded) == 2
+
+
+class TestQueryEmbeddingCache:
+    """Test suite for the in-memory query embedding LRU"""
+
+    @pytest.fixture
+    def embed(self):
+        return Mock(side_effect=lambda text: [float(len(text))])
+
+    def test_hits_and_misses(self, embed):
+        """Test that repeated lookups are served from the cache"""
+        cache = QueryEmbeddingCache(embed, max_size=10)
+
+        assert cache.get("MCP") == [3.0]
+        assert cache.get("  MCP ") == [3.0]
+
+        embed.assert_called_once_with("MCP")
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_least_recently_used_is_evicted(self, embed):
+        """Test that the cache stays bounded and evicts the oldest entry"""
+        cache = QueryEmbeddingCache(embed, max_size=2)
+        cache.get("a")
+        cache.get("bb")
+        cache.get("a")  # "bb" is now least recently used
+        cache.get("ccc")
+
+        embed.reset_mock()
+        cache.get("a")
+        embed.assert_not_called()
+        cache.get("bb")
+        embed.assert_called_once_with("bb")
+        assert cache.stats()["size"] == 2
+
+    def test_zero_size_disables_caching(self, embed):
+        """Test that max_size=0 always embeds"""
+        cache = QueryEmbeddingCache(embed, max_size=0)
+        cache.get("a")
+        cache.get("a")
+        assert embed.call_count == 2
@@ -0,0 +1,218 @@
+"""
+Tests for token-budgeted history summarization
+"""
+
+import os
+import sys
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_generator import AIGenerator
+from session_manager import SessionManager, estimate_tokens
+
+
+class InlineExecutor(Executor):
+    """Runs submitted work immediately, or holds it until run_pending()"""
+
+    def __init__(self, hold: bool = False):
+        self.hold = hold
+        self.pending = []
+
+    def submit(self, fn, *args, **kwargs):
+        if self.hold:
+            self.pending.append((fn, args, kwargs))
+        else:
+            fn(*args, **kwargs)
+        return Future()
+
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for fn, args, kwargs in pending:
+            fn(*args, **kwargs)
+
+
+@dataclass
+class MockTextBlock:
+    type: str = "text"
+    text: str = ""
+
+
+def fake_summarize(previous: str, transcript: str) -> str:
+    """Keep each folded line's first word, so tests can see what was folded"""
+    words = [line.split(": ", 1)[1].split()[0] for line in transcript.split("\n")]
+    return " ".join(filter(None, [previous, *words]))
+
+
+class TestHistoryCompaction:
+    """Test folding of older messages into a rolling summary"""
+
+    def manager(self, executor, summarize=fake_summarize, token_budget=20):
+        return SessionManager(
+            max_history=10,
+            token_budget=token_budget,
+            summarize=summarize,
+            summary_executor=executor,
+        )
+
+    def test_over_budget_messages_folded_into_summary(self):
+        """Test that the oldest messages leave the window once over budget"""
+        manager = self.manager(InlineExecutor(), token_budget=12)
+        session_id = manager.create_session()
+        for i in range(3):
+            manager.add_exchange(session_id, f"Q{i} " + "x" * 20, f"A{i} " + "y" * 20)
+
+        history = manager.get_conversation_history(session_id)
+
+        assert history.startswith("Summary of earlier conversation:\nQ0 A0 Q1 A1\n\n")
+        assert history.endswith("User: Q2 " + "x" * 20 + "\nAssistant: A2 " + "y" * 20)
+        assert len(manager.sessions[session_id].messages) == 2
+        assert manager.stats()["folded_messages"] == 4
+
+    def test_last_exchange_kept_verbatim(self):
+        """Test that a single exchange larger than the budget is not folded"""
+        manager = self.manager(InlineExecutor(), token_budget=5)
+        session_id = manager.create_session()
+
+        manager.add_exchange(session_id, "Q " * 50, "A " * 50)
+
+        assert len(manager.sessions[session_id].messages) == 2
+        assert manager.stats()["summaries"] == 0
+
+    def test_history_stays_bounded(self):
+        """Test that the prompt history no longer grows with the session"""
+        manager = self.manager(InlineExecutor(), token_budget=40)
+        session_id = manager.create_session()
+        for i in range(50):
+            manager.add_exchange(session_id, f"Question {i} " * 3, f"Answer {i} " * 3)
+
+        session = manager.sessions[session_id]
+        assert session.tokens <= 40
+        assert len(manager.get_conversation_history(session_id)) < 1000
+
+    def test_summary_runs_off_the_request_path(self):
+        """Test that folded messages wait for the background summary"""
+        executor = InlineExecutor(hold=True)
+        summarize = Mock(side_effect=fake_summarize)
+        manager = self.manager(executor, summarize=summarize)
+        session_id = manager.create_session()
+        manager.add_exchange(session_id, "Q0 " + "x" * 40, "A0")
+        manager.add_exchange(session_id, "Q1", "A1")
+        manager.add_exchange(session_id, "Q2 " + "x" * 40, "A2")
+
+        summarize.assert_not_called()
+        assert len(executor.pending) == 1  # One task per session at a time
+
+        executor.run_pending()
+
+        summarize.assert_called_once()
+        assert manager.sessions[session_id].summary == "Q0"
+        assert "Q0" not in manager.get_conversation_history(session_id).split("\n\n")[1]
+
+    def test_summary_failure_keeps_previous_summary(self, capsys):
+        """Test that a failed summarize call is logged and not fatal"""
+        summarize = Mock(side_effect=[fake_summarize("", "User: Q0"), Exception("x")])
+        manager = self.manager(InlineExecutor(), summarize=summarize, token_budget=2)
+        session_id = manager.create_session()
+        manager.add_exchange(session_id, "Q0 long", "A0 long")
+        manager.add_message(session_id, "user", "Q1 long")
+        manager.add_message(session_id, "assistant", "A1 long")
+
+        assert manager.sessions[session_id].summary == "Q0"
+        assert manager.stats()["summary_failures"] == 1
+        assert "Error summarizing conversation history" in capsys.readouterr().out
+
+    def test_messages_dropped_by_max_history_are_summarized(self):
+        """Test that max_history no longer discards turns when compacting"""
+        manager = SessionManager(
+            max_history=1,
+            token_budget=1000,
+            summarize=fake_summarize,
+            summary_executor=InlineExecutor(),
+        )
+        session_id = manager.create_session()
+        manager.add_exchange(session_id, "Q0", "A0")
+        manager.add_exchange(session_id, "Q1", "A1")
+
+        assert manager.get_conversation_history(session_id) == (
+            "Summary of earlier conversation:\nQ0 A0\n\nUser: Q1\nAssistant: A1"
+        )
+
+    def test_clear_session_drops_summary(self):
+        """Test that clearing a session also forgets its summary"""
+        manager = self.manager(InlineExecutor(), token_budget=2)
+        session_id = manager.create_session()
+        manager.add_exchange(session_id, "Q0 long", "A0 long")
+        manager.add_exchange(session_id, "Q1 long", "A1 long")
+
+        manager.clear_session(session_id)
+
+        assert manager.get_conversation_history(session_id) is None
+
+    def test_disabled_without_summarize(self):
+        """Test that a token budget alone does not change history"""
+        manager = SessionManager(max_history=1, token_budget=1)
+        session_id = manager.create_session()
+        manager.add_exchange(session_id, "Q0 long", "A0 long")
+        manager.add_exchange(session_id, "Q1 long", "A1 long")
+
+        assert manager.get_conversation_history(session_id) == (
+            "User: Q1 long\nAssistant: A1 long"
+        )
+        assert manager.stats()["folded_messages"] == 0
+
+    def test_estimate_tokens(self):
+        """Test the four-characters-per-token estimate"""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("abcde") == 2
+
+
+class TestSummarizeConversation:
+    """Test the LLM call that produces the rolling summary"""
+
+    @pytest.fixture
+    def generator(self):
+        with patch("anthropic.Anthropic"), patch("anthropic.AsyncAnthropic"):
+            generator = AIGenerator("test-key", "claude-test")
+        return generator
+
+    def test_includes_previous_summary_and_transcript(self, generator):
+        """Test that the request carries both inputs and the length cap"""
+        response = Mock(content=[MockTextBlock(text=" Student asked about MCP. ")])
+        generator.client.messages.create = Mock(return_value=response)
+
+        summary = generator.summarize_conversation(
+            "Earlier: RAG basics", "User: What is MCP?", max_tokens=50
+        )
+
+        assert summary == "Student asked about MCP."
+        kwargs = generator.client.messages.create.call_args.kwargs
+        assert kwargs["max_tokens"] == 50
+        assert kwargs["system"] == AIGenerator.SUMMARY_PROMPT
+        content = kwargs["messages"][0]["content"]
+        assert "Earlier: RAG basics" in content
+        assert "User: What is MCP?" in content
+        assert "tools" not in kwargs
+
+    def test_enabled_by_config(self, mock_config):
+        """Test that HISTORY_TOKEN_BUDGET turns on compaction in RAGSystem"""
+        from rag_system import RAGSystem
+
+        mock_config.HISTORY_TOKEN_BUDGET = 500
+        with (
+            patch("anthropic.Anthropic"),
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction"
+            ),
+        ):
+            rag = RAGSystem(mock_config)
+
+        assert rag.session_manager.token_budget == 500
+        rag.session_manager._summary_executor.shutdown()
@@ -0,0 +1,220 @@
+"""
+Tests for the course ingestion pipeline
+"""
+
+import os
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_processor import DocumentProcessor
+from ingestion import CourseIngestor, IngestionManifest, list_course_files
+
+DOCS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docs",
+)
+
+
+def chunk_ids(store):
+    """Collect chunk IDs in the order they were written to the store"""
+    ids = []
+    for call in store.add_course_content.call_args_list:
+        for chunk in call.args[0]:
+            ids.append(f"{chunk.course_title}_{chunk.chunk_index}")
+    return ids
+
+
+class TestCourseIngestor:
+    """Test suite for CourseIngestor"""
+
+    @pytest.fixture
+    def processor(self):
+        return DocumentProcessor(800, 100)
+
+    @pytest.fixture
+    def file_paths(self):
+        return list_course_files(DOCS_PATH)
+
+    def test_list_course_files_sorted(self, file_paths):
+        """Test that course files are listed in a stable order"""
+        assert len(file_paths) == 4
+        assert file_paths == sorted(file_paths)
+
+    def test_batches_respect_batch_size(self, processor, file_paths):
+        """Test that chunks are written in batches no larger than batch_size"""
+        store = Mock()
+        ingestor = CourseIngestor(processor, store, workers=1, batch_size=10)
+
+        courses, chunks, report = ingestor.ingest(file_paths, set())
+
+        assert courses == 4
+        assert store.add_course_metadata.call_count == 4
+        batch_sizes = [len(c.args[0]) for c in store.add_course_content.call_args_list]
+        assert all(size <= 10 for size in batch_sizes)
+        assert sum(batch_sizes) == chunks
+        assert report.parse.chunks == chunks
+        assert report.write.chunks == chunks
+        assert report.embed.documents == 4
+        assert "embed: 4 docs" in report.summary()
+
+    def test_existing_titles_are_skipped(self, processor, file_paths):
+        """Test that known course titles are not written again"""
+        course, _ = processor.process_course_document(file_paths[0])
+        store = Mock()
+        ingestor = CourseIngestor(processor, store, workers=1)
+
+        courses, _, report = ingestor.ingest(file_paths, {course.title})
+
+        assert courses == 3
+        assert report.skipped == 1
+        written = [c.args[0].title for c in store.add_course_metadata.call_args_list]
+        assert course.title not in written
+
+    def test_parse_errors_are_reported(self, processor, tmp_path):
+        """Test that a failing document is counted without aborting the run"""
+        store = Mock()
+        ingestor = CourseIngestor(processor, store, workers=1)
+
+        courses, chunks, report = ingestor.ingest(
+            [str(tmp_path / "missing.txt")], set()
+        )
+
+        assert (courses, chunks) == (0, 0)
+        assert report.errors == 1
+
+    def test_failed_stream_removes_partial_course(self, processor, file_paths):
+        """Test that chunks already written for a failing document are removed"""
+        course, chunks = processor.process_course_document(file_paths[0])
+
+        def broken_stream():
+            yield chunks[0]
+            raise OSError("disk went away")
+
+        processor.stream_course_document = Mock(return_value=(course, broken_stream()))
+        store = Mock()
+        ingestor = CourseIngestor(processor, store, workers=1, batch_size=1)
+
+        courses, _, report = ingestor.ingest([file_paths[0]], set())
+
+        assert courses == 0
+        assert report.errors == 1
+        store.delete_course.assert_called_once_with(course.title)
+        store.add_course_metadata.assert_not_called()
+        assert report.embed.documents == 1  # Its first chunk was embedded
+
+    @pytest.mark.slow
+    def test_parallel_matches_sequential(self, processor, file_paths):
+        """Test that a process pool produces the same chunks in the same order"""
+        sequential_store = Mock()
+        CourseIngestor(processor, sequential_store, workers=1, batch_size=25).ingest(
+            file_paths, set()
+        )
+
+        parallel_store = Mock()
+        _, _, report = CourseIngestor(
+            processor, parallel_store, workers=2, batch_size=25
+        ).ingest(file_paths, set())
+
+        assert chunk_ids(parallel_store) == chunk_ids(sequential_store)
+        assert report.workers == 2
+        assert "parse" in report.summary()
+
+
+class TestIngestionManifest:
+    """Test suite for manifest-driven incremental ingestion"""
+
+    COURSE = (
+        "Course Title: Manifest Course\n"
+        "Course Link: https://example.com/course\n"
+        "Course Instructor: Test Instructor\n"
+        "\n"
+        "Lesson 0: Introduction\n"
+        "{body}\n"
+    )
+
+    @pytest.fixture
+    def processor(self):
+        return DocumentProcessor(800, 100)
+
+    @pytest.fixture
+    def course_file(self, tmp_path):
+        path = tmp_path / "docs" / "course.txt"
+        path.parent.mkdir()
+        path.write_text(self.COURSE.format(body="Original lesson text."))
+        return path
+
+    def run(self, processor, store, course_file, manifest_path, existing):
+        manifest = IngestionManifest(str(manifest_path))
+        ingestor = CourseIngestor(processor, store, workers=1)
+        return ingestor.ingest([str(course_file)], existing, manifest)
+
+    def test_unchanged_file_is_not_parsed(self, processor, course_file, tmp_path):
+        """Test that a second run skips the file before parsing it"""
+        manifest_path = tmp_path / "manifest.json"
+        existing = set()
+        self.run(processor, Mock(), course_file, manifest_path, existing)
+
+        store = Mock()
+        processor.stream_course_document = Mock(
+            side_effect=AssertionError("should not parse")
+        )
+        courses, chunks, report = self.run(
+            processor, store, course_file, manifest_path, existing
+        )
+
+        assert (courses, chunks) == (0, 0)
+        assert report.unchanged == 1
+        store.add_course_content.assert_not_called()
+
+    def test_touched_file_is_not_reingested(self, processor, course_file, tmp_path):
+        """Test that an mtime change without a content change is skipped"""
+        manifest_path = tmp_path / "manifest.json"
+        existing = set()
+        self.run(processor, Mock(), course_file, manifest_path, existing)
+        stat = os.stat(course_file)
+        os.utime(course_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        store = Mock()
+        _, _, report = self.run(processor, store, course_file, manifest_path, existing)
+
+        assert report.unchanged == 1
+        store.add_course_content.assert_not_called()
+
+    def test_edited_file_replaces_old_chunks(self, processor, course_file, tmp_path):
+        """Test that an edited file deletes its old chunks before re-adding"""
+        manifest_path = tmp_path / "manifest.json"
+        existing = set()
+        self.run(processor, Mock(), course_file, manifest_path, existing)
+        course_file.write_text(self.COURSE.format(body="Edited lesson text, longer."))
+
+        store = Mock()
+        courses, chunks, report = self.run(
+            processor, store, course_file, manifest_path, existing
+        )
+
+        assert courses == 1 and chunks > 0
+        assert report.updated == 1
+        store.delete_course.assert_called_once_with("Manifest Course")
+        store.add_course_metadata.assert_called_once()
+
+    def test_duplicate_title_from_another_file_is_skipped(
+        self, processor, course_file, tmp_path
+    ):
+        """Test that a second file producing the same title does not replace it"""
+        duplicate = course_file.parent / "copy.txt"
+        duplicate.write_text(self.COURSE.format(body="Different text."))
+        manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+        store = Mock()
+
+        courses, _, report = CourseIngestor(processor, store, workers=1).ingest(
+            [str(course_file), str(duplicate)], set(), manifest
+        )
+
+        assert courses == 1
+        assert report.skipped == 1
+        store.delete_course.assert_not_called()
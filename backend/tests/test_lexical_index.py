@@ -0,0 +1,280 @@
+"""
+Tests for the BM25 lexical index and hybrid search
+"""
+
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+from models import CourseChunk
+from vector_store import VectorStore
+
+CHUNKS = [
+    ("MCP_0", "MCP servers expose tools over stdio", "MCP", 1),
+    ("MCP_1", "Set max_tokens when calling client.messages.create", "MCP", 2),
+    ("MCP_2", "The client talks to one server per connection", "MCP", 2),
+    ("Chroma_0", "Use a cross-encoder to re-rank retrieved documents", "Chroma", 1),
+    ("Chroma_1", "Embeddings place similar documents close together", "Chroma", 2),
+]
+
+
+def build_index(path=None) -> LexicalIndex:
+    index = LexicalIndex(path)
+    index.add(
+        [chunk_id for chunk_id, _, _, _ in CHUNKS],
+        [text for _, text, _, _ in CHUNKS],
+        [{"course_title": c, "lesson_number": n} for _, _, c, n in CHUNKS],
+    )
+    return index
+
+
+class TestTokenize:
+    """Test term extraction"""
+
+    def test_identifiers_kept_whole_and_split(self):
+        """Test that compound identifiers yield the whole token and its parts"""
+        assert tokenize("Set --max-tokens") == ["set", "max-tokens", "max", "tokens"]
+        assert tokenize("client.messages.create()") == [
+            "client.messages.create",
+            "client.messages",
+            "client",
+            "messages",
+            "create",
+        ]
+
+    def test_underscores_split(self):
+        """Test that snake_case identifiers also match their words"""
+        assert tokenize("max_tokens") == ["max_tokens", "max", "tokens"]
+
+    def test_leading_parts_match_file_names(self):
+        """Test that a module name matches its file name"""
+        assert "research_server" in tokenize("Run research_server.py")
+        assert tokenize("__init__") == ["__init__"]
+
+
+class TestLexicalIndex:
+    """Test BM25 ranking, filters, removal and persistence"""
+
+    def test_exact_identifier_ranks_first(self):
+        """Test that a chunk containing the identifier is the top hit"""
+        index = build_index()
+
+        results = index.search("what does max_tokens do", limit=3)
+
+        assert results[0][0] == "MCP_1"
+        assert results[0][1] > 0
+
+    def test_only_matching_chunks_returned(self):
+        """Test that chunks sharing no term with the query are left out"""
+        index = build_index()
+
+        ids = [chunk_id for chunk_id, _ in index.search("cross-encoder", limit=5)]
+
+        assert ids == ["Chroma_0"]
+
+    def test_rare_terms_outweigh_common_ones(self):
+        """Test IDF weighting: a term in one chunk beats one in many"""
+        index = build_index()
+
+        ids = [chunk_id for chunk_id, _ in index.search("documents stdio", limit=5)]
+
+        assert ids[0] == "MCP_0"
+
+    def test_course_and_lesson_filters(self):
+        """Test that filters match _build_filter semantics"""
+        index = build_index()
+
+        by_course = index.search("client", limit=5, course_title="MCP")
+        by_lesson = index.search("client", limit=5, lesson_number=1)
+        both = index.search(
+            "documents", limit=5, course_title="Chroma", lesson_number=2
+        )
+
+        assert {chunk_id for chunk_id, _ in by_course} == {"MCP_1", "MCP_2"}
+        assert by_lesson == []
+        assert [chunk_id for chunk_id, _ in both] == ["Chroma_1"]
+        assert index.search("client", limit=5, course_title="Unknown") == []
+
+    def test_limit(self):
+        """Test that at most limit results come back, best first"""
+        index = build_index()
+
+        results = index.search("client server documents", limit=2)
+
+        assert len(results) == 2
+        assert results[0][1] >= results[1][1]
+
+    def test_remove_course(self):
+        """Test that a removed course no longer matches"""
+        index = build_index()
+
+        index.remove_course("MCP")
+
+        assert len(index) == 2
+        assert index.search("max_tokens", limit=5) == []
+        assert index.search("documents", limit=5)
+
+    def test_readding_a_chunk_replaces_it(self):
+        """Test that an ID added twice is indexed once, with the new text"""
+        index = build_index()
+
+        index.add(["MCP_0"], ["Resources are read-only"], [{"course_title": "MCP"}])
+
+        assert len(index) == len(CHUNKS)
+        assert index.search("stdio", limit=5) == []
+        assert index.search("read-only", limit=5)[0][0] == "MCP_0"
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Test that a loaded index ranks exactly like the saved one"""
+        path = str(tmp_path / "lexical_index.npz")
+        index = build_index(path)
+        index.remove_course("Chroma")
+        index.save()
+
+        loaded = LexicalIndex(path)
+
+        assert len(loaded) == 3
+        for query in ["max_tokens", "client server", "tools over stdio"]:
+            assert loaded.search(query, limit=5) == index.search(query, limit=5)
+
+    def test_loaded_index_accepts_writes(self, tmp_path):
+        """Test that chunks can be added and removed after a load"""
+        path = str(tmp_path / "lexical_index.npz")
+        build_index(path).save()
+        loaded = LexicalIndex(path)
+
+        loaded.add(["New_0"], ["Prompt caching cuts cost"], [{"course_title": "New"}])
+        loaded.remove_course("MCP")
+
+        assert loaded.search("caching", limit=5)[0][0] == "New_0"
+        assert loaded.search("max_tokens", limit=5) == []
+        assert loaded.search("cross-encoder", limit=5)[0][0] == "Chroma_0"
+
+    def test_search_unaffected_by_concurrent_compaction(self, tmp_path):
+        """Test that a search maps rows to IDs from its own snapshot"""
+        index = build_index(str(tmp_path / "lexical_index.npz"))
+        index.search("warm up", limit=1)
+
+        def compact_then_tokenize(text):
+            # Another thread removes a course and saves, renumbering rows
+            index.remove_course("MCP")
+            index.save()
+            return tokenize(text)
+
+        with patch("lexical_index.tokenize", side_effect=compact_then_tokenize):
+            results = index.search("documents", limit=5, course_title="Chroma")
+
+        assert {chunk_id for chunk_id, _ in results} == {"Chroma_0", "Chroma_1"}
+
+    def test_unreadable_file_ignored(self, tmp_path, capsys):
+        """Test that a corrupt index file starts an empty index"""
+        path = tmp_path / "lexical_index.npz"
+        path.write_bytes(b"not an npz file")
+
+        index = LexicalIndex(str(path))
+
+        assert len(index) == 0
+        assert "Ignoring unreadable lexical index" in capsys.readouterr().out
+
+
+class TestReciprocalRankFusion:
+    """Test rank fusion of dense and keyword results"""
+
+    def test_items_in_both_lists_rise(self):
+        """Test that agreement between rankings wins over one top rank"""
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["d", "b", "e"]], k=60)
+
+        assert fused[0] == "b"
+        assert set(fused) == {"a", "b", "c", "d", "e"}
+
+    def test_single_list_keeps_order(self):
+        """Test that one ranking passes through unchanged"""
+        assert reciprocal_rank_fusion([["x", "y", "z"], []]) == ["x", "y", "z"]
+
+
+class TestHybridSearch:
+    """Test VectorStore.search with a lexical index"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        embedding_function = Mock(side_effect=lambda docs: [[0.5, 0.5] for _ in docs])
+        with (
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction",
+                return_value=embedding_function,
+            ),
+        ):
+            store = VectorStore(
+                "./test_chroma_db",
+                "test-model",
+                max_results=2,
+                lexical_index_path=str(tmp_path / "lexical_index.npz"),
+            )
+        store.add_course_content(
+            CourseChunk(content=text, course_title=c, lesson_number=n, chunk_index=i)
+            for i, (_, text, c, n) in enumerate(CHUNKS)
+        )
+        store.course_content.count.return_value = len(CHUNKS)
+        # The embedding ranking misses the chunk naming the identifier
+        store.course_content.query.return_value = {
+            "ids": [["MCP_2", "MCP_0"]],
+            "documents": [["dense one", "dense two"]],
+            "metadatas": [[{"course_title": "MCP"}, {"course_title": "MCP"}]],
+            "distances": [[0.2, 0.3]],
+        }
+        store.course_content.get.return_value = {
+            "ids": ["MCP_1"],
+            "documents": ["Set max_tokens when calling client.messages.create"],
+            "metadatas": [{"course_title": "MCP", "lesson_number": 2}],
+        }
+        return store
+
+    def test_keyword_match_fused_into_results(self, store):
+        """Test that a chunk only BM25 found is fetched and ranked"""
+        results = store.search("client max_tokens")
+
+        assert results.error is None
+        assert len(results.documents) == 2
+        assert "Set max_tokens when calling client.messages.create" in (
+            results.documents
+        )
+        keyword_only = results.documents.index(
+            "Set max_tokens when calling client.messages.create"
+        )
+        assert results.distances[keyword_only] is None
+        store.course_content.get.assert_called_once_with(
+            ids=["MCP_1"], include=["documents", "metadatas"]
+        )
+
+    def test_dense_candidates_widened(self, store):
+        """Test that both rankings draw from more candidates than the limit"""
+        store.search("client")
+
+        kwargs = store.course_content.query.call_args.kwargs
+        assert kwargs["n_results"] == store.hybrid_candidates
+
+    def test_index_written_with_content_and_saved(self, store, tmp_path):
+        """Test that content writes update and persist the index"""
+        assert len(store.lexical_index) == len(CHUNKS)
+        assert (tmp_path / "lexical_index.npz").exists()
+
+    def test_missing_index_rebuilt_from_chroma(self, store):
+        """Test that an index out of step with Chroma is rebuilt on first search"""
+        store.course_content.count.return_value = 1
+        store.course_content.get.return_value = {
+            "ids": ["Only_0"],
+            "documents": ["stdio transport"],
+            "metadatas": [{"course_title": "Only", "lesson_number": 0}],
+        }
+
+        store.search("stdio")
+
+        assert len(store.lexical_index) == 1
+        assert store.lexical_index.search("stdio", limit=1)[0][0] == "Only_0"
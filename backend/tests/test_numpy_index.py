@@ -0,0 +1,409 @@
+"""
+Tests for the NumPy flat/IVF course content backend
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock, Mock, patch
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Course, CourseChunk
+from numpy_index import NumpyContentIndex, parse_where
+from vector_store import VectorStore
+
+COURSES = ["Alpha", "Beta", "Gamma"]
+
+
+def make_corpus(rows: int, dim: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    ids = [f"chunk_{i}" for i in range(rows)]
+    metadatas = [
+        {"course_title": COURSES[i % 3], "lesson_number": i % 4} for i in range(rows)
+    ]
+    return ids, [f"text {i}" for i in range(rows)], metadatas, vectors
+
+
+def brute_force(vectors, query, rows, limit):
+    distances = ((vectors[rows] - query) ** 2).sum(axis=1)
+    return [int(rows[i]) for i in np.argsort(distances)[:limit]]
+
+
+def fill(index, ids, documents, metadatas, vectors, batch=100):
+    for start in range(0, len(ids), batch):
+        end = start + batch
+        index.add(
+            documents=documents[start:end],
+            metadatas=metadatas[start:end],
+            ids=ids[start:end],
+            embeddings=vectors[start:end],
+        )
+
+
+class TestParseWhere:
+    """Test reading VectorStore filters"""
+
+    def test_filter_shapes(self):
+        """Test every filter _build_filter produces"""
+        assert parse_where(None) == (None, None)
+        assert parse_where({"course_title": "A"}) == ("A", None)
+        assert parse_where({"lesson_number": 2}) == (None, 2)
+        assert parse_where({"$and": [{"course_title": "A"}, {"lesson_number": 0}]}) == (
+            "A",
+            0,
+        )
+
+    def test_unknown_field_rejected(self):
+        """Test that unsupported filters fail loudly rather than match all"""
+        with pytest.raises(ValueError):
+            parse_where({"chunk_index": 1})
+
+
+class TestNumpyContentIndex:
+    """Test flat search, filters, persistence and deletes"""
+
+    @pytest.fixture
+    def corpus(self):
+        return make_corpus(600)
+
+    @pytest.fixture
+    def index(self, tmp_path, corpus):
+        index = NumpyContentIndex(str(tmp_path / "content"))
+        fill(index, *corpus)
+        return index
+
+    def test_flat_search_is_exact(self, index, corpus):
+        """Test that results and distances match a brute-force search"""
+        ids, _, _, vectors = corpus
+        query = np.random.default_rng(1).standard_normal(16).astype(np.float32)
+
+        results = index.query(query_embeddings=[query.tolist()], n_results=5)
+
+        expected = brute_force(vectors, query, np.arange(len(ids)), 5)
+        assert results["ids"][0] == [ids[i] for i in expected]
+        np.testing.assert_allclose(
+            results["distances"][0],
+            ((vectors[expected] - query) ** 2).sum(axis=1),
+            rtol=1e-4,
+        )
+        assert results["documents"][0][0] == f"text {expected[0]}"
+
+    def test_filters_match_chroma_semantics(self, index, corpus):
+        """Test course, lesson and combined filters"""
+        ids, _, metadatas, vectors = corpus
+        query = vectors[7] + 0.01
+
+        both = index.query(
+            [query],
+            n_results=3,
+            where={"$and": [{"course_title": "Beta"}, {"lesson_number": 3}]},
+        )
+        lesson = index.query([query], n_results=50, where={"lesson_number": 0})
+        unknown = index.query([query], n_results=3, where={"course_title": "Nope"})
+
+        rows = np.array(
+            [
+                i
+                for i, m in enumerate(metadatas)
+                if m["course_title"] == "Beta" and m["lesson_number"] == 3
+            ]
+        )
+        assert both["ids"][0] == [ids[i] for i in brute_force(vectors, query, rows, 3)]
+        assert all(m["lesson_number"] == 0 for m in lesson["metadatas"][0])
+        assert unknown["ids"] == [[]]
+
+    def test_reload_from_disk(self, tmp_path, index, corpus):
+        """Test that a new instance serves the same results from the files"""
+        query = corpus[3][11]
+
+        reloaded = NumpyContentIndex(str(tmp_path / "content"))
+
+        assert reloaded.count() == 600
+        assert reloaded.query([query], 5) == index.query([query], 5)
+
+    def test_delete_by_course_survives_reload(self, tmp_path, index):
+        """Test that deleted chunks are gone now and after a restart"""
+        index.delete(where={"course_title": "Alpha"})
+        reloaded = NumpyContentIndex(str(tmp_path / "content"))
+
+        for store in (index, reloaded):
+            assert store.count() == 400
+            assert store.get(where={"course_title": "Alpha"})["ids"] == []
+            assert store.get(ids=["chunk_1"])["ids"] == ["chunk_1"]
+        # Old file generations are removed
+        assert sorted(os.listdir(tmp_path / "content")) == [
+            "chunks.jsonl.1",
+            "meta.json",
+            "vectors.f32.1",
+        ]
+
+    def test_query_unaffected_by_concurrent_delete(self, index, corpus):
+        """Test that a query reads one generation while a delete rewrites"""
+        query = corpus[3][8] + 0.01
+        where = {"course_title": "Gamma"}
+        expected = index.query([query], 5, where=where)
+        search = index._search
+
+        def delete_then_search(*args):
+            # Another thread deletes a course, renumbering rows and courses
+            index.delete(where={"course_title": "Alpha"})
+            return search(*args)
+
+        with patch.object(index, "_search", side_effect=delete_then_search):
+            results = index.query([query], 5, where=where)
+
+        assert results == expected
+        assert results["ids"][0][0] == "chunk_8"
+        assert index.query([query], 5, where=where) == expected
+
+    def test_duplicate_ids_skipped(self, index, corpus):
+        """Test that re-adding an existing ID keeps one copy"""
+        ids, documents, metadatas, vectors = corpus
+
+        index.add(documents[:2], metadatas[:2], ids[:2], vectors[:2])
+
+        assert index.count() == 600
+
+    def test_torn_write_recovered(self, tmp_path, index):
+        """Test that a partial trailing record is dropped on load"""
+        path = tmp_path / "content"
+        with open(path / "vectors.f32.0", "ab") as file:
+            file.write(b"\0" * 64)  # Vector written, chunk record not
+        with open(path / "chunks.jsonl.0", "ab") as file:
+            file.write(b'{"id": "half')
+
+        reloaded = NumpyContentIndex(str(path))
+
+        assert reloaded.count() == 600
+        assert os.path.getsize(path / "vectors.f32.0") == 600 * 16 * 4
+
+    def test_clear(self, tmp_path, index):
+        """Test that clearing leaves an empty, reusable index"""
+        index.clear()
+
+        assert index.count() == 0
+        assert index.query([[0.0] * 16], 3)["ids"] == [[]]
+        assert NumpyContentIndex(str(tmp_path / "content")).count() == 0
+
+
+class TestIVF:
+    """Test the partitioned search path"""
+
+    @pytest.fixture
+    def clustered(self):
+        # Well separated clusters, as real topic embeddings roughly are
+        rng = np.random.default_rng(2)
+        centers = rng.standard_normal((20, 16)).astype(np.float32) * 10
+        vectors = centers[np.arange(2000) % 20] + rng.standard_normal(
+            (2000, 16)
+        ).astype(np.float32)
+        ids, documents, metadatas, _ = make_corpus(2000)
+        return ids, documents, metadatas, vectors
+
+    def test_trained_once_large_enough(self, tmp_path, clustered):
+        """Test that lists are only built with enough rows per centroid"""
+        ids, documents, metadatas, vectors = clustered
+        index = NumpyContentIndex(str(tmp_path / "ivf"), ivf_lists=20)
+
+        fill(index, ids[:500], documents[:500], metadatas[:500], vectors[:500])
+        assert index._snapshot.ivf is None
+        fill(index, ids[500:], documents[500:], metadatas[500:], vectors[500:])
+        assert index._snapshot.ivf is not None
+        assert index._snapshot.ivf.offsets[-1] == 2000
+
+    def test_recall_against_flat(self, tmp_path, clustered):
+        """Test that probing a few lists finds nearly all true neighbours"""
+        flat = NumpyContentIndex(str(tmp_path / "flat"))
+        ivf = NumpyContentIndex(str(tmp_path / "ivf"), ivf_lists=20, ivf_probes=3)
+        fill(flat, *clustered)
+        fill(ivf, *clustered)
+
+        rng = np.random.default_rng(3)
+        found = 0
+        for row in rng.choice(2000, 50, replace=False):
+            query = clustered[3][row] + 0.1
+            expected = set(flat.query([query], 10)["ids"][0])
+            found += len(expected & set(ivf.query([query], 10)["ids"][0]))
+
+        assert found / 500 >= 0.95
+
+    def test_filtered_queries_are_exact(self, tmp_path, clustered):
+        """Test that a filter matching rows far from the query still finds them"""
+        ids, documents, metadatas, vectors = clustered
+        metadatas = [dict(m) for m in metadatas]
+        metadatas[5]["course_title"] = "Rare"
+        index = NumpyContentIndex(str(tmp_path / "ivf"), ivf_lists=20, ivf_probes=1)
+        fill(index, ids, documents, metadatas, vectors)
+
+        far_away = vectors[6]  # Another cluster than chunk 5
+        results = index.query([far_away], 3, where={"course_title": "Rare"})
+
+        assert results["ids"][0] == ["chunk_5"]
+
+
+class TestQuantization:
+    """Test the int8/float16 scan copy with float32 re-ranking"""
+
+    @pytest.fixture
+    def clustered(self):
+        rng = np.random.default_rng(4)
+        centers = rng.standard_normal((30, 32)).astype(np.float32)
+        vectors = centers[np.arange(3000) % 30] + 0.5 * rng.standard_normal(
+            (3000, 32)
+        ).astype(np.float32)
+        ids, documents, metadatas, _ = make_corpus(3000)
+        return ids, documents, metadatas, vectors
+
+    @pytest.mark.parametrize("quantization", ["int8", "float16"])
+    def test_recall_against_float32(self, tmp_path, clustered, quantization):
+        """Test that re-ranked results match the exact search almost always"""
+        flat = NumpyContentIndex(str(tmp_path / "flat"))
+        quantized = NumpyContentIndex(
+            str(tmp_path / quantization), quantization=quantization
+        )
+        fill(flat, *clustered, batch=1000)
+        fill(quantized, *clustered, batch=1000)
+
+        rng = np.random.default_rng(5)
+        found = 0
+        for row in rng.choice(3000, 50, replace=False):
+            query = clustered[3][row] + 0.2
+            expected = flat.query([query], 10)
+            results = quantized.query([query], 10)
+            found += len(set(expected["ids"][0]) & set(results["ids"][0]))
+            if results["ids"][0] == expected["ids"][0]:
+                # Distances come from the float32 rows, not the codes
+                np.testing.assert_allclose(
+                    results["distances"][0], expected["distances"][0], rtol=1e-4
+                )
+
+        assert found / 500 >= 0.95
+
+    def test_memory_saved(self, tmp_path, clustered):
+        """Test that the resident copy is a quarter or half of float32"""
+        for quantization, ratio in [("int8", 4), ("float16", 2), ("none", 1)]:
+            index = NumpyContentIndex(
+                str(tmp_path / quantization), quantization=quantization
+            )
+            fill(index, *clustered, batch=1000)
+
+            stats = index.memory_stats()
+
+            assert stats["float32_bytes"] == 3000 * 32 * 4
+            assert stats["vector_bytes"] <= stats["float32_bytes"] // ratio + 32 * 4
+            assert stats["saved_bytes"] == (
+                stats["float32_bytes"] - stats["vector_bytes"]
+            )
+
+    def test_scales_widen_for_larger_batch(self, tmp_path):
+        """Test that a later batch outside the int8 range requantizes all rows"""
+        ids, documents, metadatas, vectors = make_corpus(400)
+        vectors[200:] *= 10
+        index = NumpyContentIndex(str(tmp_path / "int8"), quantization="int8")
+
+        fill(index, ids[:200], documents[:200], metadatas[:200], vectors[:200])
+        before = index._snapshot.scales.copy()
+        fill(index, ids[200:], documents[200:], metadatas[200:], vectors[200:])
+        snapshot = index._snapshot
+
+        assert np.all(snapshot.scales >= before)
+        assert np.all(np.abs(snapshot.codes) <= 127)
+        np.testing.assert_allclose(
+            snapshot.codes.astype(np.float32) * snapshot.scales,
+            vectors,
+            atol=float(snapshot.scales.max()),
+        )
+
+    def test_filtered_and_reloaded(self, tmp_path, clustered):
+        """Test filters and a restart with quantization, which adds no files"""
+        ids, documents, metadatas, vectors = clustered
+        path = str(tmp_path / "int8")
+        index = NumpyContentIndex(path, quantization="int8", rerank_factor=2)
+        fill(index, *clustered, batch=1000)
+        where = {"course_title": "Beta"}
+        rows = np.flatnonzero([m["course_title"] == "Beta" for m in metadatas])
+        query = vectors[1] + 0.05
+
+        results = index.query([query], 5, where=where)
+        reloaded = NumpyContentIndex(path, quantization="int8", rerank_factor=2)
+
+        assert results["ids"][0][0] == "chunk_1"
+        assert set(results["ids"][0]) <= {ids[i] for i in rows}
+        assert reloaded.query([query], 5, where=where) == results
+        assert sorted(os.listdir(path)) == [
+            "chunks.jsonl.0",
+            "meta.json",
+            "vectors.f32.0",
+        ]
+
+    def test_unknown_quantization_rejected(self, tmp_path):
+        """Test that a misspelt quantization fails at startup"""
+        with pytest.raises(ValueError, match="Unknown quantization"):
+            NumpyContentIndex(str(tmp_path / "bad"), quantization="int4")
+
+
+class TestVectorStoreNumpyBackend:
+    """Test VectorStore running on the NumPy backend"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        embedding_function = Mock(
+            side_effect=lambda docs: [
+                [float(len(doc)), float(doc.count("a")), 1.0] for doc in docs
+            ]
+        )
+        with (
+            patch("chromadb.PersistentClient") as client_class,
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction",
+                return_value=embedding_function,
+            ),
+        ):
+            client_class.return_value = MagicMock()
+            store = VectorStore(str(tmp_path), "test-model", content_backend="numpy")
+        for title in ["One", "Two"]:
+            store.add_course_metadata(Course(title=title))
+        store.add_course_content(
+            CourseChunk(
+                content=f"{'a' * i} chunk",
+                course_title=title,
+                lesson_number=i % 2,
+                chunk_index=i,
+            )
+            for i, title in enumerate(["One", "Two", "One", "Two"])
+        )
+        return store
+
+    def test_search_and_filters(self, store):
+        """Test that search goes through the NumPy index with filters"""
+        results = store.search("aa chunk", course_name="One")
+
+        assert results.error is None
+        assert {m["course_title"] for m in results.metadata} == {"One"}
+        assert results.documents[0] == "aa chunk"
+        store.client.get_or_create_collection.assert_called_once()  # Catalog only
+
+    def test_delete_and_clear(self, store):
+        """Test that course deletes and clears reach the NumPy index"""
+        store.delete_course("Two")
+        assert store.course_content.count() == 2
+
+        store.clear_all_data()
+        assert store.course_content.count() == 0
+        assert isinstance(store.course_content, NumpyContentIndex)
+
+    def test_unknown_backend_rejected(self, tmp_path):
+        """Test that a misspelt backend name fails at startup"""
+        with (
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction"
+            ),
+        ):
+            with pytest.raises(ValueError, match="Unknown vector backend"):
+                VectorStore(str(tmp_path), "test-model", content_backend="faiss")
@@ -0,0 +1,184 @@
+"""
+Tests for the ONNX Runtime embedding backend
+"""
+
+import json
+import os
+import sys
+from unittest.mock import MagicMock, Mock, patch
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Course
+from onnx_embedding import OnnxEmbeddingFunction
+from vector_store import VectorStore
+
+WORDS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "what", "is", "mcp", "a", "server"]
+
+
+def write_model(path, modules=None, pooling=None, max_seq_length=6):
+    """A sentence-transformers model directory with a word-level tokenizer"""
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+
+    tokenizer = Tokenizer(
+        models.WordLevel({word: i for i, word in enumerate(WORDS)}, "[UNK]")
+    )
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", special_tokens=[("[CLS]", 2), ("[SEP]", 3)]
+    )
+    os.makedirs(path / "1_Pooling")
+    tokenizer.save(str(path / "tokenizer.json"))
+    if modules is None:
+        modules = [
+            {"path": "", "type": "sentence_transformers.models.Transformer"},
+            {"path": "1_Pooling", "type": "sentence_transformers.models.Pooling"},
+            {"path": "2_Normalize", "type": "sentence_transformers.models.Normalize"},
+        ]
+    (path / "modules.json").write_text(json.dumps(modules))
+    (path / "1_Pooling" / "config.json").write_text(
+        json.dumps(pooling or {"pooling_mode_mean_tokens": True})
+    )
+    (path / "sentence_bert_config.json").write_text(
+        json.dumps({"max_seq_length": max_seq_length})
+    )
+    return str(path)
+
+
+def fake_session(inputs=("input_ids", "attention_mask", "token_type_ids")):
+    """An InferenceSession whose token embeddings are [id, position]"""
+    session = Mock()
+    session.get_inputs.return_value = [Mock() for _ in inputs]
+    for model_input, name in zip(session.get_inputs.return_value, inputs):
+        model_input.name = name
+
+    def run(_, feeds):
+        ids = feeds["input_ids"].astype(np.float32)
+        positions = np.broadcast_to(
+            np.arange(ids.shape[1], dtype=np.float32), ids.shape
+        )
+        return [np.stack([ids, positions], axis=-1)]
+
+    session.run.side_effect = run
+    return session
+
+
+@pytest.fixture
+def session():
+    session = fake_session()
+    with patch("onnxruntime.InferenceSession", return_value=session):
+        yield session
+
+
+class TestOnnxEmbeddingFunction:
+    """Test tokenization, pooling and normalization around the ONNX graph"""
+
+    def test_mean_pooling_ignores_padding(self, tmp_path, session):
+        """Test that padded positions do not change a text's embedding"""
+        embed = OnnxEmbeddingFunction(write_model(tmp_path), "model.onnx")
+
+        alone = embed(["mcp"])[0]
+        batched = embed(["mcp", "what is a mcp server"])[0]
+
+        # [CLS] mcp [SEP] -> ids 2, 6, 3 at positions 0, 1, 2
+        expected = np.array([11 / 3, 1.0])
+        np.testing.assert_allclose(alone, expected / np.linalg.norm(expected))
+        np.testing.assert_allclose(batched, alone, rtol=1e-6)
+        assert batched.dtype == np.float32
+
+    def test_truncates_and_pads_to_longest(self, tmp_path, session):
+        """Test max_seq_length truncation and padding to the batch's longest"""
+        embed = OnnxEmbeddingFunction(write_model(tmp_path), "model.onnx")
+
+        embed(["mcp", "what is a mcp server what is"])
+
+        feeds = session.run.call_args.args[1]
+        assert feeds["input_ids"].shape == (2, 6)
+        assert feeds["input_ids"][0].tolist() == [2, 6, 3, 0, 0, 0]
+        assert feeds["attention_mask"][0].tolist() == [1, 1, 1, 0, 0, 0]
+        assert feeds["input_ids"][1][-1] == 3  # [SEP] kept after truncation
+
+    def test_optional_inputs_and_normalize(self, tmp_path):
+        """Test graphs without token_type_ids and models without Normalize"""
+        modules = [
+            {"path": "", "type": "sentence_transformers.models.Transformer"},
+            {"path": "1_Pooling", "type": "sentence_transformers.models.Pooling"},
+        ]
+        session = fake_session(inputs=("input_ids", "attention_mask"))
+        with patch("onnxruntime.InferenceSession", return_value=session):
+            embed = OnnxEmbeddingFunction(
+                write_model(tmp_path, modules, {"pooling_mode_cls_token": True}),
+                "model.onnx",
+            )
+            vector = embed(["mcp server"])[0]
+
+        assert "token_type_ids" not in session.run.call_args.args[1]
+        np.testing.assert_array_equal(vector, [2.0, 0.0])
+
+    def test_unsupported_model_rejected(self, tmp_path, session):
+        """Test that a model with extra layers fails instead of embedding wrongly"""
+        modules = [
+            {"path": "", "type": "sentence_transformers.models.Transformer"},
+            {"path": "2_Dense", "type": "sentence_transformers.models.Dense"},
+        ]
+
+        with pytest.raises(ValueError, match="Unsupported modules"):
+            OnnxEmbeddingFunction(write_model(tmp_path, modules), "model.onnx")
+
+    def test_hub_names_resolve_like_sentence_transformers(self, tmp_path, session):
+        """Test that bare model names are looked up under sentence-transformers/"""
+        model_dir = write_model(tmp_path)
+
+        with patch(
+            "huggingface_hub.hf_hub_download",
+            side_effect=lambda repo, name: os.path.join(model_dir, name),
+        ) as download:
+            OnnxEmbeddingFunction("all-MiniLM-L6-v2", "onnx/model_quint8_avx2.onnx")
+
+        repos = {call.args[0] for call in download.call_args_list}
+        assert repos == {"sentence-transformers/all-MiniLM-L6-v2"}
+        assert download.call_args_list[-1].args[1] == "onnx/model_quint8_avx2.onnx"
+
+
+class TestVectorStoreOnnxBackend:
+    """Test VectorStore embedding through the ONNX backend"""
+
+    def test_embeddings_passed_to_chroma(self, tmp_path):
+        """Test that Chroma gets vectors, never the ONNX embedding function"""
+        embedding_function = Mock(side_effect=lambda docs: [[1.0, 0.0] for _ in docs])
+        with (
+            patch("chromadb.PersistentClient") as client_class,
+            patch(
+                "vector_store.OnnxEmbeddingFunction", return_value=embedding_function
+            ) as onnx_class,
+        ):
+            client_class.return_value = MagicMock()
+            store = VectorStore(
+                str(tmp_path),
+                "all-MiniLM-L6-v2",
+                embedding_backend="onnx",
+                onnx_file="onnx/model_quint8_avx2.onnx",
+                embedding_cache_path=str(tmp_path / "cache"),
+            )
+
+        store.add_course_metadata(Course(title="MCP"))
+
+        onnx_class.assert_called_once_with(
+            "all-MiniLM-L6-v2", "onnx/model_quint8_avx2.onnx"
+        )
+        for call in store.client.get_or_create_collection.call_args_list:
+            assert call.kwargs["embedding_function"] is None
+        upsert = store.course_catalog.upsert.call_args.kwargs
+        assert upsert["embeddings"] == [[1.0, 0.0]]
+        # int8 vectors differ slightly, so they are cached apart
+        assert "onnx_model_quint8_avx2.onnx" in store.embedding_cache.vectors_path
+
+    def test_unknown_backend_rejected(self, tmp_path):
+        """Test that a misspelt embedding backend fails at startup"""
+        with patch("chromadb.PersistentClient"):
+            with pytest.raises(ValueError, match="Unknown embedding backend"):
+                VectorStore(str(tmp_path), "test-model", embedding_backend="torch")
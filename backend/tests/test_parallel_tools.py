@@ -0,0 +1,224 @@
+"""
+Tests for concurrent execution of the tool calls in one round
+"""
+
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_generator import AIGenerator
+from query_context import QueryContext
+
+
+@dataclass
+class MockTextBlock:
+    type: str = "text"
+    text: str = ""
+
+
+@dataclass
+class MockToolUseBlock:
+    type: str = "tool_use"
+    name: str = ""
+    id: str = ""
+    input: dict = None
+
+
+@dataclass
+class MockResponse:
+    content: list
+    stop_reason: str
+
+
+def two_searches() -> MockResponse:
+    return MockResponse(
+        content=[
+            MockToolUseBlock(
+                name="search_course_content", id="tool_a", input={"query": "A"}
+            ),
+            MockToolUseBlock(
+                name="search_course_content", id="tool_b", input={"query": "B"}
+            ),
+        ],
+        stop_reason="tool_use",
+    )
+
+
+def final_answer() -> MockResponse:
+    return MockResponse(content=[MockTextBlock(text="Answer")], stop_reason="end_turn")
+
+
+def slow_tool(delays):
+    """execute_tool stand-in sleeping delays[query] seconds"""
+
+    def execute_tool(name, query, context=None):
+        time.sleep(delays[query])
+        if context is not None:
+            context.add_sources([{"text": f"Source {query}", "link": None}])
+        return f"result {query}"
+
+    return execute_tool
+
+
+def tool_results(create_mock, call_index=1):
+    """tool_result blocks sent in the given messages.create call"""
+    messages = create_mock.call_args_list[call_index].kwargs["messages"]
+    return messages[2]["content"]
+
+
+class TestParallelToolCalls:
+    """Test suite for parallel tool execution within a round"""
+
+    @pytest.fixture
+    def generator_factory(self):
+        def _create(**kwargs):
+            with patch("anthropic.Anthropic"), patch("anthropic.AsyncAnthropic"):
+                generator = AIGenerator("test-key", "claude-test", **kwargs)
+            generator.client.messages.create = Mock(
+                side_effect=[two_searches(), final_answer()]
+            )
+            return generator
+
+        return _create
+
+    def test_round_runs_tools_concurrently(self, generator_factory):
+        """Test that two slow tools cost one tool latency, not the sum"""
+        generator = generator_factory()
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = slow_tool({"A": 0.3, "B": 0.3})
+
+        start = time.perf_counter()
+        answer = generator.generate_response(
+            "Compare A and B", tools=[{"name": "search"}], tool_manager=tool_manager
+        )
+        elapsed = time.perf_counter() - start
+
+        assert answer == "Answer"
+        assert elapsed < 0.5
+
+    def test_results_keep_tool_use_order(self, generator_factory):
+        """Test that tool_result order follows tool_use order, not completion"""
+        generator = generator_factory()
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = slow_tool({"A": 0.2, "B": 0.0})
+        context = QueryContext()
+
+        generator.generate_response(
+            "Compare A and B",
+            tools=[{"name": "search"}],
+            tool_manager=tool_manager,
+            context=context,
+        )
+
+        results = tool_results(generator.client.messages.create)
+        assert [r["tool_use_id"] for r in results] == ["tool_a", "tool_b"]
+        assert [r["content"] for r in results] == ["result A", "result B"]
+        assert [s["text"] for s in context.sources] == ["Source A", "Source B"]
+
+    def test_slow_tool_times_out(self, generator_factory):
+        """Test that a tool exceeding tool_timeout is reported as failed"""
+        generator = generator_factory(tool_timeout=0.1)
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = slow_tool({"A": 0.5, "B": 0.0})
+
+        start = time.perf_counter()
+        answer = generator.generate_response(
+            "Compare A and B", tools=[{"name": "search"}], tool_manager=tool_manager
+        )
+
+        assert time.perf_counter() - start < 0.4
+        assert answer == "Answer"
+        results = tool_results(generator.client.messages.create)
+        assert results[0]["is_error"] is True
+        assert "timed out" in results[0]["content"]
+        assert results[1]["content"] == "result B"
+        # A failed round ends tool use
+        final_call = generator.client.messages.create.call_args_list[1]
+        assert "tools" not in final_call.kwargs
+
+    @pytest.mark.parametrize("use_async", [False, True])
+    def test_timed_out_call_leaves_context_alone(self, generator_factory, use_async):
+        """Test that a lone timed-out call adds no late sources and is an error"""
+        generator = generator_factory(tool_timeout=0.05)
+        responses = [
+            MockResponse(
+                content=[
+                    MockToolUseBlock(
+                        name="search_course_content", id="tool_a", input={"query": "A"}
+                    )
+                ],
+                stop_reason="tool_use",
+            ),
+            final_answer(),
+        ]
+        generator.client.messages.create.side_effect = responses
+        generator.async_client.messages.create = AsyncMock(side_effect=responses)
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = slow_tool({"A": 0.2})
+        context = QueryContext()
+        kwargs = dict(
+            tools=[{"name": "search"}], tool_manager=tool_manager, context=context
+        )
+
+        if use_async:
+            answer = asyncio.run(generator.agenerate_response("About A", **kwargs))
+        else:
+            answer = generator.generate_response("About A", **kwargs)
+        time.sleep(0.3)  # The abandoned call finishes meanwhile
+
+        assert answer == "Answer"
+        assert context.sources == []
+        assert len(context.tool_calls) == 1
+        assert context.tool_calls[0].name == "search_course_content"
+        assert "timed out" in context.tool_calls[0].error
+
+    def test_failure_keeps_other_results(self, generator_factory):
+        """Test that every tool_use gets a tool_result when one call fails"""
+        generator = generator_factory()
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = lambda name, query: (
+            "result B" if query == "B" else 1 / 0
+        )
+
+        generator.generate_response(
+            "Compare A and B", tools=[{"name": "search"}], tool_manager=tool_manager
+        )
+
+        results = tool_results(generator.client.messages.create)
+        assert results[0]["is_error"] is True
+        assert results[1] == {
+            "type": "tool_result",
+            "tool_use_id": "tool_b",
+            "content": "result B",
+        }
+
+    def test_async_round_runs_tools_concurrently(self, generator_factory):
+        """Test that the async path overlaps tool calls and keeps their order"""
+        generator = generator_factory(tool_timeout=0.5)
+        generator.async_client.messages.create = AsyncMock(
+            side_effect=[two_searches(), final_answer()]
+        )
+        tool_manager = Mock()
+        tool_manager.execute_tool.side_effect = slow_tool({"A": 0.3, "B": 0.3})
+
+        start = time.perf_counter()
+        answer = asyncio.run(
+            generator.agenerate_response(
+                "Compare A and B",
+                tools=[{"name": "search"}],
+                tool_manager=tool_manager,
+            )
+        )
+
+        assert answer == "Answer"
+        assert time.perf_counter() - start < 0.5
+        results = tool_results(generator.async_client.messages.create)
+        assert [r["content"] for r in results] == ["result A", "result B"]
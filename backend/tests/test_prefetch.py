@@ -0,0 +1,156 @@
+"""
+Tests for speculative search prefetch
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prefetch import PrefetchStats, SearchPrefetch, query_overlap
+from query_context import QueryContext
+from vector_store import SearchResults
+
+RESULTS = SearchResults(
+    ["MCP is a protocol"], [{"course_title": "MCP", "lesson_number": 1}], [0.1]
+)
+
+
+def slow_search(delay, results=RESULTS):
+    def search(query):
+        time.sleep(delay)
+        return results
+
+    return search
+
+
+class TestSearchPrefetch:
+    """Test SearchPrefetch compatibility and timing"""
+
+    @pytest.fixture
+    def executor(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            yield executor
+
+    def test_overlap(self):
+        """Test the word overlap used to decide compatibility"""
+        assert query_overlap("What is MCP?", "what is mcp") == 1.0
+        assert query_overlap("What is MCP", "MCP definition") == 0.25
+        assert query_overlap("", "MCP") == 0.0
+
+    def test_compatible_search_served(self, executor):
+        """Test that a matching unfiltered search gets the prefetched results"""
+        prefetch = SearchPrefetch("What is MCP?", slow_search(0.05), executor)
+        time.sleep(0.1)
+
+        assert prefetch.take("what is MCP") is RESULTS
+        assert prefetch.hits == 1
+        # Finished before it was needed: the whole search was saved
+        assert prefetch.saved_seconds == pytest.approx(0.05, abs=0.03)
+
+    def test_waits_for_running_prefetch(self, executor):
+        """Test that a take() during the search waits and saves only the head start"""
+        prefetch = SearchPrefetch("What is MCP?", slow_search(0.2), executor)
+        time.sleep(0.1)
+
+        assert prefetch.take("What is MCP") is RESULTS
+        assert 0.05 < prefetch.saved_seconds < 0.15
+
+    @pytest.mark.parametrize(
+        "query, course_name, lesson_number",
+        [
+            ("How do servers expose tools", None, None),
+            ("What is MCP?", "MCP", None),
+            ("What is MCP?", None, 0),
+        ],
+    )
+    def test_incompatible_search_misses(
+        self, executor, query, course_name, lesson_number
+    ):
+        """Test that a different or filtered search is not served"""
+        prefetch = SearchPrefetch("What is MCP?", slow_search(0), executor)
+
+        assert prefetch.take(query, course_name, lesson_number) is None
+        assert (prefetch.hits, prefetch.misses) == (0, 1)
+
+    def test_failed_prefetch_falls_back(self, executor):
+        """Test that a prefetch error makes the tool search on its own"""
+        prefetch = SearchPrefetch("What is MCP?", Mock(side_effect=OSError), executor)
+
+        assert prefetch.take("What is MCP?") is None
+        assert prefetch.misses == 1
+
+    def test_forked_context_shares_prefetch(self, executor):
+        """Test that parallel tool calls all see the query's prefetch"""
+        context = QueryContext()
+        context.prefetch = SearchPrefetch("What is MCP?", slow_search(0), executor)
+
+        assert context.fork().prefetch is context.prefetch
+
+    def test_stats(self, executor):
+        """Test that stats classify prefetches by outcome"""
+        stats = PrefetchStats()
+        for take in ("What is MCP?", "Something else", None):
+            prefetch = SearchPrefetch("What is MCP?", slow_search(0), executor)
+            if take:
+                prefetch.take(take)
+            stats.record(prefetch)
+
+        result = stats.stats()
+        assert (result["hits"], result["misses"], result["unused"]) == (1, 1, 1)
+        assert result["hit_rate"] == pytest.approx(1 / 3)
+
+
+class TestRAGSystemPrefetch:
+    """Test prefetch wiring in RAGSystem.query"""
+
+    @pytest.fixture
+    def rag_system(self, mock_config, create_text_response, create_tool_use_response):
+        from rag_system import RAGSystem
+
+        mock_config.SEARCH_PREFETCH = True
+        mock_config.QUERY_ROUTER = False
+        with (
+            patch("anthropic.Anthropic"),
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction"
+            ),
+        ):
+            rag = RAGSystem(mock_config)
+        rag.vector_store.search = Mock(return_value=RESULTS)
+        rag.vector_store.get_lesson_link = Mock(return_value=None)
+        rag.ai_generator.client.messages.create = Mock(
+            side_effect=[
+                create_tool_use_response(
+                    "search_course_content", "tool_1", {"query": "what is MCP"}
+                ),
+                create_text_response("MCP is a protocol"),
+            ]
+        )
+        return rag
+
+    def test_tool_search_served_from_prefetch(self, rag_system):
+        """Test that the model's matching search does not search again"""
+        answer, sources = rag_system.query("What is MCP?")
+
+        assert answer == "MCP is a protocol"
+        assert sources == [{"text": "MCP - Lesson 1", "link": None}]
+        rag_system.vector_store.search.assert_called_once_with("What is MCP?")
+        assert rag_system.prefetch_stats.stats()["hits"] == 1
+
+    def test_disabled_by_default(self, mock_rag_system):
+        """Test that no prefetch is started unless configured"""
+        mock_rag_system.vector_store.search = Mock(return_value=RESULTS)
+        mock_rag_system.ai_generator.generate_response = Mock(return_value="Hi")
+
+        mock_rag_system.query("What is MCP?")
+
+        mock_rag_system.vector_store.search.assert_not_called()
+        assert mock_rag_system.prefetch_stats.stats()["issued"] == 0
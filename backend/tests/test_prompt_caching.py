@@ -0,0 +1,167 @@
+"""
+Tests for prompt caching breakpoints and per-query token usage
+"""
+
+import asyncio
+import os
+import sys
+from dataclasses import dataclass
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_generator import CACHE_CONTROL, AIGenerator
+from query_context import QueryContext
+
+
+@dataclass
+class MockTextBlock:
+    type: str = "text"
+    text: str = ""
+
+
+@dataclass
+class MockToolUseBlock:
+    type: str = "tool_use"
+    name: str = ""
+    id: str = ""
+    input: dict = None
+
+
+@dataclass
+class MockUsage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+
+@dataclass
+class MockResponse:
+    content: list
+    stop_reason: str
+    usage: MockUsage = None
+
+
+TOOLS = [
+    {"name": "search_course_content", "input_schema": {}},
+    {"name": "get_course_outline", "input_schema": {}},
+]
+
+
+def tool_turn(usage: MockUsage) -> MockResponse:
+    block = MockToolUseBlock(name="search_course_content", id="t1", input={})
+    return MockResponse([block], "tool_use", usage)
+
+
+def answer_turn(usage: MockUsage) -> MockResponse:
+    return MockResponse([MockTextBlock(text="Answer")], "end_turn", usage)
+
+
+class TestPromptCaching:
+    """Test cache breakpoints in AIGenerator request parameters"""
+
+    @pytest.fixture
+    def generator(self):
+        with patch("anthropic.Anthropic"), patch("anthropic.AsyncAnthropic"):
+            generator = AIGenerator("test-key", "claude-test", prompt_caching=True)
+        return generator
+
+    def test_static_prompt_is_cached_before_history(self, generator):
+        """Test that history follows the cached system block, uncached"""
+        params = generator._build_params("Question", "User: Hi\nAssistant: Hello", [])
+
+        static, *history = params["system"]
+        assert static == {
+            "type": "text",
+            "text": AIGenerator.SYSTEM_PROMPT,
+            "cache_control": CACHE_CONTROL,
+        }
+        assert all("cache_control" not in block for block in history)
+        assert history[-1]["text"] == "User: Hi\nAssistant: Hello"
+
+    def test_prefix_is_identical_across_sessions(self, generator):
+        """Test that the cached block does not depend on the conversation"""
+        first = generator._build_params("Q1", None, TOOLS)
+        second = generator._build_params("Q2", "User: earlier", TOOLS)
+
+        assert len(first["system"]) == 1
+        assert first["system"][0] == second["system"][0]
+        assert first["tools"] == second["tools"]
+
+    def test_last_tool_is_marked_without_mutating_definitions(self, generator):
+        """Test that only the last tool carries the breakpoint, on a copy"""
+        params = generator._build_params("Question", None, TOOLS)
+
+        assert params["tools"][0] is TOOLS[0]
+        assert params["tools"][-1] == {**TOOLS[-1], "cache_control": CACHE_CONTROL}
+        assert all("cache_control" not in tool for tool in TOOLS)
+
+    def test_disabled_by_default(self):
+        """Test that no breakpoints are sent unless enabled"""
+        with patch("anthropic.Anthropic"), patch("anthropic.AsyncAnthropic"):
+            generator = AIGenerator("test-key", "claude-test")
+
+        params = generator._build_params("Question", "User: Hi", TOOLS)
+
+        assert all("cache_control" not in block for block in params["system"])
+        assert params["tools"] is TOOLS
+
+
+class TestUsageRecording:
+    """Test token usage accumulated on the QueryContext"""
+
+    @pytest.fixture
+    def generator(self):
+        with patch("anthropic.Anthropic"), patch("anthropic.AsyncAnthropic"):
+            generator = AIGenerator("test-key", "claude-test", prompt_caching=True)
+        return generator
+
+    def test_usage_summed_across_rounds(self, generator):
+        """Test that every API call of a tool round adds its cache counters"""
+        generator.client.messages.create = Mock(
+            side_effect=[
+                tool_turn(MockUsage(10, 5, cache_creation_input_tokens=1200)),
+                answer_turn(MockUsage(40, 20, cache_read_input_tokens=1200)),
+            ]
+        )
+        tool_manager = Mock()
+        tool_manager.execute_tool.return_value = "results"
+        context = QueryContext()
+
+        generator.generate_response(
+            "Question", tools=TOOLS, tool_manager=tool_manager, context=context
+        )
+
+        assert context.api_calls == 2
+        assert context.usage == {
+            "input_tokens": 50,
+            "output_tokens": 25,
+            "cache_creation_input_tokens": 1200,
+            "cache_read_input_tokens": 1200,
+        }
+
+    def test_async_path_records_usage(self, generator):
+        """Test that agenerate_response records usage like the sync path"""
+        generator.async_client.messages.create = AsyncMock(
+            return_value=answer_turn(MockUsage(7, 3, cache_read_input_tokens=900))
+        )
+        context = QueryContext()
+
+        asyncio.run(generator.agenerate_response("Question", context=context))
+
+        assert context.api_calls == 1
+        assert context.usage["cache_read_input_tokens"] == 900
+
+    def test_missing_usage_only_counts_call(self, generator):
+        """Test that a response without usage is counted but adds no tokens"""
+        generator.client.messages.create = Mock(return_value=answer_turn(None))
+        context = QueryContext()
+
+        generator.generate_response("Question", context=context)
+
+        assert context.api_calls == 1
+        assert context.usage == {}
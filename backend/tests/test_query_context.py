@@ -0,0 +1,129 @@
+"""
+Tests for request-scoped source tracking with QueryContext
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from query_context import QueryContext
+from search_tools import CourseOutlineTool, CourseSearchTool, ToolManager
+from vector_store import SearchResults
+
+
+def results_for(course_title: str) -> SearchResults:
+    return SearchResults(
+        documents=[f"{course_title} content"],
+        metadata=[{"course_title": course_title, "lesson_number": 1}],
+        distances=[0.1],
+    )
+
+
+class TestQueryContext:
+    """Test suite for QueryContext and ToolManager.execute_tool"""
+
+    @pytest.fixture
+    def store(self):
+        store = Mock()
+        store.search.side_effect = lambda query, **kwargs: results_for(query)
+        store.get_lesson_link.return_value = None
+        store.get_course_outline.return_value = {
+            "course_title": "Outline Course",
+            "course_link": "https://example.com/course",
+            "lessons": [],
+        }
+        return store
+
+    @pytest.fixture
+    def manager(self, store):
+        manager = ToolManager()
+        manager.register_tool(CourseSearchTool(store))
+        manager.register_tool(CourseOutlineTool(store))
+        return manager
+
+    def test_sources_go_to_context_not_tool(self, manager):
+        """Test that calls with a context leave the shared tool untouched"""
+        context = QueryContext()
+
+        manager.execute_tool("search_course_content", context=context, query="A")
+
+        assert context.sources == [{"text": "A - Lesson 1", "link": None}]
+        assert manager.get_last_sources() == []
+
+    def test_contexts_are_isolated(self, manager):
+        """Test that two queries sharing tools keep their own sources"""
+        first, second = QueryContext(), QueryContext()
+
+        manager.execute_tool("search_course_content", context=first, query="A")
+        manager.execute_tool("search_course_content", context=second, query="B")
+
+        assert [s["text"] for s in first.sources] == ["A - Lesson 1"]
+        assert [s["text"] for s in second.sources] == ["B - Lesson 1"]
+
+    def test_sources_accumulate_across_tools(self, manager):
+        """Test that every tool call in a query contributes its sources once"""
+        context = QueryContext()
+
+        manager.execute_tool("get_course_outline", context=context, course_name="X")
+        manager.execute_tool("search_course_content", context=context, query="A")
+        manager.execute_tool("search_course_content", context=context, query="A")
+
+        assert [s["text"] for s in context.sources] == [
+            "View Course: Outline Course",
+            "A - Lesson 1",
+        ]
+
+    def test_tool_calls_are_recorded(self, manager, store):
+        """Test that calls, including failures, are recorded with timings"""
+        context = QueryContext()
+        manager.execute_tool("search_course_content", context=context, query="A")
+        store.search.side_effect = RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            manager.execute_tool("search_course_content", context=context, query="B")
+
+        assert [call.arguments for call in context.tool_calls] == [
+            {"query": "A"},
+            {"query": "B"},
+        ]
+        assert context.tool_calls[1].error == "db down"
+        assert context.tool_seconds >= 0
+
+    def test_concurrent_queries_keep_their_sources(
+        self, mock_rag_system, create_text_response, create_tool_use_response
+    ):
+        """Test that interleaved async queries each get their own sources"""
+        generator = mock_rag_system.ai_generator
+        mock_rag_system.vector_store.search = Mock(
+            side_effect=lambda query, **kwargs: results_for(query)
+        )
+        mock_rag_system.vector_store.get_lesson_link = Mock(return_value=None)
+
+        async def create(**params):
+            await asyncio.sleep(0.01)
+            if len(params["messages"]) == 1:
+                # Ask to search for the course named in the question
+                course = params["messages"][0]["content"].split()[-1]
+                return create_tool_use_response(
+                    "search_course_content", "tool_1", {"query": course}
+                )
+            return create_text_response("done")
+
+        generator.async_client = Mock()
+        generator.async_client.messages.create = create
+
+        async def run():
+            return await asyncio.gather(
+                *(mock_rag_system.aquery(f"Tell me about C{i}") for i in range(10))
+            )
+
+        results = asyncio.run(run())
+
+        for i, (_, sources) in enumerate(results):
+            assert sources == [{"text": f"C{i} - Lesson 1", "link": None}]
@@ -0,0 +1,178 @@
+"""
+Tests for the outline query router and its RAGSystem fast path
+"""
+
+import asyncio
+import json
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_index import CatalogIndex
+from course_resolver import CourseNameResolver
+from query_router import GENERAL, OUTLINE, QueryRouter
+
+MCP = "MCP: Build Rich-Context AI Apps with Anthropic"
+CHROMA = "Advanced Retrieval for AI with Chroma"
+COMPUTER_USE = "Building Towards Computer Use with Anthropic"
+
+CATALOG = [
+    {
+        "title": MCP,
+        "course_link": "https://example.com/mcp",
+        "instructor": "Elie Schoppik",
+        "lessons_json": json.dumps(
+            [
+                {
+                    "lesson_number": 0,
+                    "lesson_title": "Introduction",
+                    "lesson_link": "https://example.com/mcp/0",
+                },
+                {
+                    "lesson_number": 1,
+                    "lesson_title": "Why MCP",
+                    "lesson_link": "https://example.com/mcp/1",
+                },
+            ]
+        ),
+    },
+    {"title": CHROMA, "lessons_json": "[]"},
+    {"title": COMPUTER_USE, "lessons_json": "[]"},
+]
+
+
+class TestQueryRouter:
+    """Test QueryRouter classification"""
+
+    @pytest.fixture
+    def semantic_match(self):
+        return Mock(return_value=MCP)
+
+    @pytest.fixture
+    def router(self, semantic_match):
+        catalog = CatalogIndex(lambda: CATALOG)
+        return QueryRouter(CourseNameResolver(catalog, semantic_match))
+
+    @pytest.mark.parametrize(
+        "query, title",
+        [
+            ("What lessons are in the MCP course?", MCP),
+            ("Show me the outline of the Chroma course", CHROMA),
+            ("which lessons does computer use have", COMPUTER_USE),
+            ("MCP course outline", MCP),
+            ("What are the lessons in advanced retrieval?", CHROMA),
+        ],
+    )
+    def test_structure_questions_routed(self, router, query, title):
+        """Test that outline questions about a known course take the fast path"""
+        decision = router.classify(query)
+
+        assert decision.route == OUTLINE
+        assert decision.course_title == title
+
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "What is MCP?",
+            "What is covered in lesson 1 of the MCP course?",
+            "what lessons in MCP cover tool use",
+            "How do I write a course outline?",
+            "Explain the outline of a good prompt",
+        ],
+    )
+    def test_content_questions_not_routed(self, router, query):
+        """Test that anything but a plain structure question goes to the LLM"""
+        assert router.classify(query).route == GENERAL
+
+    def test_ambiguous_course_not_routed(self, router):
+        """Test that a name matching several courses is left to the LLM"""
+        assert router.classify("What lessons are in the Anthropic course?").route == (
+            GENERAL
+        )
+
+    def test_semantic_fallback_not_used(self, router, semantic_match):
+        """Test that an unknown course is not routed via the embedding search"""
+        decision = router.classify("Show me the outline of the RAG course")
+
+        assert decision.route == GENERAL
+        semantic_match.assert_not_called()
+
+    def test_route_counts_decisions(self, router):
+        """Test that route() tallies routes and matching patterns"""
+        router.route("What lessons are in the MCP course?")
+        router.route("What is MCP?")
+
+        stats = router.stats()
+        assert stats["routes"] == {OUTLINE: 1, GENERAL: 1}
+        assert stats["patterns"]["which_lessons"] == 1
+
+
+class TestRAGSystemOutlineFastPath:
+    """Test that routed queries skip the LLM"""
+
+    @pytest.fixture
+    def rag_system(self, mock_config):
+        from rag_system import RAGSystem
+
+        with (
+            patch("anthropic.Anthropic"),
+            patch("anthropic.AsyncAnthropic"),
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction"
+            ),
+        ):
+            rag = RAGSystem(mock_config)
+        rag.vector_store.catalog_index = CatalogIndex(lambda: CATALOG)
+        rag.vector_store.course_resolver.catalog_index = rag.vector_store.catalog_index
+        rag.ai_generator.generate_response = Mock(return_value="LLM answer")
+        return rag
+
+    def test_outline_answered_without_llm(self, rag_system):
+        """Test that an outline question returns the outline and its links"""
+        answer, sources = rag_system.query("What lessons are in the MCP course?")
+
+        rag_system.ai_generator.generate_response.assert_not_called()
+        assert f"Course: {MCP}" in answer
+        assert "Lesson 1: Why MCP" in answer
+        assert {"text": "Lesson 1: Why MCP", "link": "https://example.com/mcp/1"} in (
+            sources
+        )
+
+    def test_other_questions_use_llm(self, rag_system):
+        """Test that content questions still go through generate_response"""
+        answer, _ = rag_system.query("What is MCP?")
+
+        assert answer == "LLM answer"
+        rag_system.ai_generator.generate_response.assert_called_once()
+
+    def test_routed_exchange_recorded(self, rag_system):
+        """Test that a fast-path answer is added to the session history"""
+        session_id = rag_system.session_manager.create_session()
+
+        asyncio.run(rag_system.aquery("MCP course outline", session_id))
+
+        history = rag_system.session_manager.get_conversation_history(session_id)
+        assert "MCP course outline" in history
+        assert f"Course: {MCP}" in history
+
+    def test_router_can_be_disabled(self, mock_config):
+        """Test that QUERY_ROUTER = False sends everything to the LLM"""
+        from rag_system import RAGSystem
+
+        mock_config.QUERY_ROUTER = False
+        with (
+            patch("anthropic.Anthropic"),
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction"
+            ),
+        ):
+            rag = RAGSystem(mock_config)
+
+        assert rag.query_router is None
@@ -193,7 +193,10 @@ class TestRAGSystemIntegration:
         second_call_args = (
             rag_system.ai_generator.client.messages.create.call_args_list[1]
         )
-        system_prompt = second_call_args[1]["system"]
+        # The system prompt and history are sent as a list of text blocks
+        system_prompt = "\n".join(
+            block["text"] for block in second_call_args[1]["system"]
+        )
 
         # History should contain the first exchange
         assert "First question" in system_prompt
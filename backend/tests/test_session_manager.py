@@ -0,0 +1,140 @@
+"""
+Tests for the bounded session store
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_manager import Message, SessionManager, format_history, format_message
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSessionManager:
+    """Test SessionManager history, eviction and expiry"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def manager(self, clock):
+        return SessionManager(
+            max_history=2, max_sessions=2, session_ttl=60, clock=clock
+        )
+
+    def test_history_keeps_last_exchanges(self, manager):
+        """Test that only the last max_history exchanges are kept"""
+        session_id = manager.create_session()
+        for i in range(3):
+            manager.add_exchange(session_id, f"Q{i}", f"A{i}")
+
+        history = manager.get_conversation_history(session_id)
+
+        assert history == "User: Q1\nAssistant: A1\nUser: Q2\nAssistant: A2"
+
+    @pytest.mark.parametrize("max_history", [1, 2, 3])
+    def test_cached_history_matches_full_format(self, clock, max_history):
+        """Test that the cached history equals a fresh formatting after trims"""
+        manager = SessionManager(max_history=max_history, clock=clock)
+        session_id = manager.create_session()
+        for i in range(7):
+            manager.add_message(session_id, "user", f"Question {i} " * i)
+            manager.add_message(session_id, "assistant", f"Answer é{i}\nmore")
+
+            messages = manager.sessions[session_id].messages
+            assert manager.get_conversation_history(session_id) == format_history(
+                messages
+            )
+
+    def test_exchange_formats_only_its_own_lines(self, clock):
+        """Test that adding an exchange never reformats the earlier history"""
+        manager = SessionManager(max_history=10, clock=clock)
+        session_id = manager.create_session()
+        for i in range(30):
+            with patch(
+                "session_manager.format_message", side_effect=format_message
+            ) as formatter:
+                manager.add_exchange(session_id, f"Question {i}", f"Answer {i}")
+            # Two new lines, whether the history is filling up or trimmed
+            assert formatter.call_count == 2
+
+        with patch("session_manager.format_message") as formatter:
+            history = manager.get_conversation_history(session_id)
+        formatter.assert_not_called()
+        messages = manager.sessions[session_id].messages
+        assert history == format_history(messages)
+        assert history.startswith("User: Question 20\n")
+
+    def test_unknown_session_created_on_write(self, manager):
+        """Test that add_message still works for a session it never issued"""
+        manager.add_message("external", "user", "Hello")
+
+        assert manager.get_conversation_history("external") == "User: Hello"
+
+    def test_least_recently_used_evicted(self, manager):
+        """Test that a new session beyond max_sessions evicts the idlest one"""
+        first = manager.create_session()
+        second = manager.create_session()
+        manager.add_message(first, "user", "still here")
+        third = manager.create_session()
+
+        assert second not in manager.sessions
+        assert set(manager.sessions) == {first, third}
+        assert manager.stats()["evicted"] == 1
+
+    def test_idle_sessions_expire(self, manager, clock):
+        """Test that a session idle longer than the TTL is dropped"""
+        session_id = manager.create_session()
+        manager.add_message(session_id, "user", "Hello")
+        clock.now = 61
+
+        assert manager.get_conversation_history(session_id) is None
+        assert manager.stats()["expired"] == 1
+
+    def test_access_extends_ttl(self, manager, clock):
+        """Test that reading a session keeps it alive"""
+        session_id = manager.create_session()
+        manager.add_message(session_id, "user", "Hello")
+        clock.now = 40
+        manager.get_conversation_history(session_id)
+        clock.now = 80
+
+        assert manager.get_conversation_history(session_id) == "User: Hello"
+
+    def test_clear_session_keeps_session(self, manager):
+        """Test that clearing empties history without dropping the session"""
+        session_id = manager.create_session()
+        manager.add_message(session_id, "user", "Hello")
+
+        manager.clear_session(session_id)
+
+        assert manager.get_conversation_history(session_id) is None
+        assert session_id in manager.sessions
+
+    def test_stats_report_memory(self, manager):
+        """Test that stats count messages and grow with their content"""
+        session_id = manager.create_session()
+        empty = manager.stats()["approx_bytes"]
+        manager.add_exchange(session_id, "Q" * 1000, "A" * 1000)
+
+        stats = manager.stats()
+        assert stats["sessions"] == 1
+        assert stats["messages"] == 2
+        assert stats["approx_bytes"] >= empty + 2000
+
+    def test_messages_have_no_instance_dict(self):
+        """Test that messages use __slots__"""
+        assert not hasattr(Message("user", "Hello"), "__dict__")
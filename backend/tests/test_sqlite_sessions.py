@@ -0,0 +1,171 @@
+"""
+Tests for the SQLite session backend
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+from unittest.mock import patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_manager import SessionManager
+from sqlite_sessions import SQLiteSessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSQLiteSessionStore:
+    """Test SQLiteSessionStore history, sharing and expiry"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "sessions.db")
+
+    @pytest.fixture
+    def store(self, db_path, clock):
+        store = SQLiteSessionStore(
+            db_path, max_history=2, session_ttl=60, purge_every=2, clock=clock
+        )
+        yield store
+        store.close()
+
+    def test_history_round_trip(self, store):
+        """Test that exchanges come back in order, trimmed to max_history"""
+        session_id = store.create_session()
+        for i in range(3):
+            store.add_exchange(session_id, f"Q{i}", f"A{i}")
+
+        assert store.get_conversation_history(session_id) == (
+            "User: Q1\nAssistant: A1\nUser: Q2\nAssistant: A2"
+        )
+        assert store.stats()["messages"] == 4
+
+    def test_history_shared_between_workers(self, store, db_path, clock):
+        """Test that a second store on the same file sees the session"""
+        session_id = store.create_session()
+        store.add_exchange(session_id, "What is MCP?", "A protocol")
+
+        other_worker = SQLiteSessionStore(db_path, max_history=2, clock=clock)
+        try:
+            history = other_worker.get_conversation_history(session_id)
+        finally:
+            other_worker.close()
+
+        assert history == "User: What is MCP?\nAssistant: A protocol"
+
+    def test_wal_mode(self, store, db_path):
+        """Test that the database is switched to write-ahead logging"""
+        store.create_session()
+
+        conn = sqlite3.connect(db_path)
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            conn.close()
+
+    def test_unknown_and_empty_sessions(self, store):
+        """Test that missing or message-less sessions have no history"""
+        session_id = store.create_session()
+
+        assert store.get_conversation_history(session_id) is None
+        assert store.get_conversation_history("session_missing") is None
+        assert store.get_conversation_history(None) is None
+
+    def test_idle_session_expires(self, store, clock):
+        """Test that a session idle past the TTL is gone and later purged"""
+        session_id = store.create_session()
+        store.add_message(session_id, "user", "Hello")
+        clock.now += 61
+
+        assert store.get_conversation_history(session_id) is None
+
+        other = store.create_session()
+        store.add_message(other, "user", "Hi")
+        assert store.stats()["expired"] == 1
+        assert store.stats()["sessions"] == 1
+
+    def test_expired_history_not_revived_by_write(self, store, clock):
+        """Test that writing to an expired session starts a fresh history"""
+        session_id = store.create_session()
+        store.add_exchange(session_id, "Old question", "Old answer")
+        clock.now += 61
+        assert store.get_conversation_history(session_id) is None
+
+        store.add_exchange(session_id, "New question", "New answer")
+
+        assert store.get_conversation_history(session_id) == (
+            "User: New question\nAssistant: New answer"
+        )
+        assert store.stats()["messages"] == 2
+        assert store.stats()["expired"] == 1
+
+    def test_clear_session(self, store):
+        """Test that clearing removes the session's messages"""
+        session_id = store.create_session()
+        store.add_message(session_id, "user", "Hello")
+
+        store.clear_session(session_id)
+
+        assert store.get_conversation_history(session_id) is None
+
+    def test_concurrent_writers(self, store):
+        """Test that threads writing different sessions don't interfere"""
+        session_ids = [store.create_session() for _ in range(8)]
+
+        def write(session_id):
+            store.add_exchange(session_id, "Q", session_id)
+
+        threads = [threading.Thread(target=write, args=(s,)) for s in session_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for session_id in session_ids:
+            assert store.get_conversation_history(session_id).endswith(session_id)
+
+
+class TestSessionIds:
+    """Test that session IDs do not collide across stores"""
+
+    def test_ids_unique_across_managers(self):
+        """Test that two workers never hand out the same ID"""
+        first, second = SessionManager(), SessionManager()
+
+        ids = {first.create_session() for _ in range(100)}
+        ids |= {second.create_session() for _ in range(100)}
+
+        assert len(ids) == 200
+
+    def test_backend_selected_by_config(self, mock_config, tmp_path):
+        """Test that SESSION_BACKEND = "sqlite" gives RAGSystem a SQLite store"""
+        from rag_system import RAGSystem
+
+        mock_config.SESSION_BACKEND = "sqlite"
+        mock_config.SESSION_DB_PATH = str(tmp_path / "sessions.db")
+        with (
+            patch("anthropic.Anthropic"),
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction"
+            ),
+        ):
+            rag = RAGSystem(mock_config)
+
+        assert isinstance(rag.session_manager, SQLiteSessionStore)
+        rag.session_manager.close()
@@ -0,0 +1,246 @@
+"""
+Tests for VectorStore write, query and catalog paths
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Course, CourseChunk, Lesson
+from vector_store import ContentWriteStats, VectorStore
+
+
+def make_chunks(count: int, title: str = "Test Course"):
+    return [
+        CourseChunk(
+            content=f"chunk {i}", course_title=title, lesson_number=1, chunk_index=i
+        )
+        for i in range(count)
+    ]
+
+
+class TestVectorStoreWrites:
+    """Test batched, pipelined content writes"""
+
+    @pytest.fixture
+    def embedding_function(self):
+        return Mock(side_effect=lambda docs: [[0.1, 0.2, 0.3] for _ in docs])
+
+    @pytest.fixture
+    def store_factory(self, embedding_function):
+        def _create(**kwargs):
+            with (
+                patch("chromadb.PersistentClient") as client_class,
+                patch(
+                    "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction",
+                    return_value=embedding_function,
+                ),
+            ):
+                client = MagicMock()
+                client.get_max_batch_size.return_value = 5000
+                client_class.return_value = client
+                return VectorStore("./test_chroma_db", "test-model", **kwargs)
+
+        return _create
+
+    def test_writes_are_split_into_batches(self, store_factory, embedding_function):
+        """Test that writes and embedding calls respect their batch sizes"""
+        store = store_factory(embedding_batch_size=4, write_batch_size=10)
+
+        stats = store.add_course_content(make_chunks(25))
+
+        add_calls = store.course_content.add.call_args_list
+        assert [len(c.kwargs["ids"]) for c in add_calls] == [10, 10, 5]
+        assert all(len(c.args[0]) <= 4 for c in embedding_function.call_args_list)
+        assert all(
+            len(c.kwargs["embeddings"]) == len(c.kwargs["ids"]) for c in add_calls
+        )
+        assert stats.chunks == 25
+        assert stats.batches == 3
+        assert stats.chunks_per_second > 0
+
+    def test_chunk_ids_are_deterministic(self, store_factory):
+        """Test that chunk IDs are derived from course title and chunk index"""
+        store = store_factory(write_batch_size=2)
+
+        store.add_course_content(make_chunks(3, title="My Course"))
+
+        ids = [
+            i for c in store.course_content.add.call_args_list for i in c.kwargs["ids"]
+        ]
+        assert ids == ["My_Course_0", "My_Course_1", "My_Course_2"]
+
+    def test_write_batch_size_capped_by_chroma(self, store_factory):
+        """Test that Chroma's maximum batch size caps the configured size"""
+        store = store_factory(write_batch_size=100000)
+        assert store.write_batch_size == 5000
+
+    def test_deferred_write_completes_on_flush(self, store_factory):
+        """Test that wait=False queues the last batch until flush()"""
+        store = store_factory(write_batch_size=10)
+        stats = ContentWriteStats()
+
+        store.add_course_content(make_chunks(3), wait=False, stats=stats)
+        store.flush()
+
+        assert stats.chunks == 3
+        store.course_content.add.assert_called_once()
+
+    def test_write_error_surfaces_on_flush(self, store_factory):
+        """Test that a failed background write is re-raised"""
+        store = store_factory()
+        store.course_content.add.side_effect = RuntimeError("disk full")
+
+        store.add_course_content(make_chunks(2), wait=False)
+
+        with pytest.raises(RuntimeError, match="disk full"):
+            store.flush()
+
+    def test_embedding_cache_skips_known_chunks(
+        self, store_factory, embedding_function, tmp_path
+    ):
+        """Test that cached chunk texts are not embedded again"""
+        cache_path = str(tmp_path / "embedding_cache")
+        store = store_factory(embedding_cache_path=cache_path)
+        store.add_course_content(make_chunks(3))
+        assert embedding_function.call_count == 1
+
+        # A rebuild with one new chunk only embeds that chunk
+        embedding_function.reset_mock()
+        rebuilt = store_factory(embedding_cache_path=cache_path)
+        stats = rebuilt.add_course_content(make_chunks(4))
+
+        embedding_function.assert_called_once_with(["chunk 3"])
+        assert stats.cache_hits == 3
+        embeddings = rebuilt.course_content.add.call_args.kwargs["embeddings"]
+        assert len(embeddings) == 4
+
+    def test_empty_input_writes_nothing(self, store_factory):
+        """Test that no chunks means no Chroma calls"""
+        store = store_factory()
+        stats = store.add_course_content([])
+        assert stats.chunks == 0
+        store.course_content.add.assert_not_called()
+
+
+class TestVectorStoreQueries:
+    """Test that queries use cached embeddings"""
+
+    @pytest.fixture
+    def store(self):
+        embedding_function = Mock(side_effect=lambda docs: [[0.5, 0.5] for _ in docs])
+        with (
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction",
+                return_value=embedding_function,
+            ),
+        ):
+            store = VectorStore("./test_chroma_db", "test-model")
+        store.course_content.query.return_value = {
+            "documents": [["doc"]],
+            "metadatas": [[{"course_title": "Course"}]],
+            "distances": [[0.1]],
+        }
+        return store
+
+    def test_search_passes_query_embeddings(self, store):
+        """Test that search sends embeddings rather than raw query text"""
+        store.search("what is MCP")
+
+        kwargs = store.course_content.query.call_args.kwargs
+        assert kwargs["query_embeddings"] == [[0.5, 0.5]]
+        assert "query_texts" not in kwargs
+
+    def test_repeated_queries_embed_once(self, store):
+        """Test that repeated searches reuse the cached query embedding"""
+        store.search("what is MCP")
+        store.search("what is MCP")
+
+        assert store.embedding_function.call_count == 1
+        assert store.query_cache.stats()["hits"] == 1
+
+
+class TestVectorStoreCatalog:
+    """Test that catalog lookups are served from the in-memory index"""
+
+    @pytest.fixture
+    def store(self):
+        with (
+            patch("chromadb.PersistentClient"),
+            patch(
+                "chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction"
+            ),
+        ):
+            store = VectorStore("./test_chroma_db", "test-model")
+        store.course_catalog.get.return_value = {
+            "ids": ["Existing"],
+            "metadatas": [
+                {
+                    "title": "Existing",
+                    "course_link": "https://example.com/existing",
+                    "lessons_json": '[{"lesson_number": 1, "lesson_link": "l1"}]',
+                    "lesson_count": 1,
+                }
+            ],
+        }
+        return store
+
+    def test_catalog_read_once(self, store):
+        """Test that repeated catalog lookups hit Chroma only once"""
+        for _ in range(3):
+            assert store.get_existing_course_titles() == ["Existing"]
+            assert store.get_course_count() == 1
+            assert store.get_course_link("Existing") == "https://example.com/existing"
+            assert store.get_lesson_link("Existing", 1) == "l1"
+
+        store.course_catalog.get.assert_called_once_with()
+
+    def test_writes_keep_index_in_sync(self, store):
+        """Test that added, deleted and cleared courses are reflected"""
+        course = Course(
+            title="New",
+            course_link="https://example.com/new",
+            instructor=None,
+            lessons=[Lesson(lesson_number=0, title="Intro", lesson_link="l0")],
+        )
+
+        store.add_course_metadata(course)
+        assert store.get_course_count() == 2
+        assert store.get_lesson_link("New", 0) == "l0"
+        assert "instructor" not in store.get_all_courses_metadata()[1]
+
+        store.delete_course("Existing")
+        assert store.get_existing_course_titles() == ["New"]
+
+        store.clear_all_data()
+        assert store.get_course_count() == 0
+        store.course_catalog.get.assert_called_once_with()
+
+    def test_outline_uses_index(self, store):
+        """Test that outlines are built from the index after name resolution"""
+        outline = store.get_course_outline("exist")
+
+        assert outline["course_title"] == "Existing"
+        assert outline["lessons"] == [{"lesson_number": 1, "lesson_link": "l1"}]
+        store.course_catalog.get.assert_called_once_with()
+        store.course_catalog.query.assert_not_called()
+        assert store.course_resolver.stats()["prefix"] == 1
+
+    def test_unmatched_name_uses_embedding_search(self, store):
+        """Test that names the catalog cannot match fall back to Chroma"""
+        store.course_catalog.query.return_value = {
+            "documents": [["Existing"]],
+            "metadatas": [[{"title": "Existing"}]],
+            "distances": [[0.2]],
+        }
+
+        results = store.search("anything", course_name="something else")
+
+        assert results.error is None
+        assert store.course_resolver.stats()["semantic"] == 1
@@ -1,10 +1,18 @@
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 import chromadb
+from catalog_index import CatalogIndex
 from chromadb.config import Settings
+from course_resolver import CourseNameResolver
+from embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from lexical_index import LexicalIndex, reciprocal_rank_fusion
 from models import Course, CourseChunk
-from sentence_transformers import SentenceTransformer
+from numpy_index import NumpyContentIndex
+from onnx_embedding import OnnxEmbeddingFunction
 
 
 @dataclass
@@ -13,7 +21,7 @@ class SearchResults:
 
     documents: List[str]
     metadata: List[Dict[str, Any]]
-    distances: List[float]
+    distances: List[Optional[float]]  # None for keyword-only hybrid matches
     error: Optional[str] = None
 
     @classmethod
@@ -41,37 +49,172 @@ class SearchResults:
         return len(self.documents) == 0
 
 
+@dataclass
+class ContentWriteStats:
+    """Throughput counters for content writes (encoding vs. persisting)"""
+
+    chunks: int = 0
+    batches: int = 0
+    cache_hits: int = 0  # Chunks whose embedding came from the embedding cache
+    encode_seconds: float = 0.0
+    write_seconds: float = 0.0  # Measured on the writer thread
+    wall_seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.chunks} chunks in {self.batches} batches "
+            f"({self.cache_hits} cached embeddings), "
+            f"encode {self.encode_seconds:.2f}s, write {self.write_seconds:.2f}s, "
+            f"{self.wall_seconds:.2f}s wall ({self.chunks_per_second:.1f} chunks/s)"
+        )
+
+
 class VectorStore:
     """Vector storage using ChromaDB for course content and metadata"""
 
-    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5):
+    def __init__(
+        self,
+        chroma_path: str,
+        embedding_model: str,
+        max_results: int = 5,
+        embedding_batch_size: int = 64,
+        write_batch_size: int = 1024,
+        embedding_cache_path: Optional[str] = None,
+        query_cache_size: int = 1024,
+        lexical_index_path: Optional[str] = None,
+        hybrid_candidates: int = 20,
+        rrf_k: int = 60,
+        content_backend: str = "chroma",
+        ivf_lists: int = 0,
+        ivf_probes: int = 8,
+        quantization: str = "none",
+        rerank_factor: int = 4,
+        embedding_backend: str = "sentence-transformers",
+        onnx_file: str = "onnx/model.onnx",
+    ):
         self.max_results = max_results
+        self.embedding_batch_size = max(1, embedding_batch_size)
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(
             path=chroma_path, settings=Settings(anonymized_telemetry=False)
         )
 
-        # Set up sentence transformer embedding function
-        self.embedding_function = (
-            chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=embedding_model
+        # Embed with sentence-transformers (PyTorch) or the same model exported
+        # to ONNX; the ONNX graph gets its own cache, int8 vectors differ a bit
+        if embedding_backend == "onnx":
+            self.embedding_function = OnnxEmbeddingFunction(embedding_model, onnx_file)
+            cache_model = f"{embedding_model}-{onnx_file}"
+        elif embedding_backend == "sentence-transformers":
+            self.embedding_function = (
+                chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction(
+                    model_name=embedding_model
+                )
             )
+            cache_model = embedding_model
+        else:
+            raise ValueError(f"Unknown embedding backend: {embedding_backend!r}")
+        self.embedding_backend = embedding_backend
+
+        # Optional on-disk cache of chunk embeddings, keyed by content hash
+        self.embedding_cache = (
+            EmbeddingCache(embedding_cache_path, cache_model)
+            if embedding_cache_path
+            else None
         )
 
+        # In-memory LRU of query embeddings for search and course resolution
+        self.query_cache = QueryEmbeddingCache(
+            lambda text: self.embedding_function([text])[0], query_cache_size
+        )
+
+        # Course content lives in Chroma or in a NumPy matrix that answers the
+        # same collection calls; the small catalog always stays in Chroma
+        if content_backend not in ("chroma", "numpy"):
+            raise ValueError(f"Unknown vector backend: {content_backend!r}")
+        self.content_backend = content_backend
+        self._numpy_content_path = os.path.join(chroma_path, "numpy_content")
+        self._ivf_lists = ivf_lists
+        self._ivf_probes = ivf_probes
+        self._quantization = quantization
+        self._rerank_factor = rerank_factor
+
         # Create collections for different types of data
         self.course_catalog = self._create_collection(
             "course_catalog"
         )  # Course titles/instructors
-        self.course_content = self._create_collection(
-            "course_content"
-        )  # Actual course material
+        self.course_content = self._create_content_collection()  # Course material
+
+        # Optional BM25 index over the same chunks; search then fuses keyword
+        # and embedding rankings, so exact identifiers are not missed
+        self.lexical_index: Optional[LexicalIndex] = None
+        if lexical_index_path:
+            self.lexical_index = LexicalIndex(lexical_index_path)
+        self._lexical_index_checked = False
+        self.hybrid_candidates = max(1, hybrid_candidates)
+        self.rrf_k = rrf_k
+
+        # Catalog metadata is small and read on every tool call; serve it from
+        # memory, loaded from Chroma once and updated on every catalog write
+        self.catalog_index = CatalogIndex(self._load_catalog_metadata)
+
+        # Exact/case-insensitive/prefix title matching before embedding search
+        self.course_resolver = CourseNameResolver(
+            self.catalog_index, self._semantic_course_match
+        )
+
+        # Never send Chroma more records per call than it accepts
+        self.write_batch_size = max(1, write_batch_size)
+        try:
+            max_batch_size = self.client.get_max_batch_size()
+            if isinstance(max_batch_size, int) and max_batch_size > 0:
+                self.write_batch_size = min(self.write_batch_size, max_batch_size)
+        except Exception as e:
+            print(f"Could not read Chroma max batch size: {e}")
+
+        # Single writer thread: persists batch N while batch N+1 is encoded
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="chroma-writer"
+        )
+        self._pending_write: Optional[Future] = None
 
     def _create_collection(self, name: str):
         """Create or get a ChromaDB collection"""
+        # Chroma records the embedding function with a collection and refuses
+        # a different one later, so ONNX-embedded vectors are always passed in
+        if self.embedding_backend == "onnx":
+            return self.client.get_or_create_collection(
+                name=name, embedding_function=None
+            )
         return self.client.get_or_create_collection(
             name=name, embedding_function=self.embedding_function
         )
 
+    def _create_content_collection(self):
+        """The course_content store for the configured backend"""
+        if self.content_backend == "numpy":
+            return NumpyContentIndex(
+                self._numpy_content_path,
+                self._ivf_lists,
+                self._ivf_probes,
+                self._quantization,
+                self._rerank_factor,
+            )
+        return self._create_collection("course_content")
+
+    def _load_catalog_metadata(self) -> List[Dict[str, Any]]:
+        """Read every course's metadata from the catalog collection"""
+        try:
+            results = self.course_catalog.get()
+            if isinstance(results, dict) and results.get("metadatas"):
+                return results["metadatas"]
+        except Exception as e:
+            print(f"Error loading course catalog: {e}")
+        return []
+
     def search(
         self,
         query: str,
@@ -106,17 +249,101 @@ class VectorStore:
         search_limit = limit if limit is not None else self.max_results
 
         try:
+            if self.lexical_index is not None:
+                return self._hybrid_search(
+                    query, course_title, lesson_number, filter_dict, search_limit
+                )
             results = self.course_content.query(
-                query_texts=[query], n_results=search_limit, where=filter_dict
+                query_embeddings=[self.query_cache.get(query)],
+                n_results=search_limit,
+                where=filter_dict,
             )
             return SearchResults.from_chroma(results)
         except Exception as e:
             return SearchResults.empty(f"Search error: {str(e)}")
 
+    def _hybrid_search(
+        self,
+        query: str,
+        course_title: Optional[str],
+        lesson_number: Optional[int],
+        filter_dict: Optional[Dict],
+        limit: int,
+    ) -> SearchResults:
+        """Fuse embedding and BM25 rankings by reciprocal rank"""
+        self._ensure_lexical_index()
+        candidates = max(limit, self.hybrid_candidates)
+        dense = self.course_content.query(
+            query_embeddings=[self.query_cache.get(query)],
+            n_results=candidates,
+            where=filter_dict,
+        )
+        dense_ids = dense["ids"][0] if dense["ids"] else []
+        lexical_ids = [
+            chunk_id
+            for chunk_id, _ in self.lexical_index.search(
+                query, candidates, course_title, lesson_number
+            )
+        ]
+        fused = reciprocal_rank_fusion([dense_ids, lexical_ids], k=self.rrf_k)[:limit]
+
+        dense_results = SearchResults.from_chroma(dense)
+        found = {
+            chunk_id: (document, metadata, distance)
+            for chunk_id, document, metadata, distance in zip(
+                dense_ids,
+                dense_results.documents,
+                dense_results.metadata,
+                dense_results.distances,
+            )
+        }
+        # Chunks only the keyword ranking found are fetched by ID
+        missing = [chunk_id for chunk_id in fused if chunk_id not in found]
+        if missing:
+            fetched = self.course_content.get(
+                ids=missing, include=["documents", "metadatas"]
+            )
+            for chunk_id, document, metadata in zip(
+                fetched["ids"], fetched["documents"], fetched["metadatas"]
+            ):
+                found[chunk_id] = (document, metadata, None)
+
+        # An ID Chroma no longer has (index out of date) is skipped
+        hits = [found[chunk_id] for chunk_id in fused if chunk_id in found]
+        return SearchResults(
+            documents=[document for document, _, _ in hits],
+            metadata=[metadata for _, metadata, _ in hits],
+            distances=[distance for _, _, distance in hits],
+        )
+
+    def _ensure_lexical_index(self):
+        """Rebuild the BM25 index from Chroma once if it is missing or stale"""
+        if self._lexical_index_checked:
+            return
+        self._lexical_index_checked = True
+        try:
+            if self.course_content.count() == len(self.lexical_index):
+                return
+            print("Rebuilding lexical index from course content")
+            content = self.course_content.get(include=["documents", "metadatas"])
+            self.lexical_index.clear()
+            self.lexical_index.add(
+                content["ids"], content["documents"], content["metadatas"]
+            )
+            self.lexical_index.save()
+        except Exception as e:
+            print(f"Error rebuilding lexical index: {e}")
+
     def _resolve_course_name(self, course_name: str) -> Optional[str]:
+        """Find the catalog title best matching a course name"""
+        return self.course_resolver.resolve(course_name).title
+
+    def _semantic_course_match(self, course_name: str) -> Optional[str]:
         """Use vector search to find best matching course by name"""
         try:
-            results = self.course_catalog.query(query_texts=[course_name], n_results=1)
+            results = self.course_catalog.query(
+                query_embeddings=[self.query_cache.get(course_name)], n_results=1
+            )
 
             if results["documents"][0] and results["metadatas"][0]:
                 # Return the title (which is now the ID)
@@ -164,63 +391,186 @@ class VectorStore:
                 }
             )
 
-        self.course_catalog.add(
+        metadata = {
+            "title": course.title,
+            "instructor": course.instructor,
+            "course_link": course.course_link,
+            "lessons_json": json.dumps(lessons_metadata),  # Serialize as JSON string
+            "lesson_count": len(course.lessons),
+        }
+        self.course_catalog.upsert(
             documents=[course_text],
-            metadatas=[
-                {
-                    "title": course.title,
-                    "instructor": course.instructor,
-                    "course_link": course.course_link,
-                    "lessons_json": json.dumps(
-                        lessons_metadata
-                    ),  # Serialize as JSON string
-                    "lesson_count": len(course.lessons),
-                }
-            ],
+            metadatas=[metadata],
             ids=[course.title],
+            embeddings=self.embedding_function([course_text]),
+        )
+        # Chroma does not store None values, so neither does the index
+        self.catalog_index.upsert(
+            {key: value for key, value in metadata.items() if value is not None}
         )
 
-    def add_course_content(self, chunks: List[CourseChunk]):
-        """Add course content chunks to the vector store"""
-        if not chunks:
-            return
+    def add_course_content(
+        self,
+        chunks: Iterable[CourseChunk],
+        wait: bool = True,
+        stats: Optional[ContentWriteStats] = None,
+    ) -> ContentWriteStats:
+        """
+        Add course content chunks to the vector store in bounded batches.
+
+        Chunks are embedded on the calling thread in embedding_batch_size slices
+        and persisted by a background writer in write_batch_size batches, so the
+        next batch is encoded while the previous one is written. At most one
+        batch is in flight at a time.
+
+        Args:
+            chunks: Chunks to add; any iterable, consumed once
+            wait: Whether to wait for the last batch to be persisted. Callers
+                passing False must call flush() before relying on the data.
+            stats: Optional counters to accumulate into
 
-        documents = [chunk.content for chunk in chunks]
+        Returns:
+            The ContentWriteStats that were updated
+        """
+        stats = stats if stats is not None else ContentWriteStats()
+        start = time.perf_counter()
+
+        batch: List[CourseChunk] = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= self.write_batch_size:
+                self._submit_content_batch(batch, stats)
+                batch = []
+        if batch:
+            self._submit_content_batch(batch, stats)
+
+        if wait:
+            self.flush()
+        stats.wall_seconds += time.perf_counter() - start
+        return stats
+
+    def _submit_content_batch(self, batch: List[CourseChunk], stats: ContentWriteStats):
+        """Embed one batch, then hand it to the writer thread"""
+        documents = [chunk.content for chunk in batch]
         metadatas = [
             {
                 "course_title": chunk.course_title,
                 "lesson_number": chunk.lesson_number,
                 "chunk_index": chunk.chunk_index,
             }
-            for chunk in chunks
+            for chunk in batch
         ]
         # Use title with chunk index for unique IDs
         ids = [
             f"{chunk.course_title.replace(' ', '_')}_{chunk.chunk_index}"
-            for chunk in chunks
+            for chunk in batch
         ]
 
-        self.course_content.add(documents=documents, metadatas=metadatas, ids=ids)
+        encode_start = time.perf_counter()
+        embeddings = self._embed_documents(documents, stats)
+        stats.encode_seconds += time.perf_counter() - encode_start
+
+        # Wait for the previous batch before queueing this one to bound memory
+        self._wait_for_write()
+        self._pending_write = self._writer.submit(
+            self._write_content_batch, documents, metadatas, ids, embeddings, stats
+        )
+
+    def _embed_documents(
+        self, documents: List[str], stats: ContentWriteStats
+    ) -> List[Any]:
+        """Embed documents, reusing cached vectors and caching new ones"""
+        if self.embedding_cache is not None:
+            embeddings = self.embedding_cache.get_many(documents)
+        else:
+            embeddings = [None] * len(documents)
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        stats.cache_hits += len(documents) - len(missing)
+
+        for start in range(0, len(missing), self.embedding_batch_size):
+            indices = missing[start : start + self.embedding_batch_size]
+            texts = [documents[i] for i in indices]
+            vectors = self.embedding_function(texts)
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(texts, vectors)
+            for i, vector in zip(indices, vectors):
+                embeddings[i] = vector
+
+        return embeddings
+
+    def _write_content_batch(
+        self,
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str],
+        embeddings: List[Any],
+        stats: ContentWriteStats,
+    ):
+        """Persist one pre-embedded batch (runs on the writer thread)"""
+        write_start = time.perf_counter()
+        self.course_content.add(
+            documents=documents, metadatas=metadatas, ids=ids, embeddings=embeddings
+        )
+        if self.lexical_index is not None:
+            self.lexical_index.add(ids, documents, metadatas)
+        stats.write_seconds += time.perf_counter() - write_start
+        stats.chunks += len(ids)
+        stats.batches += 1
+
+    def flush(self):
+        """Wait for any in-flight content write, re-raising its error"""
+        self._wait_for_write()
+        self._save_lexical_index()
+
+    def _wait_for_write(self):
+        pending, self._pending_write = self._pending_write, None
+        if pending is not None:
+            pending.result()
+
+    def _save_lexical_index(self):
+        """Persist the BM25 index if content writes changed it"""
+        if self.lexical_index is None:
+            return
+        try:
+            self.lexical_index.save()
+        except OSError as e:
+            print(f"Error saving lexical index: {e}")
+
+    def delete_course(self, course_title: str):
+        """Remove a course's catalog entry and all of its content chunks"""
+        self._wait_for_write()
+        self.course_content.delete(where={"course_title": course_title})
+        self.course_catalog.delete(ids=[course_title])
+        self.catalog_index.remove(course_title)
+        if self.lexical_index is not None:
+            # Saved by the next flush(); a stale file is rebuilt on first search
+            self.lexical_index.remove_course(course_title)
 
     def clear_all_data(self):
         """Clear all data from both collections"""
         try:
+            self._wait_for_write()
             self.client.delete_collection("course_catalog")
-            self.client.delete_collection("course_content")
+            if self.content_backend == "numpy":
+                self.course_content.clear()
+            else:
+                self.client.delete_collection("course_content")
             # Recreate collections
             self.course_catalog = self._create_collection("course_catalog")
-            self.course_content = self._create_collection("course_content")
+            self.course_content = self._create_content_collection()
+            self.catalog_index.clear()
+            if self.lexical_index is not None:
+                self.lexical_index.clear()
+                self._save_lexical_index()
         except Exception as e:
+            self.catalog_index.invalidate()
             print(f"Error clearing data: {e}")
 
     def get_existing_course_titles(self) -> List[str]:
         """Get all existing course titles from the vector store"""
         try:
-            # Get all documents from the catalog
-            results = self.course_catalog.get()
-            if results and "ids" in results:
-                return results["ids"]
-            return []
+            return self.catalog_index.titles()
         except Exception as e:
             print(f"Error getting existing course titles: {e}")
             return []
@@ -228,33 +578,15 @@ class VectorStore:
     def get_course_count(self) -> int:
         """Get the total number of courses in the vector store"""
         try:
-            results = self.course_catalog.get()
-            if results and "ids" in results:
-                return len(results["ids"])
-            return 0
+            return self.catalog_index.count()
         except Exception as e:
             print(f"Error getting course count: {e}")
             return 0
 
     def get_all_courses_metadata(self) -> List[Dict[str, Any]]:
         """Get metadata for all courses in the vector store"""
-        import json
-
         try:
-            results = self.course_catalog.get()
-            if results and "metadatas" in results:
-                # Parse lessons JSON for each course
-                parsed_metadata = []
-                for metadata in results["metadatas"]:
-                    course_meta = metadata.copy()
-                    if "lessons_json" in course_meta:
-                        course_meta["lessons"] = json.loads(course_meta["lessons_json"])
-                        del course_meta[
-                            "lessons_json"
-                        ]  # Remove the JSON string version
-                    parsed_metadata.append(course_meta)
-                return parsed_metadata
-            return []
+            return self.catalog_index.all()
         except Exception as e:
             print(f"Error getting courses metadata: {e}")
             return []
@@ -262,35 +594,18 @@ class VectorStore:
     def get_course_link(self, course_title: str) -> Optional[str]:
         """Get course link for a given course title"""
         try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and "metadatas" in results and results["metadatas"]:
-                metadata = results["metadatas"][0]
-                return metadata.get("course_link")
-            return None
+            return self.catalog_index.course_link(course_title)
         except Exception as e:
             print(f"Error getting course link: {e}")
             return None
 
     def get_lesson_link(self, course_title: str, lesson_number: int) -> Optional[str]:
         """Get lesson link for a given course title and lesson number"""
-        import json
-
         try:
-            # Get course by ID (title is the ID)
-            results = self.course_catalog.get(ids=[course_title])
-            if results and "metadatas" in results and results["metadatas"]:
-                metadata = results["metadatas"][0]
-                lessons_json = metadata.get("lessons_json")
-                if lessons_json:
-                    lessons = json.loads(lessons_json)
-                    # Find the lesson with matching number
-                    for lesson in lessons:
-                        if lesson.get("lesson_number") == lesson_number:
-                            return lesson.get("lesson_link")
-            return None
+            return self.catalog_index.lesson_link(course_title, lesson_number)
         except Exception as e:
             print(f"Error getting lesson link: {e}")
+            return None
 
     def get_course_outline(self, course_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -303,33 +618,22 @@ class VectorStore:
             Dictionary with course_title, course_link, and lessons list,
             or None if course not found
         """
-        import json
-
         try:
             # Resolve course name using semantic search
             course_title = self._resolve_course_name(course_name)
             if not course_title:
                 return None
 
-            # Get course metadata by ID
-            results = self.course_catalog.get(ids=[course_title])
-            if not results or "metadatas" not in results or not results["metadatas"]:
+            course = self.catalog_index.get(course_title)
+            if not course:
                 return None
 
-            metadata = results["metadatas"][0]
-
-            # Parse lessons from JSON
-            lessons = []
-            lessons_json = metadata.get("lessons_json")
-            if lessons_json:
-                lessons = json.loads(lessons_json)
-
             # Build and return course outline
             return {
-                "course_title": metadata.get("title"),
-                "course_link": metadata.get("course_link"),
-                "instructor": metadata.get("instructor"),
-                "lessons": lessons,
+                "course_title": course.get("title"),
+                "course_link": course.get("course_link"),
+                "instructor": course.get("instructor"),
+                "lessons": course["lessons"],
             }
         except Exception as e:
             print(f"Error getting course outline: {e}")
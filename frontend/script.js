@@ -88,8 +88,22 @@ async function sendMessage() {
     chatMessages.appendChild(loadingMessage);
     chatMessages.scrollTop = chatMessages.scrollHeight;
 
+    // Streamed answer text, rendered as it arrives
+    let answer = '';
+    let answerContent = null;
+
+    const renderAnswer = () => {
+        if (!answerContent) {
+            loadingMessage.remove();
+            addMessage('', 'assistant');
+            answerContent = chatMessages.lastElementChild.querySelector('.message-content');
+        }
+        answerContent.innerHTML = marked.parse(answer);
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+    };
+
     try {
-        const response = await fetch(`${API_URL}/query`, {
+        const response = await fetch(`${API_URL}/query/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -102,24 +116,41 @@ async function sendMessage() {
 
         if (!response.ok) throw new Error('Query failed');
 
-        const data = await response.json();
-
-        // Debug: log the sources data
-        console.log('Received sources:', data.sources);
-        console.log('Sources type:', typeof data.sources);
-        if (data.sources && data.sources.length > 0) {
-            console.log('First source:', data.sources[0]);
-            console.log('First source type:', typeof data.sources[0]);
-        }
-
-        // Update session ID if new
-        if (!currentSessionId) {
-            currentSessionId = data.session_id;
-        }
+        await readEventStream(response, (event, data) => {
+            switch (event) {
+                case 'session':
+                    // Update session ID if new
+                    if (!currentSessionId) {
+                        currentSessionId = data.session_id;
+                    }
+                    break;
+                case 'tool':
+                    setLoadingStatus(loadingMessage, toolStatus(data));
+                    break;
+                case 'text':
+                    answer += data.text;
+                    renderAnswer();
+                    break;
+                case 'reset':
+                    // Text from a turn that went on to call tools
+                    answer = '';
+                    if (answerContent) {
+                        answerContent.closest('.message').replaceWith(loadingMessage);
+                        answerContent = null;
+                    }
+                    break;
+                case 'sources':
+                    if (!answerContent) renderAnswer();
+                    if (data.sources && data.sources.length > 0) {
+                        answerContent.insertAdjacentHTML('afterend', formatSources(data.sources));
+                    }
+                    break;
+                case 'error':
+                    throw new Error(data.detail || 'Query failed');
+            }
+        });
 
-        // Replace loading message with response
-        loadingMessage.remove();
-        addMessage(data.answer, 'assistant', data.sources);
+        if (!answerContent) renderAnswer();
 
     } catch (error) {
         // Replace loading message with error
@@ -132,6 +163,52 @@ async function sendMessage() {
     }
 }
 
+// Read a Server-Sent Events response, calling onEvent(event, data) per frame
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            const dataLines = [];
+            for (const line of frame.split('\n')) {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+            }
+            if (dataLines.length > 0) {
+                onEvent(event, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+}
+
+function toolStatus(data) {
+    if (data.name === 'get_course_outline') {
+        return 'Looking up the course outline...';
+    }
+    return 'Searching course materials...';
+}
+
+function setLoadingStatus(loadingMessage, text) {
+    let status = loadingMessage.querySelector('.loading-status');
+    if (!status) {
+        status = document.createElement('div');
+        status.className = 'loading-status';
+        loadingMessage.querySelector('.message-content').appendChild(status);
+    }
+    status.textContent = text;
+}
+
 function createLoadingMessage() {
     const messageDiv = document.createElement('div');
     messageDiv.className = 'message assistant';
@@ -159,27 +236,7 @@ function addMessage(content, type, sources = null, isWelcome = false) {
     let html = `<div class="message-content">${displayContent}</div>`;
 
     if (sources && sources.length > 0) {
-        // Format sources as clickable links when available
-        const formattedSources = sources.map(source => {
-            // Handle both string sources (legacy) and object sources (new format)
-            if (typeof source === 'string') {
-                return escapeHtml(source);
-            }
-            // New format with text and link
-            const text = source.text || '';
-            const link = source.link || null;
-            if (link) {
-                return `<a href="${escapeHtml(link)}" target="_blank" rel="noopener noreferrer">${escapeHtml(text)}</a>`;
-            }
-            return escapeHtml(text);
-        }).join('');
-
-        html += `
-            <details class="sources-collapsible">
-                <summary class="sources-header">Sources</summary>
-                <div class="sources-content">${formattedSources}</div>
-            </details>
-        `;
+        html += formatSources(sources);
     }
 
     messageDiv.innerHTML = html;
@@ -189,6 +246,31 @@ function addMessage(content, type, sources = null, isWelcome = false) {
     return messageId;
 }
 
+// Build the collapsible sources block for an assistant message
+function formatSources(sources) {
+    // Format sources as clickable links when available
+    const formattedSources = sources.map(source => {
+        // Handle both string sources (legacy) and object sources (new format)
+        if (typeof source === 'string') {
+            return escapeHtml(source);
+        }
+        // New format with text and link
+        const text = source.text || '';
+        const link = source.link || null;
+        if (link) {
+            return `<a href="${escapeHtml(link)}" target="_blank" rel="noopener noreferrer">${escapeHtml(text)}</a>`;
+        }
+        return escapeHtml(text);
+    }).join('');
+
+    return `
+        <details class="sources-collapsible">
+            <summary class="sources-header">Sources</summary>
+            <div class="sources-content">${formattedSources}</div>
+        </details>
+    `;
+}
+
 // Helper function to escape HTML for user messages
 function escapeHtml(text) {
     const div = document.createElement('div');